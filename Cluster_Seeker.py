@@ -2,47 +2,30 @@ import os
 import argparse
 import json
 import time
-import platform
-import subprocess
+from UtilityFunctions import mount_map
+from UtilityFunctions.slurm_jobs import write_sbatch_header, afterok, history_file_for
+from UtilityFunctions.resource_model import ResourceModel, last_units
+from UtilityFunctions.schedulers import scheduler_for
+from UtilityFunctions.job_supervisor import JobSupervisor, WorkItem
+from UtilityFunctions.list_all_directories import get_excluded_folders, should_exclude_path, BATCH_SIZE
+from UtilityFunctions.scan_core import FileFilter, add_filter_arguments, add_walk_arguments, walk_flags, recursive_entry, WALK_FIELDS
+from UtilityFunctions.top_files import add_top_arguments, top_flags
+
+RUN_CONFIG_NAME = 'run_config.json'
 
 def convert_path_format(path):
-    """Convert path between Windows and Linux formats based on the current OS, and replace spaces with underscores."""
-    print("Path is: ", path)
-    # Replace spaces with underscores
+    """Replace spaces with underscores (renaming the folder on disk), then convert the path for the current OS."""
     new_path = path.replace(' ', '_')
     if new_path != path and os.path.exists(path):
-            # Only rename if the path exists and needs renaming
-            try:
-                os.rename(path, new_path)
-                print(f"Renamed '{path}' -> '{new_path}'")
-            except Exception as e:
-                print(f"Failed to rename '{path}' -> '{new_path}': {e}")
-                # Optionally, you could raise or handle this differently
-    path = new_path
-    system = platform.system()
-    if system == "Windows":
-        if path.startswith('/nfs/turbo'):
-            return path.replace('/nfs/turbo/lsa-adae', 'Z:').replace('/', '\\')
-        return path.replace('/', '\\')
-    else:  # Linux or other Unix-like
-        if path.startswith('Z:'):
-            if '\\' not in path:
-                parts = path[2:].split('migratedData')[1:]
-                if parts:
-                    reconstructed = '/nfs/turbo/lsa-adae/migratedData' + '/'.join(parts)
-                else:
-                    reconstructed = '/nfs/turbo/lsa-adae/migratedData'
-                print(f"Reconstructed path: {reconstructed}")
-                return reconstructed.replace('//', '/')
-            path = path.replace('\\', '/')
-            print("Path after replacing backslashes: ", path)
-            if path.startswith('Z:/'):
-                return path.replace('Z:/', '/nfs/turbo/lsa-adae/')
-            else:
-                return path.replace('Z:', '/nfs/turbo/lsa-adae/')
-        return path.replace('\\', '/')
+        # Only rename if the path exists and needs renaming
+        try:
+            os.rename(path, new_path)
+            print(f"Renamed '{path}' -> '{new_path}'")
+        except Exception as e:
+            print(f"Failed to rename '{path}' -> '{new_path}': {e}")
+    return mount_map.convert_path_format(new_path)
 
-def create_slurm_job_for_directory(directory, config, job_index, output_dir):
+def create_slurm_job_for_directory(directory, config, job_index, output_dir, convert=True):
     """Create a SLURM job script to process a single directory."""
 
     if not os.path.exists('slurm_logs'):
@@ -54,46 +37,15 @@ def create_slurm_job_for_directory(directory, config, job_index, output_dir):
 
     try:
         with open(script_path, 'w') as script_file:
-            script_file.write("#!/bin/bash\n")
-            script_file.write(f"#SBATCH --job-name={job_name}\n")
-            script_file.write(f"#SBATCH --output={log_file}\n")
-            script_file.write(f"#SBATCH --error={log_file}\n")
-            script_file.write(f"#SBATCH --time={config['time']}\n")
-            script_file.write(f"#SBATCH --mem={config['mem']}\n")
-            script_file.write(f"#SBATCH --cpus-per-task={config['cpus_per_task']}\n")
-
-            if 'partition' in config:
-                script_file.write(f"#SBATCH --partition={config['partition']}\n")
-            if 'account' in config:
-                script_file.write(f"#SBATCH --account={config['account']}\n")
-
-            script_file.write("\n")
-
-            if 'module' in config:
-                if isinstance(config['module'], list):
-                    for module in config['module']:
-                        script_file.write(f"module load {module}\n")
-                else:
-                    script_file.write(f"module load {config['module']}\n")
-
-            if 'conda_env' in config:
-                script_file.write("source ~/.bashrc\n")
-                script_file.write(f"conda activate {config['conda_env']}\n")
-
-            if 'conda_lib_path' in config:
-                script_file.write(f"export LD_LIBRARY_PATH={config['conda_lib_path']}:$LD_LIBRARY_PATH\n")
-
-            if 'project_directory' in config:
-                script_file.write(f"cd {config['project_directory']}\n")
+            write_sbatch_header(script_file, config, job_name, log_file)
 
-            script_file.write("\n")
-
-            converted_directory = convert_path_format(directory)
+            converted_directory = convert_path_format(directory) if convert else directory
             print(f"Converted directory path: {converted_directory}")
 
             output_file = os.path.join(output_dir, f"subdirectories_{job_index}.txt")
 
-            script_file.write(f"python UtilityFunctions/list_all_directories.py --folder \"{converted_directory}\"\n")
+            one_file_system = " --one-file-system" if config.get('one_file_system') else ""
+            script_file.write(f"python UtilityFunctions/list_all_directories.py --folder \"{converted_directory}\"{one_file_system}\n")
 
             expected_output = os.path.join(converted_directory, 'Seeker_Output', 'subdirectories.txt')
             script_file.write(f"if [ -f \"{expected_output}\" ]; then\n")
@@ -111,12 +63,66 @@ def create_slurm_job_for_directory(directory, config, job_index, output_dir):
         print(f"Error creating SLURM script {script_path}: {e}")
         return None
 
-def create_merge_and_process_job(config, job_ids, output_dir, batch_output_dir):
+def scan_work_item(directory, config, job_index, output_dir, convert=True):
+    """Work item scanning one directory; it can be split into one job per subdirectory."""
+    return WorkItem(
+        name=f"dir_scan_{job_index}",
+        write_script=lambda job_config: create_slurm_job_for_directory(
+            directory, job_config, job_index, output_dir, convert),
+        config=config,
+        split=lambda job_config: split_directory_scan(directory, job_config, job_index, output_dir, convert),
+    )
+
+def split_directory_scan(directory, config, job_index, output_dir, convert=True):
+    """
+    Replace the scan of a directory by one scan per subdirectory.
+
+    The directory itself and its excluded subdirectories (as recursive entries) are
+    written to its subdirectories file directly, so the merged list is the same as if
+    the original job had finished.
+    """
+    directory = convert_path_format(directory) if convert else directory
+    excluded_folders = get_excluded_folders()
+    device = os.stat(directory).st_dev
+    with os.scandir(directory) as entries:
+        subdirectories = sorted(
+            entry.path for entry in entries
+            if entry.is_dir(follow_symlinks=False)
+            and not (config.get('one_file_system') and entry.stat(follow_symlinks=False).st_dev != device)
+        )
+    children = [child for child in subdirectories if not should_exclude_path(child, excluded_folders)]
+
+    with open(os.path.join(output_dir, f"subdirectories_{job_index}.txt"), 'w') as output_file:
+        if not should_exclude_path(directory, excluded_folders):
+            output_file.write(f"{directory}\n")
+            for child in subdirectories:
+                if child not in children:
+                    output_file.write(f"{recursive_entry(child)}\n")
+
+    return [
+        scan_work_item(child, config, f"{job_index}_{index}", output_dir, convert=False)
+        for index, child in enumerate(children)
+    ]
+
+def write_run_config(config, output_dir):
+    """
+    Save the config with command-line overrides applied as output_dir/run_config.json.
+
+    Stages that load the config themselves (merge tree, extra batch workers) are pointed
+    at this file, so they use the same budget, scheduler, filters and top-N as this run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    config_path = os.path.abspath(os.path.join(output_dir, RUN_CONFIG_NAME))
+    with open(config_path, 'w') as config_file:
+        json.dump(config, config_file, indent=2)
+    return config_path
+
+def create_merge_and_process_job(config, job_ids, output_dir, batch_output_dir, config_path=None):
     """Create a SLURM job to merge results AND process batch files to generate Excel sheets."""
 
     job_name = "merge_and_process"
     log_file = os.path.join('slurm_logs', f"{job_name}.txt")
-    dependency_string = f"afterok:{':'.join(job_ids)}"
+    dependency_string = afterok(job_ids)
     script_path = os.path.join('slurm_logs', f"{job_name}.sh")
 
     # convert paths to ensure compatibility
@@ -125,40 +131,7 @@ def create_merge_and_process_job(config, job_ids, output_dir, batch_output_dir):
 
     try:
         with open(script_path, 'w') as script_file:
-            script_file.write("#!/bin/bash\n")
-            script_file.write(f"#SBATCH --job-name={job_name}\n")
-            script_file.write(f"#SBATCH --output={log_file}\n")
-            script_file.write(f"#SBATCH --error={log_file}\n")
-            script_file.write(f"#SBATCH --time={config['time']}\n")
-            script_file.write(f"#SBATCH --mem={config['mem']}\n")
-            script_file.write(f"#SBATCH --cpus-per-task={config['cpus_per_task']}\n")
-            script_file.write(f"#SBATCH --dependency={dependency_string}\n")
-
-            if 'partition' in config:
-                script_file.write(f"#SBATCH --partition={config['partition']}\n")
-            if 'account' in config:
-                script_file.write(f"#SBATCH --account={config['account']}\n")
-
-            script_file.write("\n")
-
-            if 'module' in config:
-                if isinstance(config['module'], list):
-                    for module in config['module']:
-                        script_file.write(f"module load {module}\n")
-                else:
-                    script_file.write(f"module load {config['module']}\n")
-
-            if 'conda_env' in config:
-                script_file.write("source ~/.bashrc\n")
-                script_file.write(f"conda activate {config['conda_env']}\n")
-
-            if 'conda_lib_path' in config:
-                script_file.write(f"export LD_LIBRARY_PATH={config['conda_lib_path']}:$LD_LIBRARY_PATH\n")
-
-            if 'project_directory' in config:
-                script_file.write(f"cd {config['project_directory']}\n")
-
-            script_file.write("\n")
+            write_sbatch_header(script_file, config, job_name, log_file, dependency_string)
 
             # Step 1: Merge all individual result files
             merged_file = os.path.join(batch_output_dir, "all_subdirectories.txt")
@@ -175,33 +148,42 @@ def create_merge_and_process_job(config, job_ids, output_dir, batch_output_dir):
             script_file.write(f"\"\n")
             script_file.write(f"echo \"Batch files created in {batch_output_dir}\"\n")
 
-            # Step 3: Process each batch file to generate Excel sheets in output_dir
+            # Step 3: Drain the batch queue with one persistent worker process (plus extra
+            # worker jobs with "batch_workers" > 1); outputs are written to output_dir
             script_file.write(f"echo \"Step 3: Processing batch files to generate Excel sheets...\"\n")
-            script_file.write(f"batch_count=0\n")
-            script_file.write(f"success_count=0\n")
-            script_file.write(f"for batch_file in {batch_output_dir}/batch_*.txt; do\n")
-            script_file.write(f"    if [ -f \"$batch_file\" ]; then\n")
-            script_file.write(f"        echo \"Processing batch file: $batch_file\"\n")
-            script_file.write(f"        batch_count=$((batch_count + 1))\n")
-
-            # Change to output_dir so Excel files are created there
-            script_file.write(f"        cd {output_dir}\n")
-            script_file.write(f"        python {config.get('project_directory', '.')}/UtilityFunctions/process_batch.py --path \"$batch_file\"\n")
-            script_file.write(f"        if [ $? -eq 0 ]; then\n")
-            script_file.write(f"            success_count=$((success_count + 1))\n")
-            script_file.write(f"            echo \"SUCCESS: Generated Excel files for $batch_file in {output_dir}\"\n")
-            script_file.write(f"        else\n")
-            script_file.write(f"            echo \"ERROR: Failed to process $batch_file\"\n")
-            script_file.write(f"        fi\n")
-            # Return to project directory
-            script_file.write(f"        cd {config.get('project_directory', '.')}\n")
-            script_file.write(f"    fi\n")
-            script_file.write(f"done\n")
-
-            # Step 4: Report results (look for Excel files in output_dir, not batch_output_dir)
+            script_file.write(f"rm -rf \"{os.path.join(output_dir, 'dataset')}\"\n")
+            script_file.write(f"rm -rf \"{os.path.join(output_dir, 'top_files')}\"\n")
+            # Queue state of an earlier run; step 2 has just written this run's batch files
+            for state_dir in ('claimed', 'done', 'failed'):
+                script_file.write(f"rm -rf \"{os.path.join(batch_output_dir, state_dir)}\"\n")
+            # Walk options and extension/name filters from the config are passed on to the workers
+            excel_flag = (("" if config.get('excel', True) else " --no-excel") + walk_flags(config)
+                          + FileFilter.from_options(config).shell_args()
+                          + top_flags(config.get('top_n'), config.get('top_only', False)))
+            extra_workers = config.get('batch_workers', 1) - 1
+            if extra_workers > 0 and config_path:
+                script_file.write(f"python {config.get('project_directory', '.')}/UtilityFunctions/batch_queue.py submit-workers --queue \"{batch_output_dir}\" --config \"{config_path}\" --count {extra_workers}{excel_flag}\n")
+            script_file.write(f"python {config.get('project_directory', '.')}/UtilityFunctions/batch_queue.py work --queue \"{batch_output_dir}\" --wait{excel_flag}\n")
+            script_file.write(f"batch_count=$(ls {batch_output_dir}/done {batch_output_dir}/failed 2>/dev/null | grep -c '^batch_')\n")
+            script_file.write(f"success_count=$(ls {batch_output_dir}/done 2>/dev/null | grep -c '^batch_')\n")
+
+            # Step 4: Merge batch outputs as a tree of dependent jobs; the last one writes the run summary
+            if config.get('top_only', False):
+                # No dataset to merge or summarize; only the per-batch rankings
+                script_file.write(f"echo \"Step 4: Ranking files...\"\n")
+                script_file.write(f"python {config.get('project_directory', '.')}/UtilityFunctions/top_files.py --output_dir \"{output_dir}\"\n")
+            elif config_path:
+                script_file.write(f"echo \"Step 4: Submitting merge tree...\"\n")
+                script_file.write(f"python {config.get('project_directory', '.')}/UtilityFunctions/merge_tree.py submit --output_dir \"{output_dir}\" --config \"{config_path}\"\n")
+            else:
+                script_file.write(f"echo \"Step 4: Summarizing results...\"\n")
+                script_file.write(f"python {config.get('project_directory', '.')}/UtilityFunctions/summarize_results.py --output_dir \"{output_dir}\"\n")
+
+            # Step 5: Report results (look for Excel files in output_dir, not batch_output_dir)
             script_file.write(f"echo \"\\nProcessing Summary:\"\n")
             script_file.write(f"echo \"- Processed $success_count out of $batch_count batch files successfully\"\n")
             script_file.write(f"echo \"- Excel files generated in: {output_dir}\"\n")
+            script_file.write(f"echo \"- Extension-partitioned dataset in: {os.path.join(output_dir, 'dataset')}\"\n")
             script_file.write(f"echo \"- Batch files stored in: {batch_output_dir}\"\n")
             script_file.write(f"echo \"\\nGenerated Excel files:\"\n")
             script_file.write(f"ls -la {output_dir}/*.xlsx 2>/dev/null || echo 'No Excel files found in {output_dir} - check for errors above'\n")
@@ -217,6 +199,19 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Launch SLURM jobs to list subdirectories and generate Excel files.')
     parser.add_argument('--config', type=str, required=True, help='Path to SLURM configuration JSON file.')
     parser.add_argument('--folder', nargs='+', required=True, help='Folder to scan for subdirectories.')
+    parser.add_argument('--supervise', action='store_true',
+                        help='Stay running to resubmit failed scan jobs before releasing the merge job.')
+    parser.add_argument('--poll-interval', type=int, help='Seconds between job status checks when supervising '
+                                                           '(default: 60, or 5 with the local scheduler).')
+    parser.add_argument('--scheduler', choices=['slurm', 'local'],
+                        help='Submit the jobs to SLURM, or run them on this machine (config: "scheduler").')
+    parser.add_argument('--slots', dest='local_slots', type=int,
+                        help='CPUs the local scheduler gives its jobs together (config: "local_slots", default: all).')
+    parser.add_argument('--max-ops', dest='max_metadata_ops', type=int,
+                        help='Cap the stat/readdir calls per second of all jobs together (config: "max_metadata_ops").')
+    add_walk_arguments(parser, hardlinks_default=None)
+    add_filter_arguments(parser)
+    add_top_arguments(parser)
 
     args = parser.parse_args()
 
@@ -232,6 +227,14 @@ if __name__ == '__main__':
         print(f"Error: Invalid JSON in configuration file: {e}")
         exit(1)
 
+    # Walk options, filters, --top, --max-ops and the scheduler given on the command line replace those of the config
+    config.update({field: value for field, value in vars(args).items()
+                   if field in WALK_FIELDS + FileFilter.FIELDS + ('top_n', 'top_only', 'max_metadata_ops', 'scheduler', 'local_slots')
+                   and value})
+
+    # Path conversions use the config's "mount_map" (defaults to /nfs/turbo/lsa-adae <-> Z:)
+    mount_map.configure(config)
+
     # Validate required configuration fields
     required_fields = ['time', 'mem', 'cpus_per_task']
     missing_fields = [field for field in required_fields if field not in config]
@@ -293,76 +296,88 @@ if __name__ == '__main__':
 
     print("Final list of directories to scan:", folders_to_scan)
 
-    # Submit scanning jobs
-    job_ids = []
-    print(f"\nLaunching {len(folders_to_scan)} SLURM jobs for directory scanning...")
-
-    for i, directory in enumerate(folders_to_scan):
-        print(f"\nCreating job {i+1}/{len(folders_to_scan)} for: {directory}")
-
-        script_path = create_slurm_job_for_directory(directory, config, i, args.output_dir)
-
-        if script_path is None:
-            continue
-
-        try:
-            result = subprocess.run(['sbatch', script_path],
-                                  capture_output=True, text=True, check=True)
-            output = result.stdout.strip()
-
-            if "Submitted batch job" in output:
-                job_id = output.split()[-1]
-                int(job_id)  # Validate it's a number
-                job_ids.append(job_id)
-                print(f"✓ Submitted job {job_id}")
-            else:
-                print(f"✗ Unexpected SLURM output: {output}")
-
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Failed to submit job: {e}")
-            continue
-        except (IndexError, ValueError) as e:
-            print(f"✗ Failed to parse job ID: {e}")
-            continue
-
-        time.sleep(0.1)
-
-    if not job_ids:
-        print("Error: No jobs were successfully submitted.")
-        exit(1)
-
-    print(f"\n✓ Successfully submitted {len(job_ids)} scanning jobs: {job_ids}")
-
-    # Submit merge and processing job
-    print("\nCreating merge and Excel generation job...")
-    merge_script = create_merge_and_process_job(config, job_ids, args.output_dir, args.batch_dir)
-
-    if merge_script is None:
-        print("Failed to create merge job script.")
-        exit(1)
+    run_config_path = write_run_config(config, args.output_dir)
+    print(f"Saved the configuration of this run to: {run_config_path}")
 
+    # Submit scanning jobs, each sized from the directory count of its previous scan.
+    # The local scheduler runs the same job scripts and dependencies on this machine
+    local = config.get('scheduler') == 'local'
+    scheduler = scheduler_for(config)
+    poll_interval = args.poll_interval or (5 if local else 60)
+    supervisor = JobSupervisor.from_config(scheduler, config, poll_interval=poll_interval)
+    succeeded = False
     try:
-        merge_result = subprocess.run(['sbatch', merge_script],
-                                    capture_output=True, text=True, check=True)
-        merge_output = merge_result.stdout.strip()
-
-        if "Submitted batch job" in merge_output:
-            merge_job_id = merge_output.split()[-1]
-            print(f"✓ Submitted merge and processing job {merge_job_id}")
+        history_file = history_file_for(config)
+        scan_model = ResourceModel.from_history(history_file, 'dir_scan')
+        expected_directories = []
+        scan_items = []
+        print(f"\nLaunching {len(folders_to_scan)} SLURM jobs for directory scanning...")
+
+        for i, directory in enumerate(folders_to_scan):
+            print(f"\nCreating job {i+1}/{len(folders_to_scan)} for: {directory}")
+
+            directory_count = last_units(history_file, 'dir_scan', convert_path_format(directory))
+            expected_directories.append(directory_count)
+            item = scan_work_item(directory, scan_model.sized_config(config, directory_count), i, args.output_dir)
+            if not supervisor.submit(item):
+                continue
+            scan_items.append(item)
+            print(f"✓ Submitted job {item.job_id} (time={item.config['time']}, mem={item.config['mem']})")
+
+            time.sleep(0.1)
+
+        job_ids = [item.job_id for item in scan_items]
+        if not job_ids:
+            print("Error: No jobs were successfully submitted.")
+            exit(1)
+
+        print(f"\n✓ Successfully submitted {len(job_ids)} scanning jobs: {job_ids}")
+
+        # Submit merge and processing job. When supervising, it is held instead of depending on
+        # the scan jobs, so resubmitted scans can still feed it.
+        # Batches are processed one after another, so time scales with all directories
+        # and memory with one batch
+        print("\nCreating merge and Excel generation job...")
+        total_directories = None if None in expected_directories else sum(expected_directories)
+        process_model = ResourceModel.from_history(history_file, 'process_batch')
+        merge_config = process_model.sized_config(
+            config, total_directories, memory_units=min(total_directories or 0, BATCH_SIZE))
+        merge_item = WorkItem(
+            name="merge_and_process",
+            write_script=lambda job_config: create_merge_and_process_job(
+                job_config, [] if args.supervise else job_ids, args.output_dir, args.batch_dir,
+                run_config_path),
+            config=merge_config,
+        )
+
+        if not supervisor.submit(merge_item, hold=args.supervise):
+            print(f"✗ Failed to submit merge job")
+            exit(1)
+        print(f"✓ Submitted merge and processing job {merge_item.job_id} "
+              f"(time={merge_item.config['time']}, mem={merge_item.config['mem']})")
+
+        print(f"\n" + "="*60)
+        print(f"COMPLETE WORKFLOW SUMMARY")
+        print(f"="*60)
+        print(f"📁 Scanning jobs: {len(job_ids)} submitted")
+        print(f"🔗 Job IDs: {job_ids}")
+        print(f"📊 Processing job: Will merge results and generate Excel files")
+        print(f"📂 Excel files will be in: {args.batch_dir}")
+        print(f"📋 Expected files: dataset/extension=<ext>/batch_1.parquet, batch_1_all_files.xlsx, run_summary.json, etc.")
+        if local:
+            print(f"🔍 Running the jobs on this machine with {scheduler.slots} CPU slots")
         else:
-            print(f"✗ Failed to submit merge job: {merge_output}")
-
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Error submitting merge job: {e}")
-
-    print(f"\n" + "="*60)
-    print(f"COMPLETE WORKFLOW SUMMARY")
-    print(f"="*60)
-    print(f"📁 Scanning jobs: {len(job_ids)} submitted")
-    print(f"🔗 Job IDs: {job_ids}")
-    print(f"📊 Processing job: Will merge results and generate Excel files")
-    print(f"📂 Excel files will be in: {args.batch_dir}")
-    print(f"📋 Expected files: batch_1_all_files.xlsx, batch_1_extensions.xlsx, etc.")
-    print(f"🔍 Monitor with: squeue -u $USER")
-    print(f"📄 Check logs in: slurm_logs/")
-    print(f"="*60)
+            print(f"🔍 Monitor with: squeue -u $USER (or use --supervise to recover failed jobs)")
+        print(f"📄 Check logs in: slurm_logs/")
+        print(f"="*60)
+
+        succeeded = supervisor.supervise(scan_items, merge_item) if args.supervise else True
+    except KeyboardInterrupt:
+        # Local jobs stop running with this process; SLURM jobs carry on
+        scheduler.stop()
+        raise
+    finally:
+        # Local jobs only run while this process does, including those submitted by the
+        # merge job (merge tree, batch workers): wait for them even when a step failed
+        succeeded = scheduler.drain() and succeeded
+    exit(0 if succeeded else 1)
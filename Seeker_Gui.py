@@ -1,14 +1,131 @@
 import os
+import re
 import sys
+import time
+import threading
+import argparse
+import numpy as np
 import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QFileDialog, QVBoxLayout, QPushButton, QLabel,
-    QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem,
+    QListWidget, QListWidgetItem, QTableView, QLineEdit, QTableWidget, QTableWidgetItem,
     QMessageBox, QHBoxLayout, QProgressBar, QScrollArea, QSplitter,
-    QMainWindow, QStatusBar, QFrame
+    QMainWindow, QStatusBar, QFrame, QTabWidget, QHeaderView
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex, QThread, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont
+from UtilityFunctions.excel_export import base_sheet_name
+from UtilityFunctions import scan_dataset, summarize_results, workbook_cache
+from UtilityFunctions.query_results import parse_size, parse_date
+from UtilityFunctions.search_index import SearchIndex, SIZE_COLUMN
+from UtilityFunctions.table_export import export_rows, ExportCancelled, EXPORT_FORMATS
+
+# Milliseconds to wait after the last keystroke before filtering
+FILTER_DELAY_MS = 150
+MODIFIED_COLUMN = 'Modified Time'
+SUMMARY_TOP_N = 100
+BAR_WIDTH = 30
+EXPORT_FILTERS = "Excel Files (*.xlsx);;CSV Files (*.csv);;Parquet Files (*.parquet)"
+
+def format_bytes(nbytes):
+    """Human-readable size, e.g. 1.5 GB."""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if abs(nbytes) < 1024 or unit == 'TB':
+            return f"{nbytes:.0f} {unit}" if unit == 'B' else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+class ExportWorker(QThread):
+    """Write the displayed rows to a file off the GUI thread, chunk by chunk."""
+    progress = pyqtSignal(int)
+    export_done = pyqtSignal(str, int)
+    export_failed = pyqtSignal(str)
+    export_cancelled = pyqtSignal()
+
+    def __init__(self, df, rows, path):
+        super().__init__()
+        self.df = df
+        self.rows = rows
+        self.path = path
+        self.cancel_requested = threading.Event()
+
+    def cancel(self):
+        self.cancel_requested.set()
+
+    def run(self):
+        try:
+            written = export_rows(self.df, self.path, rows=self.rows, progress=self.progress.emit,
+                                  cancelled=self.cancel_requested.is_set)
+        except ExportCancelled:
+            self.export_cancelled.emit()
+        except Exception as e:
+            self.export_failed.emit(str(e))
+        else:
+            self.export_done.emit(self.path, written)
+
+class SummaryWorker(QThread):
+    """Summarize a Seeker_Output folder off the GUI thread and cache the result next to it."""
+    summary_ready = pyqtSignal(str, object)
+    summary_failed = pyqtSignal(str, str)
+
+    def __init__(self, output_folder):
+        super().__init__()
+        self.output_folder = output_folder
+
+    def run(self):
+        try:
+            summary = summarize_results.build_summary(self.output_folder, top_n=SUMMARY_TOP_N)
+        except Exception as e:
+            self.summary_failed.emit(self.output_folder, str(e))
+            return
+        try:
+            summarize_results.save_summary(self.output_folder, summary)
+        except OSError as e:
+            # Read-only output (e.g. a colleague's scan) is summarized again next time
+            print(f"Could not cache summary in {self.output_folder}: {e}")
+        self.summary_ready.emit(self.output_folder, summary)
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    Table model showing selected rows of a DataFrame.
+
+    The view only asks for the cells it draws, so millions of rows cost nothing until
+    scrolled into view, and filtering just swaps the array of row positions.
+    """
+
+    def __init__(self, df=None):
+        super().__init__()
+        self.set_data(pd.DataFrame() if df is None else df)
+
+    def set_data(self, df, rows=None):
+        self.beginResetModel()
+        self.df = df
+        self.headers = [str(column) for column in df.columns]
+        self.column_values = [df[column].to_numpy() for column in df.columns]
+        self.rows = np.arange(len(df)) if rows is None else rows
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return str(self.column_values[index.column()][self.rows[index.row()]])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(self.rows[section] + 1)
 
 class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
     def __init__(self):
@@ -41,7 +158,7 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
                 background-color: #cccccc;
                 color: #666666;
             }}
-            QTableWidget {{
+            QTableView {{
                 border: 1px solid {self.purple_light};
                 gridline-color: {self.purple_light};
                 selection-background-color: {self.purple_light};
@@ -52,7 +169,7 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
                 padding: 4px;
                 font-weight: bold;
             }}
-            QListWidget {{
+            QListWidget, QLineEdit {{
                 border: 1px solid {self.purple_light};
             }}
             QProgressBar {{
@@ -120,27 +237,86 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
         self.table_label = QLabel("Data View:")
         self.right_layout.addWidget(self.table_label)
 
-        self.table = QTableWidget()
+        # Filter bar: name search plus size and modification date ranges
+        self.filter_bar = QFrame()
+        self.filter_layout = QHBoxLayout(self.filter_bar)
+        self.filter_layout.setContentsMargins(0, 0, 0, 0)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 File name contains...")
+        self.min_size_edit = QLineEdit()
+        self.min_size_edit.setPlaceholderText("Min size (e.g. 10M)")
+        self.max_size_edit = QLineEdit()
+        self.max_size_edit.setPlaceholderText("Max size (e.g. 2G)")
+        self.after_edit = QLineEdit()
+        self.after_edit.setPlaceholderText("Modified after (YYYY-MM-DD)")
+        self.before_edit = QLineEdit()
+        self.before_edit.setPlaceholderText("Modified before (YYYY-MM-DD)")
+        self.filter_layout.addWidget(self.search_edit, 3)
+        for edit in (self.min_size_edit, self.max_size_edit, self.after_edit, self.before_edit):
+            self.filter_layout.addWidget(edit, 1)
+        self.right_layout.addWidget(self.filter_bar)
+
+        self.filter_timer = QTimer()
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        for edit in (self.search_edit, self.min_size_edit, self.max_size_edit, self.after_edit, self.before_edit):
+            edit.textChanged.connect(self.filter_timer.start)
+
+        self.table_model = DataFrameModel()
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.right_layout.addWidget(self.table)
 
+        self.rows_label = QLabel("")
+        self.right_layout.addWidget(self.rows_label)
+
+        # Summary tab: totals per extension, age histogram and largest directories
+        self.summary_panel = QWidget()
+        self.summary_layout = QVBoxLayout(self.summary_panel)
+        self.summary_layout.setContentsMargins(0, 0, 0, 0)
+        self.summary_label = QLabel("Load a Seeker_Output folder to see its summary.")
+        self.summary_layout.addWidget(self.summary_label)
+        self.extension_table = self.summary_table(["Extension", "Files", "Size"])
+        self.age_table = self.summary_table(["Last Modified", "Files", "Size", ""])
+        self.directory_table = self.summary_table(["Directory", "Files", "Size"])
+        summary_tables = QSplitter(Qt.Horizontal)
+        summary_tables.addWidget(self.extension_table)
+        summary_tables.addWidget(self.age_table)
+        self.summary_layout.addWidget(summary_tables)
+        self.summary_layout.addWidget(QLabel("Largest directories (files directly inside):"))
+        self.summary_layout.addWidget(self.directory_table)
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.summary_panel, "📈 Summary")
+        self.tabs.addTab(self.right_panel, "📋 Data")
+
         # Add panels to splitter
         self.splitter.addWidget(self.left_panel)
-        self.splitter.addWidget(self.right_panel)
+        self.splitter.addWidget(self.tabs)
         self.splitter.setSizes([300, 700])
 
         # Add progress bar
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
 
-        # Add export button
-        self.export_btn = QPushButton("💾 Export Displayed Data to Excel")
+        # Add export and cancel buttons
+        self.export_section = QFrame()
+        self.export_layout = QHBoxLayout(self.export_section)
+        self.export_layout.setContentsMargins(0, 0, 0, 0)
+        self.export_btn = QPushButton("💾 Export Displayed Data")
         self.export_btn.clicked.connect(self.export_data)
         self.export_btn.setEnabled(False)
+        self.cancel_export_btn = QPushButton("✖ Cancel Export")
+        self.cancel_export_btn.clicked.connect(self.cancel_export)
+        self.cancel_export_btn.setVisible(False)
+        self.export_layout.addWidget(self.export_btn, 1)
+        self.export_layout.addWidget(self.cancel_export_btn)
 
         # Add elements to main layout
         self.layout.addWidget(self.splitter)
         self.layout.addWidget(self.progress_bar)
-        self.layout.addWidget(self.export_btn)
+        self.layout.addWidget(self.export_section)
 
         # Add status bar
         self.statusBar = QStatusBar()
@@ -150,9 +326,13 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
         # Set data members
         self.folder_path = None
         self.all_data = None
+        self.search_index = None
+        self.summary_worker = None
+        self.export_worker = None
         self.extension_to_dfs = {}
         self.xlsx_files = []
         self.current_file_index = 0
+        self.dataset_dir = None
 
     def load_folder(self):
         self.folder_path = QFileDialog.getExistingDirectory(self, "Select Seeker_Output Folder")
@@ -161,6 +341,25 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
 
         self.extensions_list.clear()
         self.extension_to_dfs.clear()
+
+        # Extension-partitioned dataset: the partition names are the extension list,
+        # so nothing needs to be read until extensions are selected
+        self.dataset_dir = scan_dataset.dataset_dir_for(self.folder_path)
+        extensions = scan_dataset.list_extensions(self.dataset_dir)
+        if extensions:
+            for ext in extensions:
+                item = QListWidgetItem(ext or 'No Extension')
+                item.setData(Qt.UserRole, ext)
+                item.setCheckState(Qt.Unchecked)
+                self.extensions_list.addItem(item)
+            self.statusBar.showMessage(f"Found {self.extensions_list.count()} extensions")
+            self.show_summary()
+            return
+        self.dataset_dir = None
+        self.summary_label.setText("Summaries are only available for dataset output (dataset/ folder).")
+        self.fill_summary(None)
+
+        # Older Seeker_Output folders only contain per-extension workbooks
         self.xlsx_files = [f for f in os.listdir(self.folder_path) if f.endswith("_extensions.xlsx")]
 
         if not self.xlsx_files:
@@ -174,6 +373,73 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
         self.current_file_index = 0
         QTimer.singleShot(10, self.process_next_file)
 
+    def summary_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return table
+
+    def show_summary(self):
+        """Show the cached summary of the folder, or compute it in the background."""
+        summary = summarize_results.load_summary(self.folder_path)
+        if summary is not None:
+            self.fill_summary(summary)
+            return
+        self.fill_summary(None)
+        self.summary_label.setText("⏳ Summarizing scan in the background...")
+        self.summary_worker = SummaryWorker(self.folder_path)
+        self.summary_worker.summary_ready.connect(self.summary_computed)
+        self.summary_worker.summary_failed.connect(self.summary_error)
+        self.summary_worker.start()
+
+    def summary_computed(self, output_folder, summary):
+        # A different folder may have been opened while this one was summarized
+        if output_folder == self.folder_path:
+            self.fill_summary(summary)
+
+    def summary_error(self, output_folder, message):
+        if output_folder == self.folder_path:
+            self.summary_label.setText(f"Could not summarize scan: {message}")
+
+    def set_rows(self, table, rows):
+        table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                item = QTableWidgetItem(value)
+                if j > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(i, j, item)
+        table.resizeColumnsToContents()
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+    def fill_summary(self, summary):
+        if summary is None:
+            for table in (self.extension_table, self.age_table, self.directory_table):
+                table.setRowCount(0)
+            return
+
+        self.summary_label.setText(
+            f"{summary['total_files']:,} files, {format_bytes(summary['total_bytes'])} "
+            f"(summarized {summary['generated_at'][:16].replace('T', ' ')})"
+        )
+        self.set_rows(self.extension_table, [
+            (ext, f"{stats['files']:,}", format_bytes(stats['bytes']))
+            for ext, stats in summary['per_extension'].items()
+        ])
+        ages = summary['modified_age_histogram']
+        most_bytes = max((age['bytes'] for age in ages), default=0) or 1
+        self.set_rows(self.age_table, [
+            (age['range'], f"{age['files']:,}", format_bytes(age['bytes']),
+             '█' * round(BAR_WIDTH * age['bytes'] / most_bytes))
+            for age in ages
+        ])
+        self.set_rows(self.directory_table, [
+            (directory['directory'], f"{directory['files']:,}", format_bytes(directory['bytes']))
+            for directory in summary.get('largest_directories', [])
+        ])
+
     def process_next_file(self):
         if self.current_file_index >= len(self.xlsx_files):
             self.progress_bar.setVisible(False)
@@ -187,10 +453,10 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
         file = self.xlsx_files[self.current_file_index]
         full_path = os.path.join(self.folder_path, file)
         try:
-            xl = pd.ExcelFile(full_path)
-            for sheet in xl.sheet_names:
-                df = xl.parse(sheet)
-                self.extension_to_dfs.setdefault(sheet, []).append(df)
+            # Parsed once, then reopened from the binary cache until the workbook changes
+            for sheet, df in workbook_cache.read_workbook(full_path):
+                # Continuation sheets ('tif (2)') belong to the same extension
+                self.extension_to_dfs.setdefault(base_sheet_name(sheet), []).append(df)
         except Exception as e:
             print(f"Failed to read {file}: {e}")
 
@@ -200,7 +466,7 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
         QTimer.singleShot(10, self.process_next_file)
 
     def load_selected_extensions(self):
-        selected = [self.extensions_list.item(i).text() for i in range(self.extensions_list.count()) if self.extensions_list.item(i).checkState() == Qt.Checked]
+        selected = [self.extensions_list.item(i) for i in range(self.extensions_list.count()) if self.extensions_list.item(i).checkState() == Qt.Checked]
 
         if not selected:
             QMessageBox.warning(self, "No Selection", "Please select at least one extension.")
@@ -208,46 +474,121 @@ class ExtensionViewer(QMainWindow):  # Changed to QMainWindow for more features
 
         self.statusBar.showMessage(f"Loading data for {len(selected)} extensions...")
         dfs = []
-        for ext in selected:
-            dfs.extend(self.extension_to_dfs.get(ext, []))
+        if self.dataset_dir:
+            # Only the partitions of the selected extensions are read
+            extensions = [item.data(Qt.UserRole) for item in selected]
+            df = scan_dataset.read_extensions(self.dataset_dir, extensions)
+            # Show paths as this machine mounts them (e.g. Z:\ on Windows for cluster scans)
+            dfs = [scan_dataset.with_file_paths(df, path_style='local')] if len(df) else []
+        else:
+            for item in selected:
+                dfs.extend(self.extension_to_dfs.get(item.text(), []))
 
         if not dfs:
             QMessageBox.warning(self, "No Data", "No data found for selected extensions.")
             return
 
         combined_df = pd.concat(dfs, ignore_index=True)
-        self.display_data(combined_df)
         self.all_data = combined_df
-        self.export_btn.setEnabled(True)
+        # Built once per load so that filtering never rescans the rows
+        self.search_index = SearchIndex(combined_df)
+        self.display_data(combined_df)
+        self.apply_filter()
+        self.tabs.setCurrentWidget(self.right_panel)
+        self.export_btn.setEnabled(self.export_worker is None)
         self.statusBar.showMessage(f"Loaded {len(combined_df)} rows of data")
 
     def display_data(self, df):
-        self.table.setRowCount(0)
-        self.table.setColumnCount(0)
-
-        self.table.setColumnCount(len(df.columns))
-        self.table.setHorizontalHeaderLabels(df.columns.astype(str))
-        self.table.setRowCount(len(df))
-
-        for i in range(len(df)):
-            for j in range(len(df.columns)):
-                val = str(df.iat[i, j])
-                self.table.setItem(i, j, QTableWidgetItem(val))
+        self.table_model.set_data(df)
 
-        # Auto-resize columns for better viewing
+        # Auto-resize columns for better viewing (only the visible rows are measured)
         self.table.resizeColumnsToContents()
 
-    def export_data(self):
-        if self.all_data is not None:
-            path, _ = QFileDialog.getSaveFileName(self, "Save File", "merged_extensions.xlsx", "Excel Files (*.xlsx)")
-            if path:
+    def filter_ranges(self):
+        """Ranges typed into the filter bar; fields that do not parse are ignored and marked."""
+        def parsed(edit, parse):
+            text = edit.text().strip()
+            value = None
+            if text:
                 try:
-                    self.all_data.to_excel(path, index=False)
-                    QMessageBox.information(self, "Exported", f"Data exported successfully to:\n{path}")
-                    self.statusBar.showMessage(f"Data exported to {path}")
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to export data:\n{e}")
-                    self.statusBar.showMessage("Export failed")
+                    value = parse(text)
+                except argparse.ArgumentTypeError:
+                    pass
+            edit.setStyleSheet("" if not text or value is not None else "border: 1px solid red;")
+            return value
+
+        return {
+            SIZE_COLUMN: (parsed(self.min_size_edit, parse_size), parsed(self.max_size_edit, parse_size)),
+            MODIFIED_COLUMN: (parsed(self.after_edit, parse_date), parsed(self.before_edit, parse_date)),
+        }
+
+    def apply_filter(self):
+        if self.search_index is None:
+            return
+        start = time.perf_counter()
+        rows = self.search_index.search(self.search_edit.text().strip(), self.filter_ranges())
+        self.table_model.set_rows(rows)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.rows_label.setText(f"{len(rows):,} of {self.search_index.num_rows:,} rows ({elapsed_ms:.0f} ms)")
+
+    def export_data(self):
+        if self.all_data is None or self.export_worker is not None:
+            return
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Save File", "merged_extensions.xlsx", EXPORT_FILTERS)
+        if not path:
+            return
+        if os.path.splitext(path)[1].lower() not in EXPORT_FORMATS:
+            # No (known) extension typed: use the one of the chosen file type
+            path += re.search(r'\*(\.\w+)', selected_filter or EXPORT_FILTERS).group(1)
+
+        rows = self.table_model.rows
+        self.export_worker = ExportWorker(self.all_data, rows, path)
+        self.export_worker.progress.connect(self.export_progress)
+        self.export_worker.export_done.connect(self.export_finished)
+        self.export_worker.export_failed.connect(self.export_error)
+        self.export_worker.export_cancelled.connect(self.export_stopped)
+        self.export_btn.setEnabled(False)
+        self.cancel_export_btn.setVisible(True)
+        self.progress_bar.setMaximum(max(len(rows), 1))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.statusBar.showMessage(f"Exporting {len(rows):,} rows to {path}...")
+        self.export_worker.start()
+
+    def cancel_export(self):
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.cancel_export_btn.setEnabled(False)
+            self.statusBar.showMessage("Cancelling export...")
+
+    def export_progress(self, rows_done):
+        self.progress_bar.setValue(rows_done)
+        if rows_done >= self.progress_bar.maximum():
+            self.statusBar.showMessage("Finishing export file...")
+        else:
+            self.statusBar.showMessage(f"Exported {rows_done:,} of {self.progress_bar.maximum():,} rows...")
+
+    def export_ended(self):
+        self.export_worker.wait()
+        self.export_worker = None
+        self.progress_bar.setVisible(False)
+        self.cancel_export_btn.setVisible(False)
+        self.cancel_export_btn.setEnabled(True)
+        self.export_btn.setEnabled(self.all_data is not None)
+
+    def export_finished(self, path, written):
+        self.export_ended()
+        QMessageBox.information(self, "Exported", f"{written:,} rows exported successfully to:\n{path}")
+        self.statusBar.showMessage(f"Data exported to {path}")
+
+    def export_error(self, message):
+        self.export_ended()
+        QMessageBox.critical(self, "Error", f"Failed to export data:\n{message}")
+        self.statusBar.showMessage("Export failed")
+
+    def export_stopped(self):
+        self.export_ended()
+        self.statusBar.showMessage("Export cancelled")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.process_batch import process_and_record
+from UtilityFunctions.scan_core import FileFilter, add_filter_arguments, add_walk_arguments, walk_flags
+from UtilityFunctions.top_files import add_top_arguments, top_flags
+
+# The batch files folder (Seeker_Output/file_batches) doubles as a work queue:
+#
+#   file_batches/batch_1.txt                      waiting
+#   file_batches/claimed/batch_2.txt@node7-4121   being processed by that worker
+#   file_batches/done/batch_3.txt                 processed
+#   file_batches/failed/batch_4.txt               processing raised an error
+#
+# A worker claims a batch by renaming it into claimed/. rename() is atomic on a single
+# file system (including NFS), so when several workers race for the same batch exactly
+# one rename succeeds. Workers touch their claims while processing; a claim that has
+# not been touched for stale_after seconds belongs to a dead worker and is put back.
+# A worker that was only slow may still finish such a batch; both runs write complete
+# files under private temporary names (scan_core.temp_path), and whichever worker holds
+# the claim at the end moves it to done/ or failed/.
+CLAIMED_DIR = 'claimed'
+DONE_DIR = 'done'
+FAILED_DIR = 'failed'
+OWNER_SEPARATOR = '@'
+HEARTBEAT_SECONDS = 60
+DEFAULT_STALE_AFTER = 15 * 60
+
+def worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+def waiting_batches(queue_dir):
+    return sorted(
+        (name for name in os.listdir(queue_dir) if name.startswith('batch_') and name.endswith('.txt')),
+        key=lambda name: int(''.join(filter(str.isdigit, name)) or 0),
+    )
+
+def claimed_batches(queue_dir):
+    claimed_dir = os.path.join(queue_dir, CLAIMED_DIR)
+    return sorted(os.listdir(claimed_dir)) if os.path.isdir(claimed_dir) else []
+
+def reset_queue(queue_dir):
+    """Put claimed, done and failed batches back in the queue."""
+    for state_dir in (CLAIMED_DIR, DONE_DIR, FAILED_DIR):
+        path = os.path.join(queue_dir, state_dir)
+        if not os.path.isdir(path):
+            continue
+        for name in os.listdir(path):
+            os.replace(os.path.join(path, name), os.path.join(queue_dir, name.split(OWNER_SEPARATOR)[0]))
+
+def claim_next(queue_dir, owner):
+    """
+    Claim the next waiting batch.
+
+    Returns:
+        tuple: (batch file name, path of the claimed file), or None if nothing is waiting
+    """
+    claimed_dir = os.path.join(queue_dir, CLAIMED_DIR)
+    os.makedirs(claimed_dir, exist_ok=True)
+    for name in waiting_batches(queue_dir):
+        claimed_path = os.path.join(claimed_dir, f"{name}{OWNER_SEPARATOR}{owner}")
+        try:
+            os.rename(os.path.join(queue_dir, name), claimed_path)
+        except FileNotFoundError:
+            continue  # Another worker claimed it first
+        os.utime(claimed_path)
+        return name, claimed_path
+    return None
+
+def reclaim_stale(queue_dir, stale_after=DEFAULT_STALE_AFTER):
+    """Return claims whose worker stopped sending heartbeats to the queue."""
+    claimed_dir = os.path.join(queue_dir, CLAIMED_DIR)
+    reclaimed = 0
+    now = time.time()
+    for claim in claimed_batches(queue_dir):
+        claimed_path = os.path.join(claimed_dir, claim)
+        try:
+            if now - os.stat(claimed_path).st_mtime < stale_after:
+                continue
+            os.rename(claimed_path, os.path.join(queue_dir, claim.split(OWNER_SEPARATOR)[0]))
+        except FileNotFoundError:
+            continue  # Finished or reclaimed by someone else in the meantime
+        print(f"Reclaimed stale batch {claim}")
+        reclaimed += 1
+    return reclaimed
+
+class Heartbeat(threading.Thread):
+    """Touch a claimed batch file periodically so other workers know it is alive."""
+
+    def __init__(self, path, interval=HEARTBEAT_SECONDS):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                os.utime(self.path)
+            except OSError:
+                return
+
+    def stop(self):
+        self.stopped.set()
+
+def finish(queue_dir, name, claimed_path, state_dir):
+    """
+    Move a claimed batch to state_dir.
+
+    Returns:
+        bool: False if the claim was reclaimed while this worker processed it; the
+        worker that claimed it next records the outcome instead
+    """
+    target_dir = os.path.join(queue_dir, state_dir)
+    os.makedirs(target_dir, exist_ok=True)
+    try:
+        os.replace(claimed_path, os.path.join(target_dir, name))
+    except FileNotFoundError:
+        print(f"Claim {os.path.basename(claimed_path)} was taken over by another worker; leaving {name} to it")
+        return False
+    return True
+
+def run_worker(queue_dir, wait=False, stale_after=DEFAULT_STALE_AFTER, poll_interval=30, **scan_options):
+    """
+    Process batches from queue_dir in this process until none are waiting.
+
+    With wait, the worker then stays until batches claimed by other workers are done,
+    picking up any whose worker died. Outputs go to the folder containing queue_dir.
+
+    Returns:
+        dict: Numbers of batches processed and failed by this worker
+    """
+    owner = worker_id()
+    output_folder = os.path.dirname(os.path.abspath(queue_dir))
+    result = {'processed': 0, 'failed': 0}
+    reclaim_stale(queue_dir, stale_after)
+
+    while True:
+        claim = claim_next(queue_dir, owner)
+        if claim is None:
+            if wait and claimed_batches(queue_dir):
+                time.sleep(poll_interval)
+                reclaim_stale(queue_dir, stale_after)
+                continue
+            break
+
+        name, claimed_path = claim
+        print(f"[{owner}] Processing batch file: {name}")
+        heartbeat = Heartbeat(claimed_path)
+        heartbeat.start()
+        try:
+            process_and_record(claimed_path, output_folder=output_folder,
+                               batch_name=name.replace('.txt', ''), **scan_options)
+        except Exception as e:
+            print(f"[{owner}] ERROR: Failed to process {name}: {e}")
+            if finish(queue_dir, name, claimed_path, FAILED_DIR):
+                result['failed'] += 1
+        else:
+            if finish(queue_dir, name, claimed_path, DONE_DIR):
+                result['processed'] += 1
+        finally:
+            heartbeat.stop()
+
+    print(f"[{owner}] Queue drained: processed {result['processed']} batches, {result['failed']} failed")
+    return result
+
+def submit_workers(config, queue_dir, count, scan_flags=''):
+    """Submit count extra worker jobs draining queue_dir on other nodes."""
+    from UtilityFunctions.slurm_jobs import write_job_script, submit_job
+
+    project_directory = config.get('project_directory', '.')
+    job_ids = []
+    for index in range(count):
+        command = f"python {project_directory}/UtilityFunctions/batch_queue.py work --queue \"{queue_dir}\"{scan_flags}"
+        job_id = submit_job(write_job_script(config, f"batch_worker_{index}", [command]))
+        if job_id is not None:
+            job_ids.append(job_id)
+    print(f"✓ Submitted {len(job_ids)} batch worker jobs")
+    return job_ids
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Process batch files from a shared work queue.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    work_parser = subparsers.add_parser('work', help='Process batches until the queue is empty.')
+    work_parser.add_argument('--queue', type=str, required=True, help='Folder with the batch_*.txt files.')
+    work_parser.add_argument('--wait', action='store_true', help='Wait for batches claimed by other workers.')
+    work_parser.add_argument('--stale-after', type=int, default=DEFAULT_STALE_AFTER,
+                             help='Seconds without heartbeat after which a claim is taken over.')
+    add_walk_arguments(work_parser)
+    work_parser.add_argument('--no-excel', action='store_true', help='Only write the extension-partitioned dataset.')
+    add_filter_arguments(work_parser)
+    add_top_arguments(work_parser)
+
+    submit_parser = subparsers.add_parser('submit-workers', help='Submit extra worker jobs for a queue.')
+    submit_parser.add_argument('--queue', type=str, required=True, help='Folder with the batch_*.txt files.')
+    submit_parser.add_argument('--config', type=str, required=True, help='Path to SLURM configuration JSON file.')
+    submit_parser.add_argument('--count', type=int, required=True, help='Number of worker jobs.')
+    submit_parser.add_argument('--no-excel', action='store_true', help='Pass --no-excel to the workers.')
+    add_walk_arguments(submit_parser)
+    add_filter_arguments(submit_parser)
+    add_top_arguments(submit_parser)
+
+    reset_parser = subparsers.add_parser('reset', help='Put claimed, done and failed batches back in the queue.')
+    reset_parser.add_argument('--queue', type=str, required=True, help='Folder with the batch_*.txt files.')
+
+    args = parser.parse_args()
+
+    if args.command == 'work':
+        result = run_worker(args.queue, wait=args.wait, stale_after=args.stale_after,
+                            hardlinks=args.hardlinks, follow_symlinks=args.follow_symlinks,
+                            one_file_system=args.one_file_system, excel=not args.no_excel,
+                            file_filter=FileFilter.from_options(args),
+                            top_n=args.top_n, top_only=args.top_only)
+        sys.exit(1 if result['failed'] else 0)
+    elif args.command == 'submit-workers':
+        with open(args.config, 'r') as config_file:
+            config = json.load(config_file)
+        scan_flags = ((' --no-excel' if args.no_excel else '') + walk_flags(args) + FileFilter.from_options(args).shell_args()
+                      + top_flags(args.top_n, args.top_only))
+        submit_workers(config, args.queue, args.count, scan_flags)
+    else:
+        reset_queue(args.queue)
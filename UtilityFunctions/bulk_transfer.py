@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import errno
+import shutil
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+
+# Transfers run in two steps. build_plan() decides what happens to every file
+# without touching any data: sources on the destination's device are renamed, the
+# rest are copied (and the source removed when moving). run_plan() then does all
+# renames immediately and copies in a bounded thread pool using the kernel copy
+# paths (copy_file_range, then sendfile), which release the GIL while copying.
+#
+# Every finished transfer is appended to a journal in the destination folder. A
+# rerun skips journaled files and resumes interrupted copies from their ".part"
+# file, so an aborted transfer of large videos does not start over.
+JOURNAL_FILE_NAME = '.transfer_journal.jsonl'
+PART_SUFFIX = '.part'
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+FALLBACK_BUFFER_SIZE = 8 * 1024 * 1024
+
+@dataclass
+class Transfer:
+    src: str
+    dest: str
+    size: int
+    rename: bool
+
+def build_plan(sources, dest_dir, keyword='', replacement='', mode='move'):
+    """
+    Plan the transfer of each source file into dest_dir.
+
+    Sources are paths, or (path, size) pairs from a scan index; for those only the
+    source directory is stat'ed (once per directory) to find its device. The file
+    name has keyword replaced by replacement. Sources whose new name is already
+    taken by an earlier source are skipped with a warning.
+
+    Returns:
+        list: Transfer entries; renames are only planned when moving within a device
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    dest_device = os.stat(dest_dir).st_dev
+    directory_devices = {}
+    plan = []
+    planned = set()
+    for source in sources:
+        src, size = source if isinstance(source, tuple) else (source, None)
+        directory = os.path.dirname(src)
+        try:
+            if size is None:
+                stats = os.stat(src)
+                size = stats.st_size
+                directory_devices.setdefault(directory, stats.st_dev)
+            elif directory not in directory_devices:
+                directory_devices[directory] = os.stat(directory).st_dev
+        except OSError as e:
+            print(f"✗ Skipping {src}: {e}")
+            continue
+        new_name = os.path.basename(src).replace(keyword, replacement) if keyword else os.path.basename(src)
+        dest = os.path.join(dest_dir, new_name)
+        if dest in planned:
+            print(f"✗ Skipping {src}: {new_name} is already planned from another file")
+            continue
+        planned.add(dest)
+        plan.append(Transfer(src, dest, size, mode == 'move' and directory_devices[directory] == dest_device))
+    return plan
+
+def load_journal(dest_dir):
+    """Destinations recorded as finished by earlier runs."""
+    journal_path = os.path.join(dest_dir, JOURNAL_FILE_NAME)
+    done = set()
+    if os.path.exists(journal_path):
+        with open(journal_path, 'r') as journal:
+            for line in journal:
+                try:
+                    done.add(json.loads(line)['dest'])
+                except (ValueError, KeyError):
+                    continue  # A line cut short by an interrupted run
+    return done
+
+class Journal:
+    """Thread-safe append-only record of finished transfers."""
+
+    def __init__(self, dest_dir):
+        self.path = os.path.join(dest_dir, JOURNAL_FILE_NAME)
+        self.lock = threading.Lock()
+
+    def record(self, transfer, action):
+        entry = json.dumps({'src': transfer.src, 'dest': transfer.dest, 'size': transfer.size,
+                            'action': action, 'time': time.time()})
+        with self.lock, open(self.path, 'a') as journal:
+            journal.write(entry + '\n')
+
+def _copy_range(src_fd, dest_fd, offset, size, progress):
+    """Copy with copy_file_range, falling back to sendfile and then a buffered read/write."""
+    copied = offset
+    use_copy_file_range = hasattr(os, 'copy_file_range')
+    use_sendfile = hasattr(os, 'sendfile')
+    while copied < size:
+        count = min(COPY_CHUNK_SIZE, size - copied)
+        sent = None
+        if use_copy_file_range:
+            try:
+                sent = os.copy_file_range(src_fd, dest_fd, count, copied, copied)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                use_copy_file_range = False
+        if sent is None and use_sendfile:
+            try:
+                os.lseek(dest_fd, copied, os.SEEK_SET)
+                sent = os.sendfile(dest_fd, src_fd, copied, count)
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                use_sendfile = False
+        if sent is None:
+            os.lseek(src_fd, copied, os.SEEK_SET)
+            os.lseek(dest_fd, copied, os.SEEK_SET)
+            data = os.read(src_fd, min(count, FALLBACK_BUFFER_SIZE))
+            sent = os.write(dest_fd, data) if data else 0
+        if sent == 0:
+            break  # Source shrank while copying
+        copied += sent
+        progress(sent)
+    return copied
+
+def copy_file(transfer, progress=lambda nbytes: None):
+    """
+    Copy transfer.src to transfer.dest through a ".part" file, resuming a previous part.
+
+    Returns:
+        int: Bytes copied by this call
+    """
+    part_path = transfer.dest + PART_SUFFIX
+    src_fd = os.open(transfer.src, os.O_RDONLY)
+    try:
+        # The planned size may come from an older scan; copy what is there now
+        size = os.fstat(src_fd).st_size
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset > size:
+            offset = 0
+        if offset:
+            progress(offset)
+        dest_fd = os.open(part_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(dest_fd, offset)
+            copied = _copy_range(src_fd, dest_fd, offset, size, progress)
+        finally:
+            os.close(dest_fd)
+    finally:
+        os.close(src_fd)
+
+    if copied != size:
+        raise OSError(f"copied {copied} of {size} bytes")
+    shutil.copystat(transfer.src, part_path)
+    os.replace(part_path, transfer.dest)
+    return copied - offset
+
+def run_plan(plan, dest_dir, mode='move', workers=4, dry_run=False):
+    """
+    Execute a transfer plan: renames first, then copies in a pool of workers.
+
+    Returns:
+        dict: Counts of renamed, copied, skipped and failed files and the bytes copied
+    """
+    done = load_journal(dest_dir)
+    pending = [transfer for transfer in plan if transfer.dest not in done]
+    renames = [transfer for transfer in pending if transfer.rename]
+    copies = [transfer for transfer in pending if not transfer.rename]
+    copy_bytes = sum(transfer.size for transfer in copies)
+    result = {'renamed': 0, 'copied': 0, 'skipped': len(plan) - len(pending), 'failed': 0, 'bytes': 0}
+
+    print(f"Plan: {len(renames)} renames, {len(copies)} copies ({copy_bytes} bytes), "
+          f"{result['skipped']} already done")
+    if dry_run:
+        for transfer in renames:
+            print(f"rename {transfer.src} -> {transfer.dest}")
+        for transfer in copies:
+            print(f"{mode} {transfer.src} -> {transfer.dest} ({transfer.size} bytes)")
+        return result
+
+    journal = Journal(dest_dir)
+    for transfer in renames:
+        try:
+            os.rename(transfer.src, transfer.dest)
+        except OSError as e:
+            print(f"✗ Failed to rename {transfer.src}: {e}")
+            result['failed'] += 1
+            continue
+        journal.record(transfer, 'rename')
+        result['renamed'] += 1
+
+    start = time.monotonic()
+    with tqdm(total=copy_bytes, desc="Copying", unit="B", unit_scale=True, unit_divisor=1024) as bar:
+        lock = threading.Lock()
+
+        def progress(nbytes):
+            with lock:
+                bar.update(nbytes)
+
+        def transfer_one(transfer):
+            copied = copy_file(transfer, progress)
+            if mode == 'move':
+                os.remove(transfer.src)
+            journal.record(transfer, mode)
+            return copied
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(transfer_one, transfer): transfer for transfer in copies}
+            for future in as_completed(futures):
+                try:
+                    result['bytes'] += future.result()
+                    result['copied'] += 1
+                except OSError as e:
+                    print(f"✗ Failed to {mode} {futures[future].src}: {e}")
+                    result['failed'] += 1
+    elapsed = time.monotonic() - start
+
+    if copies:
+        rate = result['bytes'] / elapsed / 1024 ** 2 if elapsed > 0 else 0.0
+        print(f"Copied {result['bytes']} bytes in {elapsed:.1f}s ({rate:.1f} MB/s)")
+    print(f"Renamed: {result['renamed']}, copied: {result['copied']}, "
+          f"skipped: {result['skipped']}, failed: {result['failed']}")
+    return result
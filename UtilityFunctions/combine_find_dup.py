@@ -1,9 +1,17 @@
 import os
+import sys
 import pandas as pd
 import glob
 from tqdm import tqdm
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.excel_export import write_excel_sheets, extension_sheet_name
+
+def extension_sheets(first_sheet_name, df):
+    """Yield the sheets of a combined workbook: all rows first, then one sheet per extension."""
+    yield first_sheet_name, df
+    for ext, group in df.groupby('File Extension'):
+        yield extension_sheet_name(ext), group
 
 def combine_csv_files(input_dir, output_csv, output_excel):
     all_files = glob.glob(os.path.join(input_dir, "*.csv"))
@@ -24,23 +32,7 @@ def combine_csv_files(input_dir, output_csv, output_excel):
     print(f"Combined CSV file saved as: {output_csv}")
 
     # Save as Excel with sheets for each extension
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
-
-    # Add 'All Files' sheet
-    ws = wb.create_sheet("All Files")
-    for r in dataframe_to_rows(combined_df, index=False, header=True):
-        ws.append(r)
-
-    # Add sheets for each extension
-    for ext, group in combined_df.groupby('File Extension'):
-        sheet_name = ext.strip('.') if ext else 'No Extension'
-        sheet_name = sheet_name[:31]  # Excel sheet names have a 31 character limit
-        ws = wb.create_sheet(sheet_name)
-        for r in dataframe_to_rows(group, index=False, header=True):
-            ws.append(r)
-
-    wb.save(output_excel)
+    write_excel_sheets(output_excel, extension_sheets("All Files", combined_df))
     print(f"Combined Excel file saved as: {output_excel}")
 
     return combined_df
@@ -57,23 +49,7 @@ def save_duplicates(duplicates_df, output_csv, output_excel):
     print(f"Duplicates CSV file saved as: {output_csv}")
 
     # Save as Excel with sheets for each extension
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
-
-    # Add 'All Duplicates' sheet
-    ws = wb.create_sheet("All Duplicates")
-    for r in dataframe_to_rows(duplicates_df, index=False, header=True):
-        ws.append(r)
-
-    # Add sheets for each extension
-    for ext, group in duplicates_df.groupby('File Extension'):
-        sheet_name = ext.strip('.') if ext else 'No Extension'
-        sheet_name = sheet_name[:31]  # Excel sheet names have a 31 character limit
-        ws = wb.create_sheet(sheet_name)
-        for r in dataframe_to_rows(group, index=False, header=True):
-            ws.append(r)
-
-    wb.save(output_excel)
+    write_excel_sheets(output_excel, extension_sheets("All Duplicates", duplicates_df))
     print(f"Duplicates Excel file saved as: {output_excel}")
 
 if __name__ == '__main__':
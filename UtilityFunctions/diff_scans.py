@@ -0,0 +1,231 @@
+import os
+import sys
+import math
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import partition_files, with_file_paths
+from UtilityFunctions.query_results import find_dataset_dir
+
+# Two snapshots are compared out of core in two passes:
+#   1. Both datasets are streamed once and every row is written to one of N bucket
+#      files chosen by hashing its directory, so a bucket holds whole directories
+#      and matching paths of both snapshots land in the same bucket.
+#   2. Each bucket pair is joined on (Directory, File Name) in memory (a pandas hash
+#      join), producing the changed files and per-directory byte deltas.
+# A bucket holds whole directories, so memory is bounded by the larger of
+# rows_per_bucket and the largest directory, not by a fixed chunk of rows.
+DIFF_COLUMNS = ['Directory', 'File Name', 'File Size', 'Modified Time']
+KEY_COLUMNS = ['Directory', 'File Name']
+DEFAULT_ROWS_PER_BUCKET = 2000000
+
+def count_rows(files):
+    """Total number of rows from the Parquet footers, without reading any data."""
+    return sum(pq.ParquetFile(path).metadata.num_rows for path in files)
+
+def bucket_dataset(files, bucket_dir, num_buckets, batch_size=262144):
+    """Stream a dataset into num_buckets Parquet files partitioned by directory hash."""
+    os.makedirs(bucket_dir, exist_ok=True)
+    schema = pa.schema([
+        ('Directory', pa.string()), ('File Name', pa.string()),
+        ('File Size', pa.int64()), ('Modified Time', pa.timestamp('ns')),
+    ])
+    writers = {}
+    try:
+        for path in tqdm(files, desc=f"Bucketing {os.path.basename(bucket_dir)}", unit="files"):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=DIFF_COLUMNS):
+                directories = batch.column('Directory')
+                if not pa.types.is_dictionary(directories.type):
+                    directories = pc.dictionary_encode(directories)
+                # Hash each distinct directory once, then spread the buckets to the rows
+                dictionary = directories.dictionary.to_numpy(zero_copy_only=False).astype(object)
+                dictionary_buckets = pd.util.hash_array(dictionary) % num_buckets
+                row_buckets = dictionary_buckets[directories.indices.to_numpy(zero_copy_only=False)]
+
+                table = pa.table([
+                    directories.dictionary_decode(),
+                    batch.column('File Name').cast(pa.string()),
+                    batch.column('File Size').cast(pa.int64()),
+                    batch.column('Modified Time').cast(pa.timestamp('ns')),
+                ], schema=schema)
+                for bucket in np.unique(row_buckets):
+                    if bucket not in writers:
+                        writers[bucket] = pq.ParquetWriter(os.path.join(bucket_dir, f"bucket_{bucket}.parquet"), schema)
+                    writers[bucket].write_table(table.filter(pa.array(row_buckets == bucket)))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+def read_bucket(bucket_dir, bucket):
+    path = os.path.join(bucket_dir, f"bucket_{bucket}.parquet")
+    if not os.path.exists(path):
+        return pd.DataFrame({
+            'Directory': pd.Series(dtype=object), 'File Name': pd.Series(dtype=object),
+            'File Size': pd.Series(dtype='int64'), 'Modified Time': pd.Series(dtype='datetime64[ns]'),
+        })
+    return pq.read_table(path).to_pandas()
+
+def diff_bucket(old, new):
+    """
+    Join one bucket of both snapshots on (Directory, File Name).
+
+    A path listed more than once in a snapshot (e.g. a folder scanned twice) is kept
+    once, so every path joins one-to-one.
+
+    Returns:
+        tuple: (changes DataFrame, per-directory deltas DataFrame, duplicate rows dropped)
+    """
+    old_rows, new_rows = len(old), len(new)
+    old = old.drop_duplicates(KEY_COLUMNS)
+    new = new.drop_duplicates(KEY_COLUMNS)
+    duplicates = old_rows - len(old) + new_rows - len(new)
+    merged = old.merge(new, on=KEY_COLUMNS, how='outer', suffixes=(' Old', ' New'), indicator=True,
+                       validate='one_to_one')
+
+    in_old = merged['_merge'] != 'right_only'
+    in_new = merged['_merge'] != 'left_only'
+    size_old = merged['File Size Old'].fillna(0).astype('int64')
+    size_new = merged['File Size New'].fillna(0).astype('int64')
+    modified = in_old & in_new & (merged['Modified Time Old'] != merged['Modified Time New'])
+
+    status = np.select(
+        [~in_old, ~in_new, in_old & in_new & (size_new > size_old), in_old & in_new & (size_new < size_old), modified],
+        ['added', 'removed', 'grown', 'shrunk', 'modified'],
+        default='',
+    )
+    merged['Status'] = status
+    merged['Delta Bytes'] = size_new - size_old
+
+    merged['Files Added'] = ~in_old
+    merged['Files Removed'] = ~in_new
+    merged['Files Changed'] = in_old & in_new & (status != '')
+    merged['Bytes Old'] = size_old
+    merged['Bytes New'] = size_new
+    directory_deltas = merged.groupby('Directory').agg({
+        'Files Added': 'sum', 'Files Removed': 'sum', 'Files Changed': 'sum',
+        'Bytes Old': 'sum', 'Bytes New': 'sum', 'Delta Bytes': 'sum',
+    }).reset_index()
+    directory_deltas = directory_deltas[
+        (directory_deltas[['Files Added', 'Files Removed', 'Files Changed']].sum(axis=1) > 0)
+        | (directory_deltas['Delta Bytes'] != 0)
+    ]
+
+    changes = merged[status != ''][[
+        'Status', 'Directory', 'File Name', 'File Size Old', 'File Size New', 'Delta Bytes',
+        'Modified Time Old', 'Modified Time New',
+    ]]
+    # Nullable sizes keep the column types identical in every bucket
+    changes = changes.astype({'File Size Old': 'Int64', 'File Size New': 'Int64'})
+    changes = with_file_paths(changes)
+    changes = changes[['Status', 'File Path', 'File Name', 'File Size Old', 'File Size New', 'Delta Bytes',
+                       'Modified Time Old', 'Modified Time New']]
+    return changes, directory_deltas, duplicates
+
+class TableWriter:
+    """Append DataFrames to a Parquet or CSV file as they are produced, all with the first one's schema."""
+
+    def __init__(self, path, output_format):
+        self.path = path
+        self.output_format = output_format
+        self.writer = None
+        self.schema = None
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            if self.output_format == 'csv':
+                self.writer = pa_csv.CSVWriter(self.path, self.schema)
+            else:
+                self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def diff_scans(old_dataset_dir, new_dataset_dir, output_dir, output_format='parquet',
+               rows_per_bucket=DEFAULT_ROWS_PER_BUCKET):
+    """
+    Compare two scan datasets and write the changed files and per-directory deltas.
+
+    Memory use is bounded by one bucket of each snapshot: about rows_per_bucket rows,
+    or more when a single directory holds more files than that.
+
+    Returns:
+        dict: Counts of added/removed/changed files and the total byte delta
+    """
+    old_files = partition_files(old_dataset_dir)
+    new_files = partition_files(new_dataset_dir)
+    total_rows = max(count_rows(old_files), count_rows(new_files))
+    num_buckets = max(1, math.ceil(total_rows / rows_per_bucket))
+    print(f"Comparing snapshots using {num_buckets} buckets...")
+
+    os.makedirs(output_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='seeker_diff_', dir=output_dir)
+    extension = 'csv' if output_format == 'csv' else 'parquet'
+    changes_writer = TableWriter(os.path.join(output_dir, f"changes.{extension}"), output_format)
+    directory_writer = TableWriter(os.path.join(output_dir, f"directory_deltas.{extension}"), output_format)
+    totals = {'added': 0, 'removed': 0, 'grown': 0, 'shrunk': 0, 'modified': 0, 'delta_bytes': 0,
+              'duplicates': 0}
+    try:
+        bucket_dataset(old_files, os.path.join(work_dir, 'old'), num_buckets)
+        bucket_dataset(new_files, os.path.join(work_dir, 'new'), num_buckets)
+
+        for bucket in tqdm(range(num_buckets), desc="Comparing buckets", unit="buckets"):
+            changes, directory_deltas, duplicates = diff_bucket(
+                read_bucket(os.path.join(work_dir, 'old'), bucket),
+                read_bucket(os.path.join(work_dir, 'new'), bucket),
+            )
+            totals['duplicates'] += duplicates
+            if not changes.empty:
+                changes_writer.write(changes)
+                for status, count in changes['Status'].value_counts().items():
+                    totals[status] += int(count)
+            if not directory_deltas.empty:
+                directory_writer.write(directory_deltas)
+                totals['delta_bytes'] += int(directory_deltas['Delta Bytes'].sum())
+    finally:
+        changes_writer.close()
+        directory_writer.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"Added: {totals['added']}, removed: {totals['removed']}, grown: {totals['grown']}, "
+          f"shrunk: {totals['shrunk']}, modified: {totals['modified']}")
+    print(f"Net change: {totals['delta_bytes']} bytes")
+    if totals['duplicates']:
+        print(f"Ignored {totals['duplicates']} rows repeating a path already listed in the same scan.")
+    print(f"Diff saved in: {output_dir}")
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='seeker.py diff', description='Compare two Seeker scans of the same folders.')
+    parser.add_argument('old', help='Seeker_Output folder of the earlier scan.')
+    parser.add_argument('new', help='Seeker_Output folder of the later scan.')
+    parser.add_argument('--output', required=True, help='Folder for changes and directory_deltas files.')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet', help='Output file format.')
+    parser.add_argument('--rows-per-bucket', type=int, default=DEFAULT_ROWS_PER_BUCKET,
+                        help='Rows of each snapshot held in memory at a time.')
+    args = parser.parse_args(argv)
+
+    old_dataset_dir = find_dataset_dir(args.old)
+    new_dataset_dir = find_dataset_dir(args.new)
+    for folder, dataset_dir in ((args.old, old_dataset_dir), (args.new, new_dataset_dir)):
+        if dataset_dir is None:
+            print(f"Error: No scan dataset found in '{folder}'.", file=sys.stderr)
+            return 1
+
+    diff_scans(old_dataset_dir, new_dataset_dir, args.output, args.format, args.rows_per_bucket)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
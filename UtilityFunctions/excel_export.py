@@ -0,0 +1,96 @@
+import re
+import pandas as pd
+from openpyxl import Workbook
+
+# Excel's hard limits per worksheet
+EXCEL_MAX_ROWS = 1048576
+SHEET_NAME_MAX_LENGTH = 31
+
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+CONTINUATION_SUFFIX = re.compile(r' \((\d+)\)$')
+
+def extension_sheet_name(ext_name):
+    """Return a valid Excel sheet name for a file extension."""
+    if not ext_name or ext_name == '.':
+        return 'No Extension'
+    # Remove the dot, characters Excel rejects, and limit length
+    sheet_name = INVALID_SHEET_CHARS.sub('_', ext_name.strip('.'))[:SHEET_NAME_MAX_LENGTH]
+    return sheet_name or 'Unknown'
+
+def continuation_sheet_name(sheet_name, part):
+    """Name of the part-th sheet holding rows for sheet_name, e.g. 'All Files (2)'."""
+    if part == 1:
+        return sheet_name[:SHEET_NAME_MAX_LENGTH]
+    suffix = f" ({part})"
+    return sheet_name[:SHEET_NAME_MAX_LENGTH - len(suffix)] + suffix
+
+def base_sheet_name(sheet_name):
+    """Strip a continuation suffix, mapping 'tif (2)' back to 'tif'."""
+    return CONTINUATION_SUFFIX.sub('', sheet_name)
+
+def _excel_rows(df, chunk_rows):
+    """Yield the rows of df as tuples with missing values turned into empty cells."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+def write_excel_sheets(output_excel, sheets, max_rows=EXCEL_MAX_ROWS, chunk_rows=100000):
+    """
+    Stream DataFrames into a workbook using openpyxl's write-only mode.
+
+    Rows are written straight to disk, so memory stays constant regardless of the
+    number of rows. Sheets that reach max_rows (header included) continue on
+    'Name (2)', 'Name (3)', ... sheets.
+
+    Args:
+        output_excel (str): Path of the .xlsx file to write
+        sheets (iterable): (sheet_name, DataFrame or iterable of DataFrames) pairs
+        max_rows (int): Maximum number of rows per sheet, including the header
+        chunk_rows (int): Number of rows converted at a time
+
+    Returns:
+        list: Names of the sheets created
+    """
+    wb = Workbook(write_only=True)
+    created = []
+    try:
+        _append_sheets(wb, sheets, created, max_rows, chunk_rows)
+    except BaseException:
+        # Close the sheets' temporary files when the input stops early (e.g. a cancelled export)
+        for ws in wb.worksheets:
+            ws.close()
+        raise
+
+    if not created:
+        # A workbook needs at least one sheet to be valid
+        wb.create_sheet('Empty')
+
+    wb.save(output_excel)
+    return created
+
+def _append_sheets(wb, sheets, created, max_rows, chunk_rows):
+    for sheet_name, frames in sheets:
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+
+        ws = None
+        part = 0
+        rows_in_sheet = 0
+        for df in frames:
+            header = [str(column) for column in df.columns]
+            if ws is None:
+                part += 1
+                ws = wb.create_sheet(continuation_sheet_name(sheet_name, part))
+                created.append(ws.title)
+                ws.append(header)
+                rows_in_sheet = 1
+            for row in _excel_rows(df, chunk_rows):
+                if rows_in_sheet >= max_rows:
+                    part += 1
+                    ws = wb.create_sheet(continuation_sheet_name(sheet_name, part))
+                    created.append(ws.title)
+                    ws.append(header)
+                    rows_in_sheet = 1
+                ws.append(row)
+                rows_in_sheet += 1
@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# Measures what a batch process pays before it touches the file system: interpreter
+# start-up plus the module-level imports of the scan entry point. Run it after changing
+# imports in the scan path, and use --max-ms to fail when start-up regresses.
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ['UtilityFunctions.scan_core', 'UtilityFunctions.process_batch']
+IMPORT_TIME_LINE = re.compile(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)')
+
+def measure_import(module, repeat=5):
+    """
+    Import module in fresh interpreters with -X importtime.
+
+    Returns:
+        dict: Best wall-clock start-up time, the module's cumulative import time and
+        the slowest top-level imports of the fastest run, all in milliseconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+            cwd=PROJECT_DIRECTORY, capture_output=True, text=True, check=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        imports = {}
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match:
+                cumulative_us, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+                imports[name] = (cumulative_us / 1000, indent)
+        if best is None or wall_ms < best['wall_ms']:
+            top_level = min((indent for _, indent in imports.values()), default=0)
+            heaviest = sorted(
+                ((name, ms) for name, (ms, indent) in imports.items() if indent == top_level + 2 or name == module),
+                key=lambda item: item[1], reverse=True,
+            )
+            best = {
+                'module': module,
+                'wall_ms': round(wall_ms, 1),
+                'import_ms': round(imports.get(module, (0, 0))[0], 1),
+                'heaviest': [{'module': name, 'ms': round(ms, 1)} for name, ms in heaviest[:10]],
+                'loaded_pandas': 'pandas' in imports,
+            }
+    return best
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the start-up cost of the scan entry points.')
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help='Modules to import.')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module (best is kept).')
+    parser.add_argument('--max-ms', type=float, help='Fail if any module takes longer than this to import.')
+    parser.add_argument('--record', type=str, help='Append the results as JSON lines to this file.')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        print(f"{module}: {result['import_ms']} ms import, {result['wall_ms']} ms start-up"
+              f"{' (loads pandas)' if result['loaded_pandas'] else ''}")
+        for entry in result['heaviest'][1:6]:
+            print(f"  {entry['module']}: {entry['ms']} ms")
+        if args.record:
+            with open(args.record, 'a') as record_file:
+                record_file.write(json.dumps(dict(result, recorded=time.time())) + '\n')
+        if args.max_ms is not None and result['import_ms'] > args.max_ms:
+            print(f"✗ {module} imports in {result['import_ms']} ms (limit {args.max_ms} ms)")
+            failed = True
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# A cluster-wide budget for the metadata calls (stat, readdir) of every scan process.
+# All processes share one token bucket kept in a JSON state file on the shared
+# filesystem, e.g.
+#   {"max_rate": 20000, "rate": 14000, "tokens": -350.0, "updated": 1760000000.0,
+#    "latency": 0.0031, "baseline": 0.0012, "adjusted": 1759999998.2}
+# A process takes CLAIM_SECONDS worth of tokens at a time under a POSIX lock (which
+# also makes the NFS client re-read the file), so the file is locked about
+# 1 / CLAIM_SECONDS times per second however many processes share it. Claims may
+# take the bucket below zero; the claiming process then sleeps until its share is
+# paid back, which queues processes in claim order at the shared rate.
+#
+# Processes also report the stat latency they measured. When the shared average rises
+# above SLOW_FACTOR times the best seen, the rate is cut by BACKOFF; while it stays
+# low the rate grows back towards max_rate by RECOVERY of it per ADJUST_SECONDS.
+BUDGET_ENV_VAR = 'SEEKER_MAX_METADATA_OPS'
+BUDGET_FILE_ENV_VAR = 'SEEKER_IO_BUDGET_FILE'
+BUDGET_FILE_NAME = 'io_budget.json'
+
+CLAIM_SECONDS = 0.1
+BURST_SECONDS = 1.0
+ADJUST_SECONDS = 5.0
+SLOW_FACTOR = 2.0
+# Stats faster than this are never taken as a sign of an overloaded filer
+SLOW_FLOOR_SECONDS = 0.002
+BACKOFF = 0.7
+RECOVERY = 0.05
+MIN_RATE_FRACTION = 0.05
+LATENCY_WEIGHT = 0.2
+# A state file untouched for this long is from an earlier run and starts over
+STALE_SECONDS = 600
+
+def budget_environment(max_ops, state_file):
+    """Environment variables that make scan processes share a budget of max_ops per second."""
+    return {BUDGET_ENV_VAR: str(int(max_ops)), BUDGET_FILE_ENV_VAR: os.path.abspath(state_file)}
+
+def governor_from_environment():
+    """The MetadataGovernor set up by $SEEKER_MAX_METADATA_OPS, or None without a budget."""
+    max_ops = os.environ.get(BUDGET_ENV_VAR)
+    state_file = os.environ.get(BUDGET_FILE_ENV_VAR)
+    if not max_ops or not state_file:
+        return None
+    try:
+        max_ops = float(max_ops)
+    except ValueError:
+        print(f"Ignoring invalid {BUDGET_ENV_VAR}: {max_ops}")
+        return None
+    return MetadataGovernor(max_ops, state_file) if max_ops > 0 else None
+
+class MetadataGovernor:
+    """
+    Paces this process's metadata calls to its share of a budget shared through state_file.
+
+    Scans call stat()/scandir()/entry_stat() instead of the os functions, or spend()
+    for calls made elsewhere (e.g. by os.walk, see walk()).
+
+    Args:
+        max_ops (float): Metadata operations per second allowed across all processes
+        state_file (str): Bucket state on a filesystem every process can lock
+    """
+
+    def __init__(self, max_ops, state_file):
+        self.max_ops = float(max_ops)
+        self.state_file = state_file
+        self.ops = 0
+        self.throttled_seconds = 0.0
+        self._allowance = 0
+        self._latency_total = 0.0
+        self._latency_count = 0
+        # Used when the state file cannot be locked: the budget is then enforced per process
+        self._local_state = self._fresh_state(time.time()) if fcntl is None else None
+
+    def spend(self, n=1):
+        self.ops += n
+        self._allowance -= n
+        if self._allowance < 0:
+            self._claim()
+
+    def observe(self, seconds):
+        """Record the latency of one metadata call."""
+        self._latency_total += seconds
+        self._latency_count += 1
+
+    def stat(self, path):
+        self.spend()
+        start = time.perf_counter()
+        try:
+            return os.stat(path)
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def entry_stat(self, entry):
+        self.spend()
+        start = time.perf_counter()
+        try:
+            return entry.stat()
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def scandir(self, path):
+        self.spend()
+        return os.scandir(path)
+
+    def walk(self, top, **kwargs):
+        """os.walk() paying one operation per directory listed."""
+        for item in os.walk(top, **kwargs):
+            self.spend()
+            yield item
+
+    def measurements(self):
+        """Counters for the job's throughput record (see resource_model.record_run)."""
+        return {'metadata_ops': self.ops, 'throttle_seconds': round(self.throttled_seconds, 3)}
+
+    def _fresh_state(self, now):
+        return {'max_rate': self.max_ops, 'rate': self.max_ops, 'tokens': self.max_ops * BURST_SECONDS,
+                'updated': now, 'latency': None, 'baseline': None, 'adjusted': now}
+
+    def _read_state(self, fd, now):
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        try:
+            state = json.loads(b''.join(chunks))
+        except ValueError:  # new or damaged file
+            state = None
+        if (not isinstance(state, dict) or state.get('max_rate') != self.max_ops
+                or now - state.get('updated', 0) > STALE_SECONDS):
+            state = self._fresh_state(now)
+        return state
+
+    @contextmanager
+    def _locked_state(self, now):
+        """The bucket state, written back when the block exits."""
+        fd = None
+        if self._local_state is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+                fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o666)
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            except OSError as e:
+                if fd is not None:
+                    os.close(fd)
+                    fd = None
+                print(f"Could not lock the metadata budget {self.state_file} ({e}); pacing this process alone.")
+                self._local_state = self._fresh_state(now)
+        if fd is None:
+            yield self._local_state
+            return
+        # Any close of the file in this process drops the lock, so fd is the only handle
+        try:
+            state = self._read_state(fd, now)
+            yield state
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(state).encode())
+        finally:
+            os.close(fd)
+
+    def _claim(self):
+        latency = self._latency_total / self._latency_count if self._latency_count else None
+        self._latency_total = 0.0
+        self._latency_count = 0
+        now = time.time()
+        with self._locked_state(now) as state:
+            rate = state['rate']
+            # Clocks of different nodes are not exactly in step; never refill backwards
+            elapsed = max(0.0, now - state['updated'])
+            state['tokens'] = min(rate * BURST_SECONDS, state['tokens'] + elapsed * rate)
+            state['updated'] = max(now, state['updated'])
+            if latency is not None:
+                self._adapt(state, latency, now)
+            chunk = max(1, int(state['rate'] * CLAIM_SECONDS))
+            state['tokens'] -= chunk
+            wait = -state['tokens'] / state['rate'] if state['tokens'] < 0 else 0.0
+        self._allowance += chunk
+        if wait > 0:
+            time.sleep(wait)
+            self.throttled_seconds += wait
+
+    def _adapt(self, state, latency, now):
+        """Fold this process's latency into the shared average and adjust the rate."""
+        average = state['latency']
+        average = latency if average is None else average + LATENCY_WEIGHT * (latency - average)
+        state['latency'] = average
+        if state['baseline'] is None or average < state['baseline']:
+            state['baseline'] = average
+        if now - state['adjusted'] < ADJUST_SECONDS:
+            return
+        state['adjusted'] = now
+        if average > max(SLOW_FACTOR * state['baseline'], SLOW_FLOOR_SECONDS):
+            state['rate'] = max(self.max_ops * MIN_RATE_FRACTION, state['rate'] * BACKOFF)
+        else:
+            state['rate'] = min(self.max_ops, state['rate'] + self.max_ops * RECOVERY)
@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.schedulers import ACTIVE_STATES, SUCCESS_STATE
+from UtilityFunctions.slurm_jobs import (
+    parse_slurm_time, format_slurm_time, parse_slurm_memory, format_slurm_memory
+)
+
+# How the supervisor reacts to a job that ended without COMPLETED:
+#   TIMEOUT        - resubmit with twice the time, up to max_time, then split the work
+#   OUT_OF_MEMORY  - resubmit with twice the memory, up to max_mem, then split the work
+#   NODE_FAIL etc. - resubmit unchanged (the job was not at fault)
+#   LOST           - the scheduler stopped reporting the job (e.g. purged from sacct);
+#                    resubmitted unchanged like NODE_FAIL
+#   anything else  - FAILED or CANCELLED jobs are reported and not retried
+RETRY_STATES = {'NODE_FAIL', 'PREEMPTED', 'BOOT_FAIL', 'LOST'}
+# Consecutive polls without any state after which a job counts as LOST
+MAX_MISSING_POLLS = 5
+
+@dataclass
+class WorkItem:
+    """
+    A unit of work submitted as one job.
+
+    write_script(config) writes the job script for the given config (whose time and
+    mem may have been raised) and returns its path. split(config), if set, returns
+    smaller WorkItems doing the same work, for when more resources are not enough.
+    """
+    name: str
+    write_script: Callable[[dict], Optional[str]]
+    config: dict
+    split: Optional[Callable[[dict], List['WorkItem']]] = None
+    attempts: int = 0
+    job_id: Optional[str] = None
+    state: Optional[str] = None
+    history: list = field(default_factory=list)
+    missing_polls: int = 0
+
+class JobSupervisor:
+    """Track submitted work items until they complete, recovering failed jobs on the way."""
+
+    def __init__(self, scheduler, max_resubmits=3, poll_interval=60, max_time=None, max_mem=None,
+                 max_missing_polls=MAX_MISSING_POLLS):
+        self.scheduler = scheduler
+        self.max_missing_polls = max_missing_polls
+        self.max_resubmits = max_resubmits
+        self.poll_interval = poll_interval
+        self.max_time = parse_slurm_time(max_time) if max_time else None
+        self.max_mem = parse_slurm_memory(max_mem) if max_mem else None
+
+    @classmethod
+    def from_config(cls, scheduler, config, poll_interval=60):
+        return cls(scheduler, max_resubmits=config.get('max_resubmits', 3), poll_interval=poll_interval,
+                   max_time=config.get('max_time'), max_mem=config.get('max_mem'))
+
+    def submit(self, item, hold=False):
+        """Write and submit the item's job script. Returns False if that failed."""
+        script_path = item.write_script(item.config)
+        job_id = self.scheduler.submit(script_path, hold=hold) if script_path else None
+        if job_id is None:
+            print(f"✗ Failed to submit {item.name}")
+            item.state = 'SUBMIT_FAILED'
+            return False
+        item.job_id = job_id
+        item.state = 'PENDING'
+        item.missing_polls = 0
+        item.history.append((job_id, item.config['time'], item.config['mem']))
+        return True
+
+    def _escalate(self, config, key, limit, parse, format_value):
+        """Return config with key doubled (capped at limit), or None if it cannot grow."""
+        current = parse(config[key])
+        raised = current * 2 if limit is None else min(current * 2, limit)
+        if raised <= current:
+            return None
+        return dict(config, **{key: format_value(raised)})
+
+    def recover(self, item, state):
+        """
+        Decide what replaces a failed item.
+
+        Returns:
+            list: Items submitted in its place, empty if it was given up; pieces whose
+            submission failed are included with state SUBMIT_FAILED
+        """
+        if item.attempts >= self.max_resubmits:
+            print(f"✗ {item.name} ended with {state} after {item.attempts} resubmissions; giving up")
+            return []
+
+        if state == 'TIMEOUT':
+            config = self._escalate(item.config, 'time', self.max_time, parse_slurm_time, format_slurm_time)
+        elif state == 'OUT_OF_MEMORY':
+            config = self._escalate(item.config, 'mem', self.max_mem, parse_slurm_memory, format_slurm_memory)
+        elif state in RETRY_STATES:
+            config = item.config
+        else:
+            print(f"✗ {item.name} ended with {state}; not retrying")
+            return []
+
+        if config is None:
+            if item.split is None:
+                print(f"✗ {item.name} ended with {state} at its resource limit and cannot be split")
+                return []
+            # Pieces start with the raised resources and their own resubmission budget
+            pieces = item.split(item.config)
+            print(f"↻ {item.name} ended with {state} at its resource limit; split into {len(pieces)} jobs")
+            for piece in pieces:
+                self.submit(piece)
+            return pieces
+
+        item.config = config
+        item.attempts += 1
+        if not self.submit(item):
+            return [item]
+        print(f"↻ Resubmitted {item.name} after {state} as job {item.job_id} "
+              f"(time={config['time']}, mem={config['mem']})")
+        return [item]
+
+    def wait(self, items):
+        """
+        Poll until every item (and whatever replaced it) has finished.
+
+        Returns:
+            bool: True if all work completed successfully
+        """
+        active = [item for item in items if item.job_id is not None]
+        succeeded = len(active) == len(items)
+        while active:
+            states = self.scheduler.states([item.job_id for item in active])
+            still_active = []
+            for item in active:
+                state = states.get(item.job_id)
+                if state is None:
+                    # Just submitted jobs can be missing for a moment, purged ones forever
+                    item.missing_polls += 1
+                    if item.missing_polls < self.max_missing_polls:
+                        still_active.append(item)
+                        continue
+                    print(f"✗ {item.name} (job {item.job_id}) not reported for {item.missing_polls} polls; "
+                          f"counting it as lost")
+                    state = 'LOST'
+                else:
+                    item.missing_polls = 0
+                if state in ACTIVE_STATES:
+                    still_active.append(item)
+                    continue
+                item.state = state
+                if state == SUCCESS_STATE:
+                    continue
+                replacements = self.recover(item, state)
+                submitted = [replacement for replacement in replacements if replacement.state != 'SUBMIT_FAILED']
+                if not replacements or len(submitted) < len(replacements):
+                    succeeded = False
+                still_active.extend(submitted)
+            active = still_active
+            if active:
+                time.sleep(self.poll_interval)
+        return succeeded
+
+    def supervise(self, items, final_item):
+        """
+        Wait for items, then release the held final_item and wait for it as well.
+
+        If any item is given up, final_item is cancelled instead of running on partial results.
+
+        Returns:
+            bool: True if all items and final_item completed successfully
+        """
+        print(f"Supervising {len(items)} jobs; {final_item.name} is held until they complete")
+        if not self.wait(items):
+            print(f"✗ Some jobs could not be recovered; cancelling {final_item.name}")
+            self.scheduler.cancel(final_item.job_id)
+            return False
+
+        print(f"✓ All jobs completed; releasing {final_item.name}")
+        self.scheduler.release(final_item.job_id)
+        succeeded = self.wait([final_item])
+        print(f"{'✓' if succeeded else '✗'} {final_item.name} finished with {final_item.state}")
+        return succeeded
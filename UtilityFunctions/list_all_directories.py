@@ -1,9 +1,20 @@
 import os
+import sys
+import time
 import argparse
 import platform
 from pathlib import Path
 from tqdm import tqdm
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.mount_map import convert_path_format
+from UtilityFunctions.resource_model import record_run
+from UtilityFunctions.io_governor import governor_from_environment
+from UtilityFunctions.scan_core import recursive_entry
+
+# Directories per batch file written by split_directories()
+BATCH_SIZE = 500
+
 def is_parent(path, other_paths):
     path = Path(path)
     return any(Path(other).is_relative_to(path) for other in other_paths if other != str(path))
@@ -11,21 +22,6 @@ def is_parent(path, other_paths):
 def filter_child_directories(directories):
     return [dir for dir in directories if not is_parent(dir, directories)]
 
-def convert_path_format(path):
-    """Convert path between Windows and Linux formats based on the current OS."""
-    system = platform.system()
-
-    if system == "Windows":
-        # If on Windows and path looks like a Linux path starting with /nfs/turbo
-        if path.startswith('/nfs/turbo'):
-            return path.replace('/nfs/turbo/lsa-adae', 'Z:').replace('/', '\\')
-        return path.replace('/', '\\')
-    else:  # Linux or other Unix-like
-        # If on Linux and path looks like a Windows path starting with Z:
-        if path.startswith('Z:'):
-            return path.replace('Z:', '/nfs/turbo/lsa-adae').replace('\\', '/')
-        return path.replace('\\', '/')
-
 def get_excluded_folders():
     """Returns comprehensive list of folders to exclude from scanning."""
 
@@ -148,11 +144,11 @@ def should_exclude_path(path, excluded_folders):
 
     return False
 
-def estimate_directory_count(folder, excluded_folders):
+def estimate_directory_count(folder, excluded_folders, walk=os.walk):
     """Estimate the total number of directories for progress tracking."""
     total_dirs = 0
     try:
-        for root, dirs, files in os.walk(folder):
+        for root, dirs, files in walk(folder):
             if should_exclude_path(root, excluded_folders):
                 continue
 
@@ -169,8 +165,19 @@ def estimate_directory_count(folder, excluded_folders):
 
     return max(total_dirs, 1)  # Ensure at least 1 for progress bar
 
-def list_subdirectories(folder, output_file):
+def list_subdirectories(folder, output_file, governor=None, one_file_system=False):
+    """
+    List every directory under folder into output_file, pacing the walk with governor (see io_governor.py).
+
+    Batches scan each listed directory's own files only. Excluded directories (see
+    get_excluded_folders) are not walked here but listed as recursive entries, so the
+    batch that gets one scans its whole subtree. Directories on another device are left
+    out with one_file_system.
+    """
     subdirs = []
+    walk = governor.walk if governor else os.walk
+    stat = governor.stat if governor else os.stat
+    root_device = stat(folder).st_dev if one_file_system else None
     excluded_folders = get_excluded_folders()
 
     print(f"Scanning folder: {folder}")
@@ -179,7 +186,7 @@ def list_subdirectories(folder, output_file):
     debug_exclusions = False  # Set to True for debugging
 
     print("Estimating directory count for progress tracking...")
-    estimated_total = estimate_directory_count(folder, excluded_folders)
+    estimated_total = estimate_directory_count(folder, excluded_folders, walk)
 
     if not should_exclude_path(folder, excluded_folders):
 
@@ -189,7 +196,7 @@ def list_subdirectories(folder, output_file):
     with tqdm(total=estimated_total, desc="Scanning directories", unit="dirs") as pbar:
         dirs_processed = 0
 
-        for root, dirs, files in os.walk(folder):
+        for root, dirs, files in walk(folder):
             if should_exclude_path(root, excluded_folders):
                 if debug_exclusions:
                     print(f"EXCLUDED ROOT: {root}")
@@ -200,8 +207,12 @@ def list_subdirectories(folder, output_file):
                 full_dir_path = os.path.join(root, dir_name)
                 if should_exclude_path(full_dir_path, excluded_folders):
                     dirs_to_remove.append(dir_name)
+                    subdirs.append(recursive_entry(full_dir_path))
                     if debug_exclusions:
                         print(f"EXCLUDED DIR: {full_dir_path}")
+                elif one_file_system and stat(full_dir_path).st_dev != root_device:
+                    dirs_to_remove.append(dir_name)
+                    tqdm.write(f"Skipping mount point: {full_dir_path}")
                 else:
                     if not debug_exclusions:
                         tqdm.write(f"Directory not excluded: {dir_name}")
@@ -246,7 +257,7 @@ def split_directories(textFile, output_folder):
         lines = f.readlines()
 
     print("Number of directories: ", len(lines))
-    batch_size = 500
+    batch_size = BATCH_SIZE
     batch_number = 1
     batch = []
 
@@ -267,7 +278,7 @@ def split_directories(textFile, output_folder):
 
     print(f"Created {batch_number - 1} batch files in {output_folder}")
 
-def process_directories(folders):
+def process_directories(folders, governor=None, one_file_system=False):
     print("Folders to process: ", folders)
 
     output_folder = os.path.join(folders, 'Seeker_Output/file_batches')
@@ -279,7 +290,7 @@ def process_directories(folders):
         print(f"Created output folder: {output_folder}")
 
     # List subdirectories with progress tracking
-    child_directories = list_subdirectories(folders, output_file)
+    child_directories = list_subdirectories(folders, output_file, governor, one_file_system)
 
     # Split into batches with progress tracking
     if child_directories:
@@ -294,6 +305,7 @@ if __name__ == '__main__':
     parser.add_argument('--folders', nargs='+', required=False, help='List of folders to scan for subdirectories.')
     parser.add_argument('--show-excluded', action='store_true', help='Show the list of excluded folder patterns.')
     parser.add_argument('--debug', action='store_true', help='Enable debug output to see excluded directories.')
+    parser.add_argument('--one-file-system', action='store_true', help='Do not list directories on other devices.')
     args = parser.parse_args()
 
     if args.show_excluded:
@@ -330,6 +342,12 @@ if __name__ == '__main__':
             # This would require modifying list_subdirectories to accept debug parameter
             print("Debug mode enabled - excluded directories will be shown")
 
-        process_directories(input_folder[0] if input_folder else '.')
+        start = time.monotonic()
+        # $SEEKER_MAX_METADATA_OPS paces the walk to the budget shared with the other jobs
+        governor = governor_from_environment()
+        child_directories = process_directories(input_folder[0] if input_folder else '.', governor,
+                                                args.one_file_system)
+        record_run('dir_scan', len(child_directories), time.monotonic() - start, key=input_folder[0],
+                   **(governor.measurements() if governor else {}))
     else:
         print("No valid folders to process.")
@@ -0,0 +1,187 @@
+import os
+import re
+import sys
+import json
+import glob
+import time
+import argparse
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import PARTITION_PREFIX, dataset_dir_for
+from UtilityFunctions.slurm_jobs import write_job_script, afterok, submit_job, history_file_for
+from UtilityFunctions.resource_model import ResourceModel, record_run
+from UtilityFunctions import summarize_results
+
+# Batch outputs are merged as a tree: level 1 merges groups of fan_in batches
+# (merge_L1_0, merge_L1_1, ...), level 2 merges groups of level-1 outputs, and so on
+# until one file per extension is left. Every group within a level runs as its own
+# SLURM job, depending only on the jobs that produce its inputs.
+DEFAULT_FAN_IN = 16
+
+def natural_key(name):
+    """Sort batch_2 before batch_10."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+def list_outputs(dataset_dir):
+    """Names of the outputs (batch_1, merge_L1_0, ...) present in any partition."""
+    names = {
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(dataset_dir, PARTITION_PREFIX + '*', '*.parquet'))
+    }
+    return sorted(names, key=natural_key)
+
+def output_sizes(dataset_dir):
+    """Bytes of each output (batch_1, merge_L1_0, ...) summed over all partitions."""
+    sizes = {}
+    for path in glob.glob(os.path.join(dataset_dir, PARTITION_PREFIX + '*', '*.parquet')):
+        name = os.path.splitext(os.path.basename(path))[0]
+        sizes[name] = sizes.get(name, 0) + os.path.getsize(path)
+    return sizes
+
+def plan_merge_tree(names, fan_in=DEFAULT_FAN_IN):
+    """
+    Plan the merge of the given outputs.
+
+    Returns:
+        list: One list per level of (output_name, input_names) groups; empty when
+        there is at most one output and nothing needs merging
+    """
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    levels = []
+    level = 1
+    while len(names) > 1:
+        groups = [
+            (f"merge_L{level}_{index}", names[start:start + fan_in])
+            for index, start in enumerate(range(0, len(names), fan_in))
+        ]
+        levels.append(groups)
+        names = [output_name for output_name, _ in groups]
+        level += 1
+    return levels
+
+def merge_group(dataset_dir, output_name, input_names):
+    """
+    Merge the inputs' files into output_name.parquet in every extension partition.
+
+    Rows are streamed one record batch at a time. The output only appears once it is
+    complete and inputs are removed after that, so a rerun after a failure either redoes
+    the merge or finishes removing inputs.
+    """
+    merged = 0
+    input_bytes = 0
+    output_bytes = 0
+    for partition_dir in sorted(glob.glob(os.path.join(dataset_dir, PARTITION_PREFIX + '*'))):
+        inputs = [os.path.join(partition_dir, f"{name}.parquet") for name in input_names]
+        inputs = [path for path in inputs if os.path.exists(path)]
+        if not inputs:
+            continue
+
+        output_file = os.path.join(partition_dir, f"{output_name}.parquet")
+        input_bytes += sum(os.path.getsize(path) for path in inputs)
+        if os.path.exists(output_file):
+            # An earlier attempt already wrote this output; only leftover inputs remain
+            for path in inputs:
+                os.remove(path)
+            merged += 1
+            continue
+        if len(inputs) == 1:
+            os.replace(inputs[0], output_file)
+            output_bytes += os.path.getsize(output_file)
+            merged += 1
+            continue
+
+        temp_file = output_file + '.tmp'
+        writer = None
+        for path in inputs:
+            parquet_file = pq.ParquetFile(path)
+            if writer is None:
+                writer = pq.ParquetWriter(temp_file, parquet_file.schema_arrow)
+            for batch in parquet_file.iter_batches():
+                writer.write_batch(batch)
+        writer.close()
+        os.replace(temp_file, output_file)
+        output_bytes += os.path.getsize(output_file)
+        for path in inputs:
+            os.remove(path)
+        merged += 1
+
+    print(f"Merged {len(input_names)} outputs into {output_name} across {merged} extension partitions")
+    return {'input_bytes': input_bytes, 'output_bytes': output_bytes}
+
+def merge_command(project_directory, output_dir, output_name, input_names, summarize=False):
+    command = (f"python {project_directory}/UtilityFunctions/merge_tree.py merge "
+               f"--output_dir \"{output_dir}\" --name {output_name} --inputs {' '.join(input_names)}")
+    return command + (" --summarize" if summarize else "")
+
+def submit_merge_tree(config, output_dir, fan_in=DEFAULT_FAN_IN):
+    """
+    Plan the merge tree for the outputs in output_dir and submit it as dependent jobs.
+
+    A tree with a single group is merged (and summarized) in the current process.
+
+    Returns:
+        list: Job IDs submitted, with the final merge job last
+    """
+    dataset_dir = dataset_dir_for(output_dir)
+    levels = plan_merge_tree(list_outputs(dataset_dir), fan_in)
+    # Each merge job is sized from the bytes it reads; a merged output is as large as its inputs
+    sizes = output_sizes(dataset_dir)
+    model = ResourceModel.from_history(history_file_for(config), 'merge')
+
+    if len(levels) <= 1:
+        for output_name, input_names in (levels[0] if levels else []):
+            merge_group(dataset_dir, output_name, input_names)
+        summarize_results.write_summary(output_dir)
+        return []
+
+    project_directory = config.get('project_directory', '.')
+    job_ids = []
+    producers = {}
+    for level_index, groups in enumerate(levels):
+        final_level = level_index == len(levels) - 1
+        for output_name, input_names in groups:
+            dependencies = [producers[name] for name in input_names if name in producers]
+            sizes[output_name] = sum(sizes.get(name, 0) for name in input_names)
+            job_config = model.sized_config(config, sizes[output_name])
+            command = merge_command(project_directory, output_dir, output_name, input_names, summarize=final_level)
+            script_path = write_job_script(job_config, output_name, [command], afterok(dependencies))
+            job_id = submit_job(script_path)
+            if job_id is None:
+                raise RuntimeError(f"Failed to submit merge job {output_name}")
+            producers[output_name] = job_id
+            job_ids.append(job_id)
+        print(f"✓ Submitted {len(groups)} merge jobs for level {level_index + 1}")
+
+    return job_ids
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Merge batch outputs of a Seeker run as a tree of jobs.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    submit_parser = subparsers.add_parser('submit', help='Plan the merge tree and submit it to SLURM.')
+    submit_parser.add_argument('--output_dir', type=str, required=True, help='Seeker_Output folder.')
+    submit_parser.add_argument('--config', type=str, required=True, help='Path to SLURM configuration JSON file.')
+    submit_parser.add_argument('--fan_in', type=int, default=None, help='Number of outputs merged by each job.')
+
+    merge_parser = subparsers.add_parser('merge', help='Merge one group of outputs.')
+    merge_parser.add_argument('--output_dir', type=str, required=True, help='Seeker_Output folder.')
+    merge_parser.add_argument('--name', type=str, required=True, help='Name of the merged output.')
+    merge_parser.add_argument('--inputs', nargs='+', required=True, help='Names of the outputs to merge.')
+    merge_parser.add_argument('--summarize', action='store_true', help='Write the run summary after merging.')
+
+    args = parser.parse_args()
+
+    if args.command == 'submit':
+        with open(args.config, 'r') as config_file:
+            config = json.load(config_file)
+        fan_in = args.fan_in or config.get('merge_fan_in', DEFAULT_FAN_IN)
+        submit_merge_tree(config, args.output_dir, fan_in)
+    else:
+        start = time.monotonic()
+        stats = merge_group(dataset_dir_for(args.output_dir), args.name, args.inputs)
+        record_run('merge', stats['input_bytes'], time.monotonic() - start, key=args.name,
+                   output_bytes=stats['output_bytes'])
+        if args.summarize:
+            summarize_results.write_summary(args.output_dir)
@@ -0,0 +1,119 @@
+import re
+import platform
+
+# How the same storage is mounted on the cluster (Linux) and on lab machines (Windows).
+# Override with a "mount_map" list in the SLURM config JSON, e.g.
+#   "mount_map": [{"linux": "/nfs/turbo/lsa-adae", "windows": "Z:"}]
+DEFAULT_MOUNTS = [{'linux': '/nfs/turbo/lsa-adae', 'windows': 'Z:'}]
+
+IS_WINDOWS = platform.system() == "Windows"
+DRIVE = re.compile(r'[A-Za-z]:')
+
+def _replacement(text):
+    """Escape a literal for use as a regex replacement string."""
+    return text.replace('\\', '\\\\')
+
+class MountMap:
+    """
+    Prefix rules translating paths between their Linux and Windows forms.
+
+    Rules are compiled once and tried longest prefix first. Single paths are
+    translated with to_linux()/to_windows(); columns of stored paths are translated
+    in bulk with translate_series(), which only touches the distinct values of
+    categorical columns such as 'Directory'.
+    """
+
+    def __init__(self, mounts=None):
+        mounts = DEFAULT_MOUNTS if mounts is None else mounts
+        self.mounts = [
+            {'linux': mount['linux'].rstrip('/'), 'windows': mount['windows'].rstrip('\\/')}
+            for mount in mounts
+        ]
+        self._to_windows = [
+            (re.compile('^' + re.escape(mount['linux']) + '(?=/|$)'), mount['windows'])
+            for mount in sorted(self.mounts, key=lambda mount: len(mount['linux']), reverse=True)
+        ]
+        self._to_linux = []
+        for mount in sorted(self.mounts, key=lambda mount: len(mount['windows']), reverse=True):
+            self._to_linux.append(
+                (re.compile('^' + re.escape(mount['windows']) + r'(?=[\\/]|$)', re.IGNORECASE), mount['linux']))
+            if DRIVE.fullmatch(mount['windows']):
+                # 'Z:migratedData' (separator lost, e.g. to shell quoting) is read as 'Z:\migratedData'
+                self._to_linux.append(
+                    (re.compile('^' + re.escape(mount['windows']) + r'(?=[^\\/])', re.IGNORECASE), mount['linux'] + '/'))
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the mount map from a loaded SLURM config dict."""
+        return cls((config or {}).get('mount_map'))
+
+    @staticmethod
+    def _apply(rules, path):
+        for pattern, replacement in rules:
+            new_path, count = pattern.subn(_replacement(replacement), path, count=1)
+            if count:
+                return new_path
+        return path
+
+    def to_windows(self, path):
+        """Translate a path to its Windows form."""
+        return self._apply(self._to_windows, path).replace('/', '\\')
+
+    def to_linux(self, path):
+        """Translate a path to its Linux form."""
+        return self._apply(self._to_linux, path).replace('\\', '/')
+
+    def to_local(self, path):
+        """Translate a path to the form used by the current OS."""
+        return self.to_windows(path) if IS_WINDOWS else self.to_linux(path)
+
+    def translate_series(self, paths, style='local'):
+        """
+        Translate a pandas Series of paths to 'linux', 'windows' or 'local' form.
+
+        Uses vectorized string operations; categorical Series only have their
+        categories translated.
+        """
+        if style == 'local':
+            style = 'windows' if IS_WINDOWS else 'linux'
+        if style not in ('linux', 'windows'):
+            raise ValueError(f"Unknown path style: {style}")
+
+        if hasattr(paths, 'cat'):
+            if len(paths.cat.categories) == 0:
+                return paths
+            # pandas is only needed here, so plain path conversion stays free of it
+            import numpy as np
+            import pandas as pd
+            translated = self.translate_series(paths.cat.categories.to_series(), style)
+            # Different stored paths may translate to the same path, so re-factorize
+            category_codes, categories = pd.factorize(translated)
+            codes = paths.cat.codes.to_numpy()
+            codes = np.where(codes >= 0, category_codes[codes], -1)
+            return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=paths.index, name=paths.name)
+
+        rules = self._to_windows if style == 'windows' else self._to_linux
+        for pattern, replacement in rules:
+            paths = paths.str.replace(pattern, _replacement(replacement), regex=True)
+        if style == 'windows':
+            return paths.str.replace('/', '\\', regex=False)
+        return paths.str.replace('\\', '/', regex=False)
+
+_default_mount_map = None
+
+def configure(config):
+    """Use the "mount_map" from a SLURM config for convert_path_format()."""
+    global _default_mount_map
+    _default_mount_map = MountMap.from_config(config)
+    return _default_mount_map
+
+def get_mount_map():
+    """Return the configured mount map (the built-in defaults until configure() is called)."""
+    global _default_mount_map
+    if _default_mount_map is None:
+        _default_mount_map = MountMap()
+    return _default_mount_map
+
+def convert_path_format(path):
+    """Convert path between Windows and Linux formats based on the current OS."""
+    return get_mount_map().to_local(path)
@@ -1,127 +1,89 @@
 import os
-import pandas as pd
-from tqdm import tqdm
-from pathlib import Path
+import sys
 import argparse
 import time
 import platform
 
+# Allow running as a script (python UtilityFunctions/process_batch.py) as well as a module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Only the standard-library scan core is imported up front; pandas, pyarrow and
+# openpyxl are imported by the export stage of process_batch() (see import_benchmark.py)
+from UtilityFunctions.scan_core import gather_file_info, FileFilter, add_filter_arguments, add_walk_arguments, temp_path
+from UtilityFunctions.top_files import TopFiles, add_top_arguments, batch_top_files_path
+from UtilityFunctions.io_governor import governor_from_environment
+
 todays_date = time.strftime("%m-%d")
 
-def process_directory(directory):
-    # for file in directory that starts with batch_ and ends with .txt
-    for file in os.listdir(directory):
-        if file.startswith("batch_") and file.endswith(".txt"):
-            print(f"Processing batch file: {file}")
-            batch_file_path = os.path.join(directory, file)
-            # run process_batch.py with the batch file as argument
-            os.system(f"python process_batch.py --path \"{batch_file_path}\"")
+def process_directory(directory, **scan_options):
+    """Process every batch_*.txt file in directory in this process, as a work queue worker."""
+    from UtilityFunctions.batch_queue import run_worker
+    run_worker(directory, **scan_options)
 
 # Enable long path support by prefixing with \\?\
 def safe_path(path):
     if os.name == 'nt':
         return f"\\\\?\\{path}"
 
-# Function to gather file information
-def gather_file_info(directories):
-    file_info_list = []
-    for entry in directories:
-        entry_path = Path(entry)
-        if entry_path.is_file():
-            # Process single file
-            try:
-                stats = os.stat(entry_path)
-                file_size = stats.st_size
-                if platform.system() == "Windows":
-                    created_time = stats.st_mtime
-                    modified_time = stats.st_ctime
-                    accessed_time = stats.st_atime
-                    file_info_list.append([
-                        entry_path.name,
-                        entry_path.suffix.lower(),
-                        file_size,
-                        created_time,
-                        modified_time,
-                        accessed_time,
-                        str(entry_path)
-                    ])
-                else:
-                    modified_time = stats.st_mtime
-                    change_time = stats.st_ctime
-                    accessed_time = stats.st_atime
-                    file_info_list.append([
-                        entry_path.name,
-                        entry_path.suffix.lower(),
-                        file_size,
-                        modified_time,
-                        change_time,
-                        accessed_time,
-                        str(entry_path)
-                    ])
-            except Exception as e:
-                print(f"Error processing file {entry_path}: {e}")
-        elif entry_path.is_dir():
-            # Process all files in directory (as before)
-            for root, _, files in tqdm(os.walk(entry_path), desc=f"Scanning {entry}"):
-                for file in files:
-                    try:
-                        file_path = Path(root) / file
-                        stats = os.stat(file_path)
-                        file_size = stats.st_size
-                        if platform.system() == "Windows":
-                            created_time = stats.st_mtime
-                            modified_time = stats.st_ctime
-                            accessed_time = stats.st_atime
-                            file_info_list.append([
-                                file,
-                                file_path.suffix.lower(),
-                                file_size,
-                                created_time,
-                                modified_time,
-                                accessed_time,
-                                str(file_path)
-                            ])
-                        else:
-                            modified_time = stats.st_mtime
-                            change_time = stats.st_ctime
-                            accessed_time = stats.st_atime
-                            file_info_list.append([
-                                file,
-                                file_path.suffix.lower(),
-                                file_size,
-                                modified_time,
-                                change_time,
-                                accessed_time,
-                                str(file_path)
-                            ])
-                    except Exception as e:
-                        print(f"Error processing file {file_path}: {e}")
-    return file_info_list
-def process_batch(file):
+def process_batch(file, hardlinks='once', follow_symlinks=False, one_file_system=False, excel=True,
+                  output_folder=None, batch_name=None, file_filter=None, top_n=None, top_only=False):
+    """
+    Scan the directories listed in a batch file and write its outputs.
+
+    Each listed directory contributes its own files; subdirectories are scanned only
+    when they are listed too, as list_all_directories.py does for every directory.
+
+    With a file_filter (see scan_core.FileFilter) only matching files are stat'd and written.
+    With top_n, the top_n largest/oldest/least accessed files are kept in bounded heaps
+    as the scan runs and saved for the reduce stage (see top_files.py); with top_only
+    that is the only output, and no rows are kept in memory.
+
+    When $SEEKER_MAX_METADATA_OPS is set, stat and readdir calls are paced to the budget
+    shared by every scan process (see io_governor.py), and the returned stats include
+    the number of calls and the seconds spent waiting for the budget.
+
+    Outputs go to the Seeker_Output folder two levels above the batch file, named after
+    it, unless output_folder/batch_name say otherwise (for batch files claimed from a
+    work queue, see batch_queue.py).
+    """
     with open(file, 'r') as bf:
         directories = [line.strip() for line in bf]
 
+    # output path is parent folder of the batch file with the same name but with _output.csv
+    parent_folder = output_folder or os.path.dirname(os.path.dirname(file))
+    print("Parent folder: ", parent_folder)
+    batch_name = batch_name or os.path.basename(file).replace('.txt', '')
+    output_path = os.path.join(parent_folder, f"{batch_name}.csv")
+
     # Gather information from all directories in the batch
-    all_file_info = gather_file_info(directories)
+    top_files = TopFiles(top_n) if top_n else None
+    governor = governor_from_environment()
+    all_file_info = gather_file_info(directories, hardlinks=hardlinks,
+                                     follow_symlinks=follow_symlinks,
+                                     one_file_system=one_file_system,
+                                     file_filter=file_filter,
+                                     top_files=top_files,
+                                     keep_rows=not (top_files and top_only),
+                                     governor=governor,
+                                     # The batch lists subdirectories as entries of their own
+                                     recursive=False)
+    io_stats = governor.measurements() if governor else {}
+    if governor:
+        print(f"Made {governor.ops} metadata calls, {governor.throttled_seconds:.1f}s spent waiting for the shared budget")
+    if top_files:
+        top_path = batch_top_files_path(parent_folder, batch_name)
+        top_files.save(top_path)
+        print(f"Saved the top {top_n} of {top_files.count} files to {top_path}")
+        if top_only:
+            return {'directories': len(directories), 'files': top_files.count,
+                    'output_bytes': os.path.getsize(top_path), **io_stats}
     print("We got information for ", len(all_file_info), " files.")
 
-    # Create DataFrame with platform-appropriate columns
-    if platform.system() == "Windows":
-        columns = ['File Name', 'File Extension', 'File Size', 'Created Time', 'Modified Time', 'Accessed Time', 'File Path']
-    else:
-        columns = ['File Name', 'File Extension', 'File Size', 'Modified Time', 'Change Time', 'Accessed Time', 'File Path']
+    from UtilityFunctions.excel_export import write_excel_sheets
+    from UtilityFunctions.scan_dataset import dataset_dir_for, write_batch_partitions, with_file_paths, rows_to_frame
 
-    df = pd.DataFrame(all_file_info, columns=columns)
-
-    # Convert times from epoch to human-readable format
-    if platform.system() == "Windows":
-        df['Created Time'] = pd.to_datetime(df['Created Time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
-        df['Modified Time'] = pd.to_datetime(df['Modified Time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
-        df['Accessed Time'] = pd.to_datetime(df['Accessed Time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
-    else:
-        df['Modified Time'] = pd.to_datetime(df['Modified Time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
-        df['Change Time'] = pd.to_datetime(df['Change Time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
-        df['Accessed Time'] = pd.to_datetime(df['Accessed Time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+    # DataFrame with platform-appropriate columns and datetime times
+    df = rows_to_frame(all_file_info)
+    time_columns = [column for column in df.columns if column.endswith(' Time')]
 
     # Debug: Print first few rows to verify times make sense
     print("Sample data (first 3 rows):")
@@ -129,59 +91,72 @@ def process_batch(file):
 
     # Validate time logic (Modified should not be later than Created on Windows)
     if platform.system() == "Windows":
-        invalid_times = df[pd.to_datetime(df['Modified Time']) > pd.to_datetime(df['Created Time'])]
+        invalid_times = df[df['Modified Time'] > df['Created Time']]
         if not invalid_times.empty:
             print(f"Warning: Found {len(invalid_times)} files where Modified Time > Created Time")
             print("This might indicate timestamp issues. First few examples:")
             print(invalid_times[['File Name', 'Created Time', 'Modified Time']].head())
 
-    # output path is parent folder of the batch file with the same name but with _output.csv
-    parent_folder = os.path.dirname(os.path.dirname(file))
-    print("Parent folder: ", parent_folder)
-    output_path = os.path.join(parent_folder, f"{os.path.basename(file).replace('.txt', '')}.csv")
-
-    print("Saving Excel files...")
-    with pd.ExcelWriter(output_path.replace('.csv', '_all_files.xlsx'), engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='All Files', index=False)
-
-    # Save extensions only to another Excel file
-    print("Creating extensions analysis...")
-    try:
-        with pd.ExcelWriter(output_path.replace('.csv', '_extensions.xlsx'), engine='openpyxl') as writer:
-            # Group by extension and create sheets
-            extension_groups = df.groupby('File Extension')
-
-            for ext_name, group in extension_groups:
-                # Clean sheet name (Excel has restrictions)
-                if not ext_name or ext_name == '.' or ext_name == '':
-                    sheet_name = 'No Extension'
-                else:
-                    # Remove the dot and limit length
-                    sheet_name = ext_name.strip('.').replace('/', '_').replace('\\', '_')[:31]
-                    if not sheet_name:
-                        sheet_name = 'Unknown'
-
-                print(f"Creating sheet for extension: {ext_name} -> {sheet_name}")
-                group.to_excel(writer, sheet_name=sheet_name, index=False)
-
-    except Exception as e:
-        print(f"Error creating extensions file: {e}")
-        # Fallback: save as single sheet
-        with pd.ExcelWriter(output_path.replace('.csv', '_extensions_simple.xlsx'), engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='All Extensions', index=False)
-
-    print("Excel files saved.")
+    # Store every row once, partitioned by extension
+    dataset_dir = dataset_dir_for(parent_folder)
+    print("Writing extension partitions...")
+    written = write_batch_partitions(df, dataset_dir, batch_name)
+    print(f"Wrote {len(written)} extension partitions to {dataset_dir}")
+
+    if excel:
+        print("Saving Excel files...")
+        excel_df = with_file_paths(df)
+        for column in time_columns:
+            excel_df[column] = excel_df[column].dt.strftime('%Y-%m-%d %H:%M:%S')
+        excel_path = output_path.replace('.csv', '_all_files.xlsx')
+        excel_temp = temp_path(excel_path)
+        write_excel_sheets(excel_temp, [('All Files', excel_df)])
+        os.replace(excel_temp, excel_path)
+        print("Excel files saved.")
+
+    return {'directories': len(directories), 'files': len(df),
+            'output_bytes': sum(os.path.getsize(path) for path in written), **io_stats}
+
+# Batches processed by this process so far (a batch queue worker runs many)
+batches_processed = 0
+
+def process_and_record(file, **options):
+    """Run process_batch() and record its throughput for SLURM resource sizing."""
+    global batches_processed
+    from UtilityFunctions.resource_model import record_run, reset_peak_rss, peak_rss_mb
+    # The peak memory of this batch alone; where it cannot be reset, only the first
+    # batch of the process has a peak of its own
+    own_peak = reset_peak_rss() or batches_processed == 0
+    batches_processed += 1
+    start = time.monotonic()
+    stats = process_batch(file, **options)
+    elapsed = time.monotonic() - start
+    print(f"Processed {stats['files']} files in {elapsed:.1f}s ({stats['files'] / max(elapsed, 1e-9):.0f} files/s)")
+    measurements = {key: value for key, value in stats.items() if key not in ('directories', 'files')}
+    record_run('process_batch', stats['directories'], elapsed,
+               key=options.get('batch_name') or os.path.basename(file),
+               files=stats['files'], peak_rss_mb=round(peak_rss_mb(), 1) if own_peak else None,
+               **measurements)
+    return stats
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Process a batch of directories.')
     parser.add_argument('--path', type=str, help='Path to the batch file or directory.')
+    add_walk_arguments(parser)
+    parser.add_argument('--no-excel', action='store_true', help='Only write the extension-partitioned dataset.')
+    add_filter_arguments(parser)
+    add_top_arguments(parser)
     args = parser.parse_args()
 
     batches_path = args.path
 
+    scan_options = {'hardlinks': args.hardlinks, 'follow_symlinks': args.follow_symlinks,
+                    'one_file_system': args.one_file_system, 'excel': not args.no_excel,
+                    'file_filter': FileFilter.from_options(args),
+                    'top_n': args.top_n, 'top_only': args.top_only}
     if os.path.isfile(batches_path):
-        process_batch(batches_path)
+        process_and_record(batches_path, **scan_options)
     elif os.path.isdir(batches_path):
-        process_directory(batches_path)
+        process_directory(batches_path, **scan_options)
     else:
         print("The provided path is neither a file nor a directory.")
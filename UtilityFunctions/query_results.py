@@ -0,0 +1,239 @@
+import os
+import re
+import sys
+import json
+import argparse
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import (
+    DATASET_DIR_NAME, dataset_dir_for, partition_files, arrow_file_paths, translate_directory_array
+)
+from UtilityFunctions.mount_map import MountMap
+
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4, 'P': 1024 ** 5}
+
+def parse_size(value):
+    """Parse a size such as '500', '10G' or '1.5TB' into bytes."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGTP]?)I?B?\s*', value.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+def parse_date(value):
+    """Parse an ISO date or datetime such as '2023-01-01' or '2023-01-01T12:00'."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date: {value}")
+
+def glob_to_regex(pattern):
+    """Translate a shell glob into an anchored regular expression usable by Arrow."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '*':
+            regex.append('.*')
+        elif c == '?':
+            regex.append('.')
+        elif c == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']', i + 1)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            regex.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return '^' + ''.join(regex) + '$'
+
+def find_dataset_dir(folder):
+    """Accept a Seeker_Output folder, its dataset folder, or the scanned folder itself."""
+    candidates = [folder, dataset_dir_for(folder), dataset_dir_for(os.path.join(folder, 'Seeker_Output'))]
+    for candidate in candidates:
+        if os.path.basename(os.path.normpath(candidate)) == DATASET_DIR_NAME and os.path.isdir(candidate):
+            return candidate
+    return None
+
+def path_prefix_condition(prefix):
+    """
+    Rows whose File Path (directory + separator + file name) starts with prefix.
+
+    'big/d1/' selects everything under big/d1 but not big/d10; 'big/d1/raw_' also selects
+    the files of big/d1 whose names start with raw_. The match is split over the stored
+    Directory and File Name columns, so it is still pushed into the scan.
+    """
+    directory = ds.field('Directory').cast(pa.string())
+    cut = max(prefix.rfind('/'), prefix.rfind('\\')) + 1
+    head, tail = prefix[:cut], prefix[cut:]
+    if not tail:
+        # Directories are stored with or without their trailing separator
+        return (directory == head[:-1]) | pc.starts_with(directory, head)
+    condition = pc.starts_with(directory, prefix)
+    if head:
+        # A file name cannot contain a separator, so the prefix ends inside the name
+        # only for files directly in head
+        in_head = directory.isin([head[:-1], head]) if len(head) > 1 else directory == head
+        condition = condition | (in_head & pc.starts_with(ds.field('File Name'), tail))
+    return condition
+
+def build_filter(min_size=None, max_size=None, modified_after=None, modified_before=None,
+                 accessed_after=None, accessed_before=None, path_prefix=None, name=None, suffix=None):
+    """Combine the query options into a single Arrow filter expression (None if no filter)."""
+    conditions = []
+    if min_size is not None:
+        conditions.append(ds.field('File Size') >= min_size)
+    if max_size is not None:
+        conditions.append(ds.field('File Size') <= max_size)
+    if modified_after is not None:
+        conditions.append(ds.field('Modified Time') >= modified_after)
+    if modified_before is not None:
+        conditions.append(ds.field('Modified Time') < modified_before)
+    if accessed_after is not None:
+        conditions.append(ds.field('Accessed Time') >= accessed_after)
+    if accessed_before is not None:
+        conditions.append(ds.field('Accessed Time') < accessed_before)
+    if path_prefix:
+        conditions.append(path_prefix_condition(path_prefix))
+    if name:
+        conditions.append(pc.match_substring_regex(ds.field('File Name'), glob_to_regex(name)))
+    if suffix:
+        conditions.append(pc.ends_with(ds.field('File Name'), suffix))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def query_batches(dataset_dir, extensions=None, columns=None, path_style=None, mount_map=None, **filters):
+    """
+    Stream the rows matching the filters as Arrow record batches.
+
+    Extensions select partitions, so other extensions are never opened. The remaining
+    filters are pushed into the Parquet scan, which skips row groups whose statistics
+    cannot match, and are evaluated column-wise on the rest.
+    """
+    yield from scan_files(partition_files(dataset_dir, extensions), columns, path_style, mount_map, **filters)
+
+def scan_files(files, columns=None, path_style=None, mount_map=None, **filters):
+    """Stream the matching rows of the given Parquet files of a scan dataset."""
+    if not files:
+        return
+    dataset = ds.dataset(files, format='parquet')
+    read_columns = None
+    if columns is not None:
+        read_columns = [column for column in columns if column != 'File Path']
+        if 'File Path' in columns:
+            read_columns += [column for column in ('Directory', 'File Name') if column not in read_columns]
+    scanner = dataset.scanner(columns=read_columns, filter=build_filter(**filters))
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield output_columns(batch, columns, path_style, mount_map)
+
+def output_columns(batch, columns=None, path_style=None, mount_map=None):
+    """
+    Return the requested columns of a batch, rebuilding 'File Path' from the stored
+    directory and file name only for the rows that matched. With path_style, paths
+    are translated through the mount map.
+    """
+    if columns is None:
+        columns = ['File Path' if column == 'Directory' else column for column in batch.schema.names]
+    arrays = []
+    for column in columns:
+        if column == 'File Path' and column not in batch.schema.names:
+            arrays.append(arrow_file_paths(batch.column('Directory'), batch.column('File Name'), path_style, mount_map))
+        elif column == 'Directory':
+            arrays.append(translate_directory_array(batch.column(column), path_style, mount_map).dictionary_decode())
+        else:
+            array = batch.column(column)
+            arrays.append(array.dictionary_decode() if pa.types.is_dictionary(array.type) else array)
+    return pa.RecordBatch.from_arrays(arrays, names=columns)
+
+def write_csv(batches, output):
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pa_csv.CSVWriter(output, batch.schema)
+        writer.write_batch(batch)
+    if writer is not None:
+        writer.close()
+
+def write_json_lines(batches, output):
+    for batch in batches:
+        for row in batch.to_pylist():
+            output.write((json.dumps(row, default=str) + '\n').encode('utf-8'))
+
+def limit_batches(batches, limit):
+    """Stop the stream after limit rows."""
+    remaining = limit
+    for batch in batches:
+        if remaining <= 0:
+            return
+        if batch.num_rows > remaining:
+            batch = batch.slice(0, remaining)
+        remaining -= batch.num_rows
+        yield batch
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='seeker.py query', description='Query the scan results in a Seeker_Output folder.')
+    parser.add_argument('folder', help='Seeker_Output folder (or the folder that was scanned).')
+    parser.add_argument('--ext', nargs='+', help='Extensions to include, e.g. .nd2 .czi')
+    parser.add_argument('--min-size', type=parse_size, help='Minimum file size, e.g. 10G')
+    parser.add_argument('--max-size', type=parse_size, help='Maximum file size, e.g. 500M')
+    parser.add_argument('--modified-after', type=parse_date, help='Modified on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--modified-before', type=parse_date, help='Modified before this date (YYYY-MM-DD)')
+    parser.add_argument('--accessed-after', type=parse_date, help='Accessed on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--accessed-before', type=parse_date, help='Accessed before this date (YYYY-MM-DD)')
+    parser.add_argument('--path-prefix', help='Only files whose path starts with this prefix (end it with a separator to select one directory tree).')
+    parser.add_argument('--name', help="Shell-style file name pattern, e.g. '*_raw.nd2'")
+    parser.add_argument('--columns', nargs='+', help='Columns to output (default: all).')
+    parser.add_argument('--limit', type=int, help='Stop after this many rows.')
+    parser.add_argument('--path-style', choices=['linux', 'windows', 'local'],
+                        help='Translate paths through the mount map (default: as scanned).')
+    parser.add_argument('--config', help='SLURM configuration JSON whose "mount_map" is used with --path-style.')
+    parser.add_argument('--format', choices=['csv', 'json'], default='csv', help='Output format (json = one object per line).')
+    parser.add_argument('--output', help='Output file (default: stdout).')
+    args = parser.parse_args(argv)
+
+    dataset_dir = find_dataset_dir(args.folder)
+    if dataset_dir is None:
+        print(f"Error: No scan dataset found in '{args.folder}'.", file=sys.stderr)
+        return 1
+
+    extensions = None
+    if args.ext:
+        extensions = [ext.lower() if ext.startswith('.') or not ext else '.' + ext.lower() for ext in args.ext]
+
+    mount_map = None
+    if args.config:
+        with open(args.config, 'r') as config_file:
+            mount_map = MountMap.from_config(json.load(config_file))
+
+    batches = query_batches(
+        dataset_dir, extensions=extensions, columns=args.columns,
+        path_style=args.path_style, mount_map=mount_map,
+        min_size=args.min_size, max_size=args.max_size,
+        modified_after=args.modified_after, modified_before=args.modified_before,
+        accessed_after=args.accessed_after, accessed_before=args.accessed_before,
+        path_prefix=args.path_prefix, name=args.name,
+    )
+    if args.limit is not None:
+        batches = limit_batches(batches, args.limit)
+
+    write = write_csv if args.format == 'csv' else write_json_lines
+    if args.output:
+        with open(args.output, 'wb') as output:
+            write(batches, output)
+    else:
+        write(batches, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.slurm_jobs import (
+    HISTORY_ENV_VAR, format_slurm_time, format_slurm_memory, parse_slurm_time, parse_slurm_memory
+)
+
+# SLURM jobs append one JSON line per finished task to a shared history file, e.g.
+#   {"kind": "process_batch", "units": 500, "seconds": 812.4, "peak_rss_mb": 2310, ...}
+# where units is what the task's size is measured in: directories for dir_scan and
+# process_batch, input bytes for merge. ResourceModel turns that history into a
+# per-task --time/--mem from the size of the task about to be submitted.
+HISTORY_WINDOW = 200
+SAFETY_FACTOR = 1.5
+STARTUP_SECONDS = 120
+MIN_MINUTES = 10
+MIN_MEMORY_MB = 1024
+
+def reset_peak_rss():
+    """
+    Start measuring peak_rss_mb() afresh, so a process running several tasks (a batch
+    queue worker) can measure each on its own.
+
+    Returns:
+        bool: False where the peak cannot be reset (only Linux can, through
+        /proc/self/clear_refs); peak_rss_mb() then covers the whole process lifetime
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB since it started or since reset_peak_rss() (0 where unknown)."""
+    try:
+        with open('/proc/self/status', 'r') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def record_run(kind, units, seconds, key=None, **measurements):
+    """
+    Append a finished task to the history named by $SEEKER_HISTORY_FILE.
+
+    Tasks started outside of Seeker's SLURM jobs (no variable set) are not recorded.
+    The process's peak memory is recorded unless measurements give peak_rss_mb (None
+    when the task's own peak is unknown).
+    """
+    history_file = os.environ.get(HISTORY_ENV_VAR)
+    if not history_file:
+        return
+    entry = {'kind': kind, 'key': key, 'units': units, 'seconds': round(seconds, 3),
+             'peak_rss_mb': round(peak_rss_mb(), 1), 'finished': time.time(), **measurements}
+    try:
+        os.makedirs(os.path.dirname(history_file), exist_ok=True)
+        with open(history_file, 'a') as history:
+            history.write(json.dumps(entry) + '\n')
+    except OSError as e:
+        print(f"Could not record throughput in {history_file}: {e}")
+
+def load_history(history_file, kind=None):
+    """Entries of the history (optionally of one kind), oldest first."""
+    entries = []
+    if not os.path.exists(history_file):
+        return entries
+    with open(history_file, 'r') as history:
+        for line in history:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if kind is None or entry.get('kind') == kind:
+                entries.append(entry)
+    return entries
+
+class ResourceModel:
+    """
+    Time and memory predicted from the recorded runs of one kind of task.
+
+    Time is a start-up allowance plus size divided by a pessimistic throughput (the
+    90th percentile of seconds per unit); memory is the smallest observed footprint
+    plus the 90th percentile of memory per unit. Both get a safety factor, a floor,
+    and are capped at the config's max_time/max_mem.
+    """
+
+    def __init__(self, entries):
+        entries = [entry for entry in entries[-HISTORY_WINDOW:] if entry.get('units', 0) > 0]
+        self.entries = entries
+        if not entries:
+            return
+        units = np.array([entry['units'] for entry in entries], dtype=float)
+        seconds = np.array([entry['seconds'] for entry in entries], dtype=float)
+        self.seconds_per_unit = float(np.percentile(seconds / units, 90))
+        measured = [entry for entry in entries if entry.get('peak_rss_mb')]
+        self.memory_known = bool(measured)
+        if not measured:
+            return
+        memory = np.array([entry['peak_rss_mb'] for entry in measured], dtype=float)
+        memory_units = np.array([entry['units'] for entry in measured], dtype=float)
+        self.base_memory_mb = float(memory.min())
+        self.memory_per_unit_mb = float(np.percentile((memory - self.base_memory_mb) / memory_units, 90))
+
+    @classmethod
+    def from_history(cls, history_file, kind):
+        return cls(load_history(history_file, kind))
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def predict(self, units):
+        """
+        Returns:
+            tuple: (minutes, megabytes) for a task of the given size; megabytes is None
+            when no run recorded its memory
+        """
+        minutes = (STARTUP_SECONDS + self.seconds_per_unit * units) * SAFETY_FACTOR / 60
+        if not self.memory_known:
+            return max(minutes, MIN_MINUTES), None
+        memory = (self.base_memory_mb + self.memory_per_unit_mb * units) * SAFETY_FACTOR
+        return max(minutes, MIN_MINUTES), max(memory, MIN_MEMORY_MB)
+
+    def sized_config(self, config, units, memory_units=None):
+        """
+        Copy of config with time and mem sized for units.
+
+        memory_units sizes the memory separately, for jobs that process their work in
+        pieces one after another. The config is returned unchanged without history,
+        without a size estimate, or when the config sets "auto_resources": false.
+        """
+        if not self or units is None or not config.get('auto_resources', True):
+            return config
+        minutes, memory = self.predict(units)
+        if memory_units is not None:
+            memory = self.predict(memory_units)[1]
+        if 'max_time' in config:
+            minutes = min(minutes, parse_slurm_time(config['max_time']))
+        sized = dict(config, time=format_slurm_time(minutes))
+        if memory is not None:
+            if 'max_mem' in config:
+                memory = min(memory, parse_slurm_memory(config['max_mem']))
+            sized['mem'] = format_slurm_memory(int(np.ceil(memory)))
+        return sized
+
+def last_units(history_file, kind, key):
+    """Size recorded by the most recent task of this kind and key, or None."""
+    for entry in reversed(load_history(history_file, kind)):
+        if entry.get('key') == key:
+            return entry['units']
+    return None
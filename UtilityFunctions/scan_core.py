@@ -0,0 +1,345 @@
+import os
+import re
+import sys
+import time
+import socket
+import fnmatch
+from pathlib import Path
+
+# The walk-and-stat core of a batch scan. It only uses the standard library, so a
+# batch process can start walking before pandas, pyarrow or openpyxl are imported;
+# process_batch imports those only once rows are ready to be exported.
+
+class Progress:
+    """Minimal progress counter printed to stderr at most every `interval` seconds."""
+
+    def __init__(self, desc, unit="dirs", interval=2.0):
+        self.desc = desc
+        self.unit = unit
+        self.interval = interval
+        self.count = 0
+        self.start = time.monotonic()
+        self.last_report = self.start
+
+    def update(self, n=1):
+        self.count += n
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now):
+        elapsed = now - self.start
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        sys.stderr.write(f"{self.desc}: {self.count} {self.unit} [{elapsed:.0f}s, {rate:.1f} {self.unit}/s]\n")
+        sys.stderr.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.report(time.monotonic())
+
+# A batch entry ending in /** is scanned together with all of its subdirectories. The
+# listing writes directories it does not descend into (see list_all_directories.py) this
+# way, e.g. "/data/lab/backup/**"; other entries follow gather_file_info's `recursive`.
+RECURSIVE_MARKER = '**'
+
+def recursive_entry(directory):
+    """Batch entry for directory and everything below it."""
+    return os.path.join(directory, RECURSIVE_MARKER)
+
+def parse_entry(entry):
+    """
+    Split a batch entry into its path and whether it is a recursive_entry().
+
+    Returns:
+        tuple: (path, recursive), with recursive None for a plain entry
+    """
+    if entry.endswith(RECURSIVE_MARKER) and entry[-len(RECURSIVE_MARKER) - 1:-len(RECURSIVE_MARKER)] in ('/', '\\'):
+        return entry[:-len(RECURSIVE_MARKER) - 1], True
+    return entry, None
+
+def temp_path(path):
+    """Temporary name for writing path, private to this process so concurrent writers never share it."""
+    return f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+
+def file_extension(name):
+    """Lowercase extension of a file name, the same as Path(name).suffix.lower()."""
+    i = name.rfind('.')
+    return name[i:].lower() if 0 < i < len(name) - 1 else ''
+
+def normalize_extension(ext):
+    """'ND2', '.nd2' -> '.nd2'; an empty string stands for files without extension."""
+    ext = ext.strip().lower()
+    return ext if not ext or ext.startswith('.') else '.' + ext
+
+def _compile_patterns(patterns):
+    """One case-insensitive regex matching any of the shell-style patterns, or None."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns), re.IGNORECASE)
+
+class FileFilter:
+    """
+    Which files a scan reports, decided from the file name alone.
+
+    The scan checks the name of each directory entry before any stat call, so files
+    that are filtered out cost nothing beyond the directory listing itself.
+
+    Args:
+        include_extensions (list): Only files with these extensions, e.g. ['.nd2', '.czi']
+        exclude_extensions (list): Never files with these extensions
+        name_patterns (list): Only files whose name matches one of these shell patterns
+        exclude_name_patterns (list): Never files whose name matches one of these
+    """
+    FIELDS = ('include_extensions', 'exclude_extensions', 'name_patterns', 'exclude_name_patterns')
+    FLAGS = {'include_extensions': '--ext', 'exclude_extensions': '--exclude-ext',
+             'name_patterns': '--name', 'exclude_name_patterns': '--exclude-name'}
+
+    def __init__(self, include_extensions=None, exclude_extensions=None, name_patterns=None,
+                 exclude_name_patterns=None):
+        self.include_extensions = sorted({normalize_extension(ext) for ext in include_extensions or []})
+        self.exclude_extensions = sorted({normalize_extension(ext) for ext in exclude_extensions or []})
+        self.name_patterns = list(name_patterns or [])
+        self.exclude_name_patterns = list(exclude_name_patterns or [])
+        self._included = frozenset(self.include_extensions)
+        self._excluded = frozenset(self.exclude_extensions)
+        self._names = _compile_patterns(self.name_patterns)
+        self._excluded_names = _compile_patterns(self.exclude_name_patterns)
+
+    @classmethod
+    def from_options(cls, options):
+        """Filter from a config dict or parsed arguments with the FIELDS as keys/attributes."""
+        if not isinstance(options, dict):
+            options = vars(options)
+        return cls(**{field: options.get(field) for field in cls.FIELDS})
+
+    def __bool__(self):
+        return any(getattr(self, field) for field in self.FIELDS)
+
+    def __getstate__(self):
+        # Patterns are recompiled after pickling, e.g. for process pool workers
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def matches(self, name):
+        if self._included or self._excluded:
+            ext = file_extension(name)
+            if self._included and ext not in self._included:
+                return False
+            if ext in self._excluded:
+                return False
+        if self._names is not None and not self._names.match(name):
+            return False
+        if self._excluded_names is not None and self._excluded_names.match(name):
+            return False
+        return True
+
+    def to_args(self):
+        """Command-line arguments recreating this filter (see add_filter_arguments)."""
+        args = []
+        for field in self.FIELDS:
+            values = getattr(self, field)
+            if values:
+                # '=' keeps values such as '' or '-raw*' from being read as flags
+                args.extend(f"{self.FLAGS[field]}={value}" for value in values)
+        return args
+
+    def shell_args(self):
+        """to_args() quoted for a job script, with a leading space when not empty."""
+        import shlex
+        return ''.join(' ' + shlex.quote(arg) for arg in self.to_args())
+
+def add_filter_arguments(parser):
+    """Add the --ext/--exclude-ext/--name/--exclude-name scan filter options to a parser."""
+    parser.add_argument('--ext', dest='include_extensions', action='append',
+                        help='Only scan files with this extension (repeatable), e.g. --ext .nd2 --ext .czi')
+    parser.add_argument('--exclude-ext', dest='exclude_extensions', action='append',
+                        help='Skip files with this extension (repeatable).')
+    parser.add_argument('--name', dest='name_patterns', action='append',
+                        help="Only scan files whose name matches this shell pattern (repeatable), e.g. 'mouse*'")
+    parser.add_argument('--exclude-name', dest='exclude_name_patterns', action='append',
+                        help="Skip files whose name matches this shell pattern (repeatable), e.g. '*.tmp'")
+
+# How the scan walks directories, as config.json keys (see add_walk_arguments)
+WALK_FIELDS = ('hardlinks', 'follow_symlinks', 'one_file_system')
+
+def add_walk_arguments(parser, hardlinks_default='once'):
+    """
+    Add the --hardlinks/--follow-symlinks/--one-file-system scan options to a parser.
+
+    Cluster_Seeker passes hardlinks_default=None so the config's value applies unless
+    the flag is given.
+    """
+    parser.add_argument('--hardlinks', choices=['once', 'all'], default=hardlinks_default,
+                        help='Count hard-linked files once or list all of their names. Links are only '
+                             'recognized within one batch of directories, so a file linked from '
+                             'directories in different batches is counted by each of them.')
+    parser.add_argument('--follow-symlinks', action='store_true', help='Descend into symlinked directories.')
+    parser.add_argument('--one-file-system', action='store_true', help='Do not cross into other devices.')
+
+def walk_flags(options):
+    """Command-line flags for a job script recreating the walk options of a config dict or parsed arguments."""
+    if not isinstance(options, dict):
+        options = vars(options)
+    flags = ''
+    if options.get('hardlinks') and options['hardlinks'] != 'once':
+        flags += f" --hardlinks {options['hardlinks']}"
+    if options.get('follow_symlinks'):
+        flags += ' --follow-symlinks'
+    if options.get('one_file_system'):
+        flags += ' --one-file-system'
+    return flags
+
+def file_row(name, directory, stats):
+    """Build the output row for a file from its stat result."""
+    # The same stat fields are written on every platform; only the column labels differ.
+    return [
+        name,
+        file_extension(name),
+        stats.st_size,
+        stats.st_mtime,
+        stats.st_ctime,
+        stats.st_atime,
+        directory
+    ]
+
+# Function to gather file information
+def gather_file_info(directories, hardlinks='once', follow_symlinks=False, one_file_system=False,
+                     file_filter=None, top_files=None, keep_rows=True, governor=None, recursive=True):
+    """
+    Gather file information for every file under the given batch entries.
+
+    Files are identified by (st_dev, st_ino) so that hard links are stat'd only once:
+    with hardlinks='once' a hard-linked file is reported under the first name reached,
+    with hardlinks='all' every name is listed. Directories are tracked the same way, so
+    directories repeated in a batch and symlink loops are walked only once.
+
+    Batch files list every directory of the scan (see list_all_directories.py), spread
+    over several batches, so process_batch passes recursive=False: each entry then only
+    reports its own files, and every file is reported by the one batch listing its
+    directory. Directories the listing does not descend into are listed as
+    recursive_entry()s and are always walked completely, as are symlinked directories
+    with follow_symlinks. Hard links are only recognized within a batch.
+
+    Args:
+        directories (list): Directories (or single files) to scan, or recursive_entry()s
+        hardlinks (str): 'once' to count each inode once, 'all' to list every name
+        follow_symlinks (bool): Descend into symlinked directories
+        one_file_system (bool): Do not cross into directories on other devices
+        file_filter (FileFilter): Only report files it matches; others are never stat'd
+        top_files (TopFiles): Rankings every reported row is added to as it is found
+        keep_rows (bool): Return the rows; without it only top_files sees them, so memory
+            does not grow with the number of files
+        governor (MetadataGovernor): Paces the stat and readdir calls to a shared budget
+            (see io_governor.py)
+        recursive (bool): Walk the subdirectories of each plain entry, not only its files
+
+    Returns:
+        list: One row per file, see file_row()
+    """
+    file_info_list = []
+    seen_files = {}
+    visited_dirs = set()
+    skipped_links = 0
+    skipped_bytes = 0
+    filtered_out = 0
+    wanted = file_filter.matches if file_filter else None
+    if governor is not None:
+        stat, entry_stat, scandir = governor.stat, governor.entry_stat, governor.scandir
+    else:
+        stat, entry_stat, scandir = os.stat, os.DirEntry.stat, os.scandir
+
+    def add_file(name, directory, path, key, stats):
+        nonlocal skipped_links, skipped_bytes
+        if key not in seen_files:
+            if stats is None:
+                stats = stat(path)
+            key = (stats.st_dev, stats.st_ino)
+        if key in seen_files:
+            if hardlinks == 'once':
+                skipped_links += 1
+                skipped_bytes += seen_files[key].st_size
+                return
+            stats = seen_files[key]
+        elif stats.st_nlink > 1:
+            # Only inodes with other names can be reached again
+            seen_files[key] = stats
+        row = file_row(name, directory, stats)
+        if top_files is not None:
+            top_files.add(row)
+        if keep_rows:
+            file_info_list.append(row)
+
+    for entry in directories:
+        entry, walk_entry = parse_entry(entry)
+        entry_path = Path(entry)
+        if governor is not None:
+            governor.spend()
+        if entry_path.is_file():
+            # Process single file
+            if wanted is not None and not wanted(entry_path.name):
+                filtered_out += 1
+                continue
+            try:
+                add_file(entry_path.name, str(entry_path.parent), str(entry_path), None, None)
+            except Exception as e:
+                print(f"Error processing file {entry_path}: {e}")
+        elif entry_path.is_dir():
+            try:
+                root_stats = stat(entry_path)
+            except Exception as e:
+                print(f"Error scanning directory {entry_path}: {e}")
+                continue
+            root_key = (root_stats.st_dev, root_stats.st_ino)
+            if root_key in visited_dirs:
+                continue
+            visited_dirs.add(root_key)
+
+            # (directory, its device, whether its subdirectories are walked too)
+            stack = [(str(entry_path), root_stats.st_dev, recursive if walk_entry is None else walk_entry)]
+            with Progress(f"Scanning {entry}") as pbar:
+                while stack:
+                    root, root_dev, walk_subdirs = stack.pop()
+                    subdirs = []
+                    try:
+                        with scandir(root) as it:
+                            for dir_entry in it:
+                                file_path = os.path.join(root, dir_entry.name)
+                                try:
+                                    if dir_entry.is_dir():
+                                        is_link = dir_entry.is_symlink()
+                                        if is_link and not follow_symlinks:
+                                            continue
+                                        # Other directories are entries of their own
+                                        if not (walk_subdirs or is_link):
+                                            continue
+                                        dir_stats = entry_stat(dir_entry)
+                                        if one_file_system and dir_stats.st_dev != root_stats.st_dev:
+                                            continue
+                                        dir_key = (dir_stats.st_dev, dir_stats.st_ino)
+                                        if dir_key not in visited_dirs:
+                                            visited_dirs.add(dir_key)
+                                            subdirs.append((file_path, dir_stats.st_dev, True))
+                                    elif wanted is not None and not wanted(dir_entry.name):
+                                        filtered_out += 1
+                                    elif dir_entry.is_symlink() or os.name == 'nt':
+                                        add_file(dir_entry.name, root, file_path, None, None)
+                                    else:
+                                        # d_ino from readdir lets known hard links skip the stat call
+                                        add_file(dir_entry.name, root, file_path, (root_dev, dir_entry.inode()), None)
+                                except Exception as e:
+                                    print(f"Error processing file {file_path}: {e}")
+                    except Exception as e:
+                        print(f"Error scanning directory {root}: {e}")
+                    stack.extend(reversed(subdirs))
+                    pbar.update(1)
+
+    if filtered_out:
+        print(f"Skipped {filtered_out} files excluded by the extension/name filters.")
+    if skipped_links:
+        print(f"Skipped {skipped_links} additional hard links ({skipped_bytes} bytes already counted).")
+    return file_info_list
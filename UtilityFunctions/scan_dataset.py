@@ -0,0 +1,176 @@
+import os
+import glob
+import shutil
+import platform
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from UtilityFunctions.mount_map import get_mount_map
+from UtilityFunctions.scan_core import temp_path
+
+# Scan results are stored as one Parquet file per (extension, batch):
+#   Seeker_Output/dataset/extension=.tif/batch_1.parquet
+#   Seeker_Output/dataset/extension=.czi/batch_1.parquet
+# Each row is stored exactly once, and readers only open the partitions they ask for.
+#
+# Instead of a full 'File Path' per row, files are stored as 'Directory' + 'File Name'.
+# 'Directory' is dictionary-encoded: each file holds a table of distinct directories and
+# every row only stores an index into it. Full paths are rebuilt on demand.
+DATASET_DIR_NAME = 'dataset'
+PARTITION_PREFIX = 'extension='
+NO_EXTENSION = '__no_extension__'
+DIRECTORY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# Columns of the rows built by scan_core.file_row(); ctime is the creation time on Windows
+if platform.system() == "Windows":
+    SCAN_COLUMNS = ['File Name', 'File Extension', 'File Size', 'Created Time', 'Modified Time', 'Accessed Time', 'Directory']
+else:
+    SCAN_COLUMNS = ['File Name', 'File Extension', 'File Size', 'Modified Time', 'Change Time', 'Accessed Time', 'Directory']
+
+def rows_to_frame(rows):
+    """DataFrame of scan rows with datetime times and a categorical 'Directory'."""
+    df = pd.DataFrame(rows, columns=SCAN_COLUMNS)
+    # Paths are stored as a directory table plus per-file codes; see with_file_paths()
+    df['Directory'] = df['Directory'].astype('category')
+    # Convert times from epoch to datetimes
+    for column in SCAN_COLUMNS:
+        if column.endswith(' Time'):
+            df[column] = pd.to_datetime(df[column], unit='s')
+    return df
+
+def dataset_dir_for(output_folder):
+    """Return the dataset directory inside a Seeker_Output folder."""
+    return os.path.join(output_folder, DATASET_DIR_NAME)
+
+def clear_dataset(output_folder):
+    """Remove the dataset left by a previous run so batch and merge outputs start fresh."""
+    dataset_dir = dataset_dir_for(output_folder)
+    if os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+
+def partition_name(ext):
+    """Directory name of the partition holding files with extension ext."""
+    return PARTITION_PREFIX + (quote(ext, safe='.') if ext else NO_EXTENSION)
+
+def extension_from_partition(name):
+    """Inverse of partition_name()."""
+    value = name[len(PARTITION_PREFIX):]
+    return '' if value == NO_EXTENSION else unquote(value)
+
+def list_extensions(dataset_dir):
+    """List the extensions present in a dataset without reading any data."""
+    if not os.path.isdir(dataset_dir):
+        return []
+    return sorted(
+        extension_from_partition(name) for name in os.listdir(dataset_dir)
+        if name.startswith(PARTITION_PREFIX) and os.path.isdir(os.path.join(dataset_dir, name))
+    )
+
+def partition_files(dataset_dir, extensions=None):
+    """Return the Parquet files for the given extensions (all extensions if None)."""
+    if extensions is None:
+        extensions = list_extensions(dataset_dir)
+    files = []
+    for ext in extensions:
+        files.extend(sorted(glob.glob(os.path.join(dataset_dir, glob.escape(partition_name(ext)), '*.parquet'))))
+    return files
+
+def write_batch_partitions(df, dataset_dir, batch_name):
+    """
+    Write one batch's rows into the dataset, one file per extension.
+
+    Files left by an earlier run of the same batch are replaced, and each file is
+    written under a temporary name first so readers never see a partial file.
+
+    Args:
+        df (DataFrame): Rows for the batch, including a 'File Extension' column
+        dataset_dir (str): Root directory of the dataset
+        batch_name (str): Name of the batch, e.g. 'batch_1'
+
+    Returns:
+        list: Paths of the files written
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(dataset_dir, PARTITION_PREFIX + '*', glob.escape(batch_name) + '.parquet')):
+        try:
+            os.remove(stale)
+        except FileNotFoundError:
+            pass  # Removed by another worker running the same batch
+
+    written = []
+    for ext, group in df.groupby('File Extension', dropna=False, sort=True):
+        written.append(write_partition(group, dataset_dir, ext if isinstance(ext, str) else '', batch_name))
+    return written
+
+def write_partition(group, dataset_dir, ext, file_stem):
+    """Write the rows of one extension to <partition>/<file_stem>.parquet, replacing it atomically."""
+    partition_dir = os.path.join(dataset_dir, partition_name(ext))
+    os.makedirs(partition_dir, exist_ok=True)
+    output_file = os.path.join(partition_dir, f"{file_stem}.parquet")
+    temp_file = temp_path(output_file)
+    if 'Directory' in group.columns:
+        # Each file's directory table only holds the directories it uses
+        group = group.assign(Directory=group['Directory'].astype('category').cat.remove_unused_categories())
+    table = pa.Table.from_pandas(group, preserve_index=False)
+    if 'Directory' in table.column_names:
+        # Fixed index width so partitions written by different batches share one schema
+        column = table.column_names.index('Directory')
+        table = table.set_column(column, 'Directory', pc.cast(table.column('Directory'), DIRECTORY_TYPE))
+    pq.write_table(table, temp_file)
+    os.replace(temp_file, output_file)
+    return output_file
+
+def read_extensions(dataset_dir, extensions=None, columns=None):
+    """Read the rows for the given extensions, touching only their partitions."""
+    files = partition_files(dataset_dir, extensions)
+    if not files:
+        return pd.DataFrame(columns=columns)
+    table = ds.dataset(files, format='parquet').to_table(columns=columns)
+    # One directory table for all files, so 'Directory' stays categorical
+    return table.unify_dictionaries().to_pandas()
+
+def directory_prefixes(directories):
+    """Return each directory with its trailing separator, ready to prepend to file names."""
+    prefixes = []
+    for directory in directories:
+        # Output may be read on a different OS than it was scanned on
+        sep = '\\' if directory[1:2] == ':' or ('\\' in directory and '/' not in directory) else '/'
+        prefixes.append(directory if directory.endswith(sep) else directory + sep)
+    return prefixes
+
+def with_file_paths(df, path_style=None, mount_map=None):
+    """
+    Return df with 'Directory' replaced by the rebuilt 'File Path' column.
+
+    With path_style ('linux', 'windows' or 'local') the directories are first
+    translated through the mount map, so results scanned on one OS can be viewed
+    with the other OS's paths.
+    """
+    directories = df['Directory'].astype('category')
+    if path_style:
+        directories = (mount_map or get_mount_map()).translate_series(directories, path_style)
+    prefixes = np.array(directory_prefixes(directories.cat.categories), dtype=object)
+    df = df.drop(columns='Directory')
+    df['File Path'] = prefixes[directories.cat.codes.to_numpy()] + df['File Name'].to_numpy(dtype=object)
+    return df
+
+def translate_directory_array(directories, path_style, mount_map=None):
+    """Translate an Arrow array of directories, touching only its distinct values."""
+    if not pa.types.is_dictionary(directories.type):
+        directories = pc.dictionary_encode(directories)
+    if not path_style:
+        return directories
+    mount_map = mount_map or get_mount_map()
+    translate = {'linux': mount_map.to_linux, 'windows': mount_map.to_windows, 'local': mount_map.to_local}[path_style]
+    dictionary = pa.array([translate(directory) for directory in directories.dictionary.to_pylist()], pa.string())
+    return pa.DictionaryArray.from_arrays(directories.indices, dictionary)
+
+def arrow_file_paths(directories, names, path_style=None, mount_map=None):
+    """Rebuild file paths for Arrow arrays of directories and file names."""
+    directories = translate_directory_array(directories, path_style, mount_map)
+    prefixes = pa.array(directory_prefixes(directories.dictionary.to_pylist()), names.type)
+    return pc.binary_join_element_wise(prefixes.take(directories.indices), names, pa.scalar('', names.type))
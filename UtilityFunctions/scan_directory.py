@@ -1,8 +1,11 @@
 import os
+import sys
 import argparse
-import platform
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.mount_map import convert_path_format
+
 def is_parent(path, other_paths):
     path = Path(path)
     return any(Path(other).is_relative_to(path) for other in other_paths if other != str(path))
@@ -10,21 +13,6 @@ def is_parent(path, other_paths):
 def filter_child_directories(directories):
     return [dir for dir in directories if not is_parent(dir, directories)]
 
-def convert_path_format(path):
-    """Convert path between Windows and Linux formats based on the current OS."""
-    system = platform.system()
-
-    if system == "Windows":
-        # If on Windows and path looks like a Linux path starting with /nfs/turbo
-        if path.startswith('/nfs/turbo'):
-            return path.replace('/nfs/turbo/lsa-adae', 'Z:').replace('/', '\\')
-        return path.replace('/', '\\')
-    else:  # Linux or other Unix-like
-        # If on Linux and path looks like a Windows path starting with Z:
-        if path.startswith('Z:'):
-            return path.replace('Z:', '/nfs/turbo/lsa-adae').replace('\\', '/')
-        return path.replace('\\', '/')
-
 def scan_directory(directory, output_file, job_id):
     """Scan a single directory for subdirectories and write results to output file."""
     print(f"Job {job_id}: Scanning directory {directory}")
@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import shlex
+import signal
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.slurm_jobs import submit_job, parse_slurm_time, SLURM_LOG_DIR, LOCAL_SPOOL_ENV_VAR
+
+# Job states reported by the schedulers below follow SLURM's names.
+ACTIVE_STATES = {'PENDING', 'RUNNING', 'REQUEUED', 'RESIZING', 'SUSPENDED', 'CONFIGURING', 'COMPLETING'}
+SUCCESS_STATE = 'COMPLETED'
+
+class Scheduler(ABC):
+    """
+    What the job supervisor needs from a batch scheduler.
+
+    submit() returns a job ID (or None on failure); states() maps job IDs to a state
+    such as PENDING, RUNNING, COMPLETED, TIMEOUT or OUT_OF_MEMORY, leaving out jobs
+    the scheduler does not know about yet.
+    """
+
+    @abstractmethod
+    def submit(self, script_path, hold=False):
+        ...
+
+    @abstractmethod
+    def states(self, job_ids):
+        ...
+
+    @abstractmethod
+    def release(self, job_id):
+        ...
+
+    @abstractmethod
+    def cancel(self, job_id):
+        ...
+
+    def drain(self):
+        """
+        Run the submitted jobs to the end if the scheduler needs this process for that.
+
+        SLURM runs jobs after the submitting process has exited, so by default this
+        returns True right away; see LocalScheduler.
+        """
+        return True
+
+    def stop(self):
+        """
+        Cancel the jobs that would not survive this process exiting.
+
+        SLURM jobs do, so by default nothing is cancelled; see LocalScheduler.
+        """
+
+class SlurmScheduler(Scheduler):
+    """Scheduler backed by sbatch, sacct/squeue, scontrol and scancel."""
+
+    def submit(self, script_path, hold=False):
+        return submit_job(script_path, hold=hold)
+
+    def states(self, job_ids):
+        if not job_ids:
+            return {}
+        states = {}
+        try:
+            result = subprocess.run(['sacct', '-n', '-P', '-X', '-o', 'JobID,State', '-j', ','.join(job_ids)],
+                                    capture_output=True, text=True, check=True)
+            for line in result.stdout.splitlines():
+                job_id, _, state = line.partition('|')
+                if job_id in job_ids and state:
+                    # e.g. "CANCELLED by 1234"
+                    states[job_id] = state.split()[0]
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"✗ sacct failed, falling back to squeue: {e}")
+
+        missing = [job_id for job_id in job_ids if job_id not in states]
+        if missing:
+            try:
+                result = subprocess.run(['squeue', '-h', '-o', '%i|%T', '-j', ','.join(missing)],
+                                        capture_output=True, text=True)
+                for line in result.stdout.splitlines():
+                    job_id, _, state = line.partition('|')
+                    if job_id in missing and state:
+                        states[job_id] = state.strip()
+            except OSError as e:
+                print(f"✗ squeue failed: {e}")
+        return states
+
+    def release(self, job_id):
+        subprocess.run(['scontrol', 'release', job_id], check=False)
+
+    def cancel(self, job_id):
+        subprocess.run(['scancel', job_id], check=False)
+
+# Jobs run by LocalScheduler are recorded here, one JSON file per job
+LOCAL_SPOOL_DIR = os.path.join(SLURM_LOG_DIR, 'local_jobs')
+# Seconds a job past its --time gets to exit after SIGTERM before it is killed
+KILL_GRACE_SECONDS = 10
+# Variables a local job takes from the process that submitted it (e.g. the metadata
+# budget exported by a job script); everything else comes from the runner. Only these
+# are written to the spool, never the rest of the submitter's environment.
+SUBMITTER_ENV_PREFIXES = ('SEEKER_', 'CONDA_')
+SUBMITTER_ENV_VARS = ('PATH', 'VIRTUAL_ENV', 'PYTHONPATH', 'PYTHONHOME', 'LD_LIBRARY_PATH')
+
+def passed_to_jobs(name):
+    return name.startswith(SUBMITTER_ENV_PREFIXES) or name in SUBMITTER_ENV_VARS
+
+def read_directives(script_path):
+    """The #SBATCH options of a job script, e.g. {'time': '1:00:00', 'dependency': 'afterok:3:4'}."""
+    directives = {}
+    with open(script_path, 'r') as script:
+        for line in script:
+            if line.startswith('#SBATCH'):
+                for arg in shlex.split(line[len('#SBATCH'):]):
+                    key, _, value = arg.lstrip('-').partition('=')
+                    directives[key] = value
+            elif line.strip() and not line.startswith('#'):
+                # sbatch stops reading directives at the first command
+                break
+    return directives
+
+class LocalScheduler(Scheduler):
+    """
+    Runs the same job scripts on this machine with bash instead of submitting them to SLURM.
+
+    The #SBATCH directives are honored as far as they apply to one machine:
+    --dependency=afterok:..., --cpus-per-task (running jobs share `slots` CPUs), --time
+    (a job running over it ends with TIMEOUT) and --output. Memory is not limited, and
+    scripts asking for a job array (--array) are rejected rather than run once. As with
+    sbatch, a job sees the SEEKER_*, PATH and Python environment variables of the process
+    that submitted it (see passed_to_jobs). The spool is only readable by its owner.
+
+    Jobs are recorded in spool_dir so that jobs submitting further jobs (batch workers,
+    the merge tree) reach this scheduler from their own processes: submit_job() adds
+    them to the spool named by $SEEKER_LOCAL_SPOOL, which is set for every job run
+    here. Only the process that called start() runs jobs.
+    """
+
+    def __init__(self, spool_dir=LOCAL_SPOOL_DIR, slots=None, poll_interval=1.0):
+        self.spool_dir = os.path.abspath(spool_dir)
+        self.slots = slots or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        # job ID -> (Popen, log file, start time) of the jobs this process runs
+        self.processes = {}
+        self._lock = threading.Lock()
+        self._runner = None
+        os.makedirs(self.spool_dir, mode=0o700, exist_ok=True)
+
+    def _path(self, job_id, suffix='.json'):
+        return os.path.join(self.spool_dir, f"{job_id}{suffix}")
+
+    def _read(self, job_id):
+        try:
+            with open(self._path(job_id), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, job):
+        temp_path = self._path(job['id'], f".{os.getpid()}.tmp")
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            json.dump(job, f)
+        os.replace(temp_path, self._path(job['id']))
+
+    def _jobs(self):
+        jobs = {}
+        for name in os.listdir(self.spool_dir):
+            if name.endswith('.json'):
+                job = self._read(name[:-len('.json')])
+                if job is not None:
+                    jobs[job['id']] = job
+        return jobs
+
+    def _reserve_id(self):
+        """A new job ID, reserved with an exclusive create so concurrent submitters get different ones."""
+        taken = [int(name.split('.')[0]) for name in os.listdir(self.spool_dir) if name.endswith('.id')]
+        job_id = max(taken, default=0) + 1
+        while True:
+            try:
+                os.close(os.open(self._path(job_id, '.id'), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return str(job_id)
+            except FileExistsError:
+                job_id += 1
+
+    def clear(self):
+        """Forget the jobs of an earlier run."""
+        for name in os.listdir(self.spool_dir):
+            os.remove(os.path.join(self.spool_dir, name))
+
+    def submit(self, script_path, hold=False):
+        try:
+            directives = read_directives(script_path)
+        except OSError as e:
+            print(f"✗ Failed to read job script {script_path}: {e}")
+            return None
+        dependency = directives.get('dependency', '')
+        if dependency and not dependency.startswith('afterok:'):
+            print(f"✗ Unsupported dependency for local jobs: {dependency}")
+            return None
+        if 'array' in directives:
+            print(f"✗ Job arrays are not supported for local jobs: {script_path} asks for --array={directives['array']}")
+            return None
+        cwd = os.getcwd()
+        job = {
+            'id': self._reserve_id(),
+            'name': directives.get('job-name', os.path.basename(script_path)),
+            'script': os.path.abspath(script_path),
+            'cwd': cwd,
+            'log': os.path.join(cwd, directives['output']) if 'output' in directives else None,
+            'cpus': int(directives.get('cpus-per-task', 1)),
+            'minutes': parse_slurm_time(directives['time']) if 'time' in directives else None,
+            'after': dependency.split(':')[1:],
+            'held': hold,
+            'state': 'PENDING',
+            # e.g. the metadata budget variables exported by the submitting job
+            'env': {name: value for name, value in os.environ.items() if passed_to_jobs(name)},
+        }
+        self._write(job)
+        return job['id']
+
+    def states(self, job_ids):
+        states = {}
+        for job_id in job_ids:
+            job = self._read(job_id)
+            if job is not None:
+                states[job_id] = job['state']
+        return states
+
+    def release(self, job_id):
+        with self._lock:
+            job = self._read(job_id)
+            if job is not None:
+                job['held'] = False
+                self._write(job)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._read(job_id)
+            if job is None or job['state'] not in ACTIVE_STATES:
+                return
+            if job_id in self.processes:
+                os.killpg(self.processes[job_id][0].pid, signal.SIGTERM)
+            job['state'] = 'CANCELLED'
+            self._write(job)
+
+    def stop(self):
+        """Cancel every job that has not finished; they only run while this process does."""
+        for job_id, job in self._jobs().items():
+            if job['state'] in ACTIVE_STATES:
+                self.cancel(job_id)
+
+    def start(self):
+        """Start running jobs from the spool in a background thread of this process."""
+        if self._runner is None:
+            self._runner = threading.Thread(target=self._run, daemon=True)
+            self._runner.start()
+
+    def drain(self):
+        """
+        Run jobs until every job that is not held has finished.
+
+        Returns:
+            bool: True if all jobs completed successfully
+        """
+        self.start()
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                jobs = self._jobs()
+                if not any(job['state'] in ACTIVE_STATES and not job['held'] for job in jobs.values()):
+                    break
+        failed = [job for job in jobs.values() if job['state'] != SUCCESS_STATE]
+        for job in failed:
+            print(f"✗ Local job {job['id']} ({job['name']}) ended with {job['state']}; see {job['log']}")
+        return not failed
+
+    def _run(self):
+        while True:
+            with self._lock:
+                try:
+                    self._step()
+                except Exception as e:
+                    print(f"✗ Local scheduler error: {e}")
+            time.sleep(self.poll_interval)
+
+    def _step(self):
+        """Record jobs that ended, end jobs past their time limit and start jobs that are ready."""
+        jobs = self._jobs()
+        now = time.monotonic()
+        for job_id, (process, log, started) in list(self.processes.items()):
+            job = jobs[job_id]
+            code = process.poll()
+            if code is None:
+                if job['minutes'] and now - started > job['minutes'] * 60:
+                    os.killpg(process.pid, signal.SIGTERM)
+                    try:
+                        process.wait(KILL_GRACE_SECONDS)
+                    except subprocess.TimeoutExpired:
+                        os.killpg(process.pid, signal.SIGKILL)
+                        process.wait()
+                    job['state'] = 'TIMEOUT'
+                    self._write(job)
+                else:
+                    continue
+            log.close()
+            del self.processes[job_id]
+            # A cancelled or timed-out job keeps the state it was given
+            if job['state'] == 'RUNNING':
+                job['state'] = SUCCESS_STATE if code == 0 else 'FAILED'
+                self._write(job)
+            print(f"{'✓' if job['state'] == SUCCESS_STATE else '✗'} Local job {job_id} ({job['name']}) "
+                  f"ended with {job['state']}")
+
+        used = sum(jobs[job_id]['cpus'] for job_id in self.processes)
+        for job in sorted(jobs.values(), key=lambda job: int(job['id'])):
+            if job['state'] != 'PENDING' or job['held']:
+                continue
+            dependencies = [jobs.get(job_id) for job_id in job['after']]
+            if any(dependency is None or dependency['state'] not in ACTIVE_STATES | {SUCCESS_STATE}
+                   for dependency in dependencies):
+                # SLURM would leave the job pending forever (DependencyNeverSatisfied)
+                print(f"✗ Local job {job['id']} ({job['name']}) cancelled: a dependency did not complete")
+                job['state'] = 'CANCELLED'
+                self._write(job)
+                continue
+            if any(dependency['state'] != SUCCESS_STATE for dependency in dependencies):
+                continue
+            # A job asking for more than all slots still runs, alone
+            if self.processes and used + job['cpus'] > self.slots:
+                continue
+            self._launch(job)
+            used += job['cpus']
+
+    def _launch(self, job):
+        log_path = job['log'] or os.devnull
+        if job['log']:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        log = open(log_path, 'w')
+        env = {name: value for name, value in os.environ.items() if not passed_to_jobs(name)}
+        env.update(job['env'], SLURM_JOB_ID=job['id'], SLURM_JOB_NAME=job['name'],
+                   SLURM_CPUS_PER_TASK=str(job['cpus']), **{LOCAL_SPOOL_ENV_VAR: self.spool_dir})
+        # Its own process group, so a cancel or timeout also ends the commands it started
+        process = subprocess.Popen(['bash', job['script']], cwd=job['cwd'], env=env,
+                                   stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        self.processes[job['id']] = (process, log, time.monotonic())
+        job['state'] = 'RUNNING'
+        self._write(job)
+        print(f"▶ Started local job {job['id']} ({job['name']})")
+
+def scheduler_for(config):
+    """
+    The backend named by the config's "scheduler": "slurm" (default) or "local".
+
+    A local scheduler forgets the jobs of an earlier run and starts running jobs in
+    this process; "local_slots" caps the CPUs its jobs use together (default: all).
+    """
+    backend = config.get('scheduler', 'slurm')
+    if backend == 'slurm':
+        return SlurmScheduler()
+    if backend == 'local':
+        scheduler = LocalScheduler(slots=config.get('local_slots'))
+        scheduler.clear()
+        scheduler.start()
+        return scheduler
+    raise ValueError(f"Unknown scheduler: {backend}")
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Indexes built once when rows are loaded into the GUI, so filtering while typing
+# never rescans the DataFrame:
+#   - file names lowercased into one contiguous Arrow array, searched with Arrow's
+#     substring kernel; a query that extends the previous one only searches the
+#     previous hits, so each keystroke gets cheaper
+#   - the permutation that sorts each numeric/time column, so a range is two binary
+#     searches and a slice of that permutation
+SIZE_COLUMN = 'File Size'
+NAME_COLUMN = 'File Name'
+
+class SortedColumn:
+    """Values of one column in sorted order, with the row each came from."""
+
+    def __init__(self, values):
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order]
+
+    def rows_between(self, low=None, high=None):
+        """Rows with low <= value < high (either bound optional), in sorted-value order."""
+        start = 0 if low is None else np.searchsorted(self.sorted_values, low, side='left')
+        stop = len(self.sorted_values) if high is None else np.searchsorted(self.sorted_values, high, side='left')
+        return self.order[start:max(start, stop)]
+
+class SearchIndex:
+    """
+    Substring and range filtering over the rows of a DataFrame.
+
+    search() returns the matching row positions in ascending order.
+    """
+
+    def __init__(self, df, name_column=NAME_COLUMN):
+        self.num_rows = len(df)
+        names = df[name_column] if name_column in df.columns else df.iloc[:, 0]
+        self.names = pc.utf8_lower(pa.array(names.fillna('').astype(str), type=pa.large_string(), from_pandas=True))
+        self.columns = {}
+        if SIZE_COLUMN in df.columns:
+            sizes = pd.to_numeric(df[SIZE_COLUMN], errors='coerce').fillna(-1).to_numpy(dtype=np.float64)
+            self.columns[SIZE_COLUMN] = SortedColumn(sizes)
+        for column in df.columns:
+            if column.endswith(' Time'):
+                times = pd.to_datetime(df[column], errors='coerce')
+                self.columns[column] = SortedColumn(times.to_numpy(dtype='datetime64[ns]').astype(np.int64))
+        self._last_text = None
+        self._last_ranges = None
+        self._last_rows = None
+
+    def range_rows(self, column, low=None, high=None):
+        """Rows of column within [low, high); times may be given as anything pandas parses."""
+        if column not in self.columns:
+            raise KeyError(f"No index for column: {column}")
+        if column != SIZE_COLUMN:
+            low = None if low is None else pd.Timestamp(low).value
+            high = None if high is None else pd.Timestamp(high).value
+        return self.columns[column].rows_between(low, high)
+
+    def _match_names(self, text, candidates):
+        if candidates is None or len(candidates) > self.num_rows // 4:
+            # Gathering most of the names costs more than scanning all of them
+            matches = pc.match_substring(self.names, text).to_numpy(zero_copy_only=False)
+            if candidates is None or len(candidates) == self.num_rows:
+                return np.flatnonzero(matches)
+            return candidates[matches[candidates]]
+        names = self.names.take(pa.array(candidates))
+        return candidates[np.flatnonzero(pc.match_substring(names, text).to_numpy(zero_copy_only=False))]
+
+    def search(self, text='', ranges=None):
+        """
+        Rows whose file name contains text (case-insensitive) and whose columns fall
+        within ranges, a dict of column -> (low, high) with None for an open bound.
+        """
+        ranges = {column: bounds for column, bounds in (ranges or {}).items()
+                  if column in self.columns and bounds != (None, None)}
+        candidates = None
+        for column, (low, high) in ranges.items():
+            mask = np.zeros(self.num_rows, dtype=bool)
+            mask[self.range_rows(column, low, high)] = True
+            candidates = mask if candidates is None else candidates & mask
+        if candidates is not None:
+            candidates = np.flatnonzero(candidates)
+
+        text = text.lower()
+        if not text:
+            return np.arange(self.num_rows) if candidates is None else candidates
+
+        range_key = tuple(sorted(ranges.items()))
+        if self._last_text is not None and self._last_ranges == range_key and self._last_text in text:
+            # Typing more only removes matches, so search the previous hits
+            candidates = self._last_rows
+        rows = self._match_names(text, candidates)
+        self._last_text, self._last_ranges, self._last_rows = text, range_key, rows
+        return rows
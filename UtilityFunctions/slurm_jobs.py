@@ -0,0 +1,161 @@
+import os
+import re
+import subprocess
+
+from UtilityFunctions.io_governor import BUDGET_FILE_NAME, budget_environment
+
+SLURM_LOG_DIR = 'slurm_logs'
+
+# Jobs record their measured throughput in this file (see resource_model.py)
+HISTORY_FILE_NAME = 'throughput_history.jsonl'
+HISTORY_ENV_VAR = 'SEEKER_HISTORY_FILE'
+
+# Set for jobs run by schedulers.LocalScheduler: jobs they submit go to this spool
+LOCAL_SPOOL_ENV_VAR = 'SEEKER_LOCAL_SPOOL'
+
+MEMORY_UNITS_MB = {'K': 1 / 1024, 'M': 1, 'G': 1024, 'T': 1024 ** 2}
+
+def parse_slurm_time(value):
+    """Convert a SLURM time limit (MM, MM:SS, HH:MM:SS, D-HH, D-HH:MM, D-HH:MM:SS) to minutes."""
+    value = str(value).strip()
+    days = 0
+    if '-' in value:
+        day_part, value = value.split('-', 1)
+        days = int(day_part)
+        parts = [int(part) for part in value.split(':')] + [0, 0]
+        hours, minutes, seconds = parts[:3]
+    else:
+        parts = [int(part) for part in value.split(':')]
+        if len(parts) == 1:
+            hours, minutes, seconds = 0, parts[0], 0
+        elif len(parts) == 2:
+            hours, minutes, seconds = 0, parts[0], parts[1]
+        else:
+            hours, minutes, seconds = parts[:3]
+    return days * 24 * 60 + hours * 60 + minutes + (1 if seconds else 0)
+
+def format_slurm_time(minutes):
+    """Format minutes as a SLURM D-HH:MM:SS time limit."""
+    minutes = max(1, int(round(minutes)))
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{days}-{hours:02d}:{minutes:02d}:00"
+
+def parse_slurm_memory(value):
+    """Convert a SLURM memory request such as 4000, 500M or 16G to megabytes."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?)B?\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid SLURM memory: {value}")
+    return int(float(match.group(1)) * MEMORY_UNITS_MB[match.group(2) or 'M'])
+
+def format_slurm_memory(megabytes):
+    """Format megabytes as a SLURM memory request, in G when it divides evenly."""
+    megabytes = max(1, int(megabytes))
+    return f"{megabytes // 1024}G" if megabytes % 1024 == 0 else f"{megabytes}M"
+
+def history_file_for(config):
+    """Absolute path of the throughput history used by the jobs of this config."""
+    if 'history_file' in config:
+        return os.path.abspath(config['history_file'])
+    return os.path.abspath(os.path.join(config.get('project_directory', '.'), SLURM_LOG_DIR, HISTORY_FILE_NAME))
+
+def io_budget_file_for(config):
+    """
+    Absolute path of the metadata budget state shared by the jobs of this config.
+
+    With "max_metadata_ops" in the config, every job shares that budget of stat/readdir
+    calls per second through this file (see io_governor.py).
+    """
+    if 'io_budget_file' in config:
+        return os.path.abspath(config['io_budget_file'])
+    return os.path.abspath(os.path.join(config.get('project_directory', '.'), SLURM_LOG_DIR, BUDGET_FILE_NAME))
+
+def write_sbatch_header(script_file, config, job_name, log_file, dependency=None):
+    """Write the #SBATCH directives and environment setup shared by all Seeker jobs."""
+    script_file.write("#!/bin/bash\n")
+    script_file.write(f"#SBATCH --job-name={job_name}\n")
+    script_file.write(f"#SBATCH --output={log_file}\n")
+    script_file.write(f"#SBATCH --error={log_file}\n")
+    script_file.write(f"#SBATCH --time={config['time']}\n")
+    script_file.write(f"#SBATCH --mem={config['mem']}\n")
+    script_file.write(f"#SBATCH --cpus-per-task={config['cpus_per_task']}\n")
+    if dependency:
+        script_file.write(f"#SBATCH --dependency={dependency}\n")
+
+    if 'partition' in config:
+        script_file.write(f"#SBATCH --partition={config['partition']}\n")
+    if 'account' in config:
+        script_file.write(f"#SBATCH --account={config['account']}\n")
+
+    script_file.write("\n")
+
+    if 'module' in config:
+        if isinstance(config['module'], list):
+            for module in config['module']:
+                script_file.write(f"module load {module}\n")
+        else:
+            script_file.write(f"module load {config['module']}\n")
+
+    if 'conda_env' in config:
+        script_file.write("source ~/.bashrc\n")
+        script_file.write(f"conda activate {config['conda_env']}\n")
+
+    if 'conda_lib_path' in config:
+        script_file.write(f"export LD_LIBRARY_PATH={config['conda_lib_path']}:$LD_LIBRARY_PATH\n")
+
+    if 'project_directory' in config:
+        script_file.write(f"cd {config['project_directory']}\n")
+
+    script_file.write(f"export {HISTORY_ENV_VAR}=\"{history_file_for(config)}\"\n")
+    if config.get('max_metadata_ops'):
+        for name, value in budget_environment(config['max_metadata_ops'], io_budget_file_for(config)).items():
+            script_file.write(f"export {name}=\"{value}\"\n")
+
+    script_file.write("\n")
+
+def afterok(job_ids):
+    """Dependency string that starts a job once all job_ids completed successfully."""
+    return f"afterok:{':'.join(job_ids)}" if job_ids else None
+
+def write_job_script(config, job_name, commands, dependency=None):
+    """Write a job script running the given shell commands and return its path."""
+    os.makedirs(SLURM_LOG_DIR, exist_ok=True)
+    log_file = os.path.join(SLURM_LOG_DIR, f"{job_name}.txt")
+    script_path = os.path.join(SLURM_LOG_DIR, f"{job_name}.sh")
+    with open(script_path, 'w') as script_file:
+        write_sbatch_header(script_file, config, job_name, log_file, dependency)
+        for command in commands:
+            script_file.write(f"{command}\n")
+    return script_path
+
+def submit_job(script_path, hold=False):
+    """
+    Submit a job script with sbatch and return its job ID, or None if submission failed.
+
+    A held job stays pending until it is released with "scontrol release".
+    Inside a job run by the local backend, the job is queued there instead.
+    """
+    spool_dir = os.environ.get(LOCAL_SPOOL_ENV_VAR)
+    if spool_dir:
+        from UtilityFunctions.schedulers import LocalScheduler
+        return LocalScheduler(spool_dir).submit(script_path, hold=hold)
+    command = ['sbatch', '--hold', script_path] if hold else ['sbatch', script_path]
+    try:
+        result = subprocess.run(command,
+                                capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"✗ Failed to submit job: {e}")
+        return None
+
+    output = result.stdout.strip()
+    if "Submitted batch job" not in output:
+        print(f"✗ Unexpected SLURM output: {output}")
+        return None
+
+    try:
+        job_id = output.split()[-1]
+        int(job_id)  # Validate it's a number
+    except (IndexError, ValueError) as e:
+        print(f"✗ Failed to parse job ID: {e}")
+        return None
+    return job_id
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import heapq
+import hashlib
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import (
+    dataset_dir_for, list_extensions, partition_files, with_file_paths
+)
+from UtilityFunctions.top_files import write_rankings
+
+SUMMARY_FILE_NAME = 'run_summary.json'
+
+# Fixed bin edges so per-chunk histograms can simply be added together
+SIZE_BIN_EDGES = [0, 1024, 1024 ** 2, 16 * 1024 ** 2, 256 * 1024 ** 2, 1024 ** 3,
+                  10 * 1024 ** 3, 100 * 1024 ** 3, np.inf]
+SIZE_BIN_LABELS = ['< 1 KB', '1 KB - 1 MB', '1 MB - 16 MB', '16 MB - 256 MB', '256 MB - 1 GB',
+                   '1 GB - 10 GB', '10 GB - 100 GB', '>= 100 GB']
+AGE_BIN_EDGES = [0, 30, 90, 180, 365, 2 * 365, 5 * 365, np.inf]
+AGE_BIN_LABELS = ['< 30 days', '30 - 90 days', '90 - 180 days', '180 days - 1 year',
+                  '1 - 2 years', '2 - 5 years', '>= 5 years']
+
+READ_COLUMNS = ['File Name', 'File Size', 'Modified Time', 'Accessed Time', 'Directory']
+
+def dataset_signature(dataset_dir):
+    """Fingerprint of the dataset files (names, sizes, modification times) a summary was built from."""
+    digest = hashlib.sha1()
+    for parquet_file in partition_files(dataset_dir):
+        stat = os.stat(parquet_file)
+        digest.update(f"{os.path.relpath(parquet_file, dataset_dir)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def add_directory_totals(totals, chunk):
+    """
+    Add the files and bytes per directory of a chunk to totals (directory -> [files, bytes]).
+
+    The chunk is counted on its dictionary codes, so only its distinct directories are
+    visited; the running totals are updated in place, never rebuilt.
+    """
+    directories = chunk['Directory'].astype('category')
+    codes = directories.cat.codes.to_numpy()
+    num_directories = len(directories.cat.categories)
+    files = np.bincount(codes, minlength=num_directories)
+    nbytes = np.bincount(codes, weights=chunk['File Size'].to_numpy(), minlength=num_directories)
+    used = np.flatnonzero(files)
+    for directory, count, size in zip(directories.cat.categories[used], files[used].tolist(), nbytes[used].tolist()):
+        entry = totals.get(directory)
+        if entry is None:
+            totals[directory] = [count, size]
+        else:
+            entry[0] += count
+            entry[1] += size
+
+def age_in_days(times, now):
+    """Vectorized age of each timestamp in days; future timestamps count as age 0."""
+    ages = (now - times).dt.total_seconds().to_numpy() / 86400
+    return np.clip(np.nan_to_num(ages, nan=0.0), 0, None)
+
+def keep_top(current, chunk, top_n, column, largest=True):
+    """Merge a chunk into a running top-N frame, keeping at most top_n rows."""
+    candidates = chunk.nlargest(top_n, column) if largest else chunk.nsmallest(top_n, column)
+    if current is not None:
+        candidates = pd.concat([current, candidates], ignore_index=True)
+    return candidates.nlargest(top_n, column) if largest else candidates.nsmallest(top_n, column)
+
+def top_records(df, columns):
+    """Convert a top-N frame into JSON-friendly records with rebuilt file paths."""
+    if df is None or df.empty:
+        return []
+    df = with_file_paths(df)[columns]
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+def summarize_dataset(dataset_dir, top_n=100, now=None, batch_size=65536):
+    """
+    Reduce every partition of a scan dataset into run-level summary statistics.
+
+    Partitions are streamed in record batches of batch_size rows and only the
+    columns needed are read, so memory is bounded by one batch plus the top-N
+    tables, and cost is linear in the number of rows. Per-directory totals are kept
+    in one running dict, so they grow with the number of directories only.
+
+    Returns:
+        dict: Totals, per-extension counts and bytes, size and age histograms and
+        the top_n largest and oldest files
+    """
+    now = pd.Timestamp(now or datetime.now())
+    per_extension = {}
+    size_files = np.zeros(len(SIZE_BIN_LABELS), dtype=np.int64)
+    size_bytes = np.zeros(len(SIZE_BIN_LABELS), dtype=np.float64)
+    modified_files = np.zeros(len(AGE_BIN_LABELS), dtype=np.int64)
+    modified_bytes = np.zeros(len(AGE_BIN_LABELS), dtype=np.float64)
+    accessed_files = np.zeros(len(AGE_BIN_LABELS), dtype=np.int64)
+    largest = None
+    oldest = None
+    # Directories repeat across batches and extensions, so they are totalled across files
+    per_directory = {}
+
+    for ext in tqdm(list_extensions(dataset_dir), desc="Summarizing extensions", unit="ext"):
+        stats = per_extension.setdefault(ext or 'No Extension', {'files': 0, 'bytes': 0})
+        for parquet_file in partition_files(dataset_dir, [ext]):
+            for batch in pq.ParquetFile(parquet_file).iter_batches(batch_size=batch_size, columns=READ_COLUMNS):
+                chunk = batch.to_pandas()
+                sizes = chunk['File Size'].to_numpy()
+                stats['files'] += len(chunk)
+                stats['bytes'] += int(sizes.sum())
+
+                size_files += np.histogram(sizes, bins=SIZE_BIN_EDGES)[0]
+                size_bytes += np.histogram(sizes, bins=SIZE_BIN_EDGES, weights=sizes)[0]
+                modified_ages = age_in_days(chunk['Modified Time'], now)
+                modified_files += np.histogram(modified_ages, bins=AGE_BIN_EDGES)[0]
+                modified_bytes += np.histogram(modified_ages, bins=AGE_BIN_EDGES, weights=sizes)[0]
+                accessed_files += np.histogram(age_in_days(chunk['Accessed Time'], now), bins=AGE_BIN_EDGES)[0]
+
+                largest = keep_top(largest, chunk, top_n, 'File Size', largest=True)
+                oldest = keep_top(oldest, chunk, top_n, 'Modified Time', largest=False)
+                add_directory_totals(per_directory, chunk)
+
+    top_directories = heapq.nlargest(top_n, per_directory.items(), key=lambda item: item[1][1])
+    total_files = sum(stats['files'] for stats in per_extension.values())
+    total_bytes = sum(stats['bytes'] for stats in per_extension.values())
+    return {
+        'generated_at': now.isoformat(),
+        'total_files': total_files,
+        'total_bytes': total_bytes,
+        'per_extension': dict(sorted(per_extension.items(), key=lambda item: item[1]['bytes'], reverse=True)),
+        'size_histogram': [
+            {'range': label, 'files': int(files), 'bytes': int(nbytes)}
+            for label, files, nbytes in zip(SIZE_BIN_LABELS, size_files, size_bytes)
+        ],
+        'modified_age_histogram': [
+            {'range': label, 'files': int(files), 'bytes': int(nbytes)}
+            for label, files, nbytes in zip(AGE_BIN_LABELS, modified_files, modified_bytes)
+        ],
+        'accessed_age_histogram': [
+            {'range': label, 'files': int(files)}
+            for label, files in zip(AGE_BIN_LABELS, accessed_files)
+        ],
+        'largest_files': top_records(largest, ['File Path', 'File Size', 'Modified Time']),
+        'oldest_files': top_records(oldest, ['File Path', 'File Size', 'Modified Time']),
+        'largest_directories': [
+            {'directory': directory, 'files': int(files), 'bytes': int(nbytes)}
+            for directory, (files, nbytes) in top_directories
+        ],
+    }
+
+def load_summary(output_folder):
+    """
+    Return the run_summary.json of a Seeker_Output folder if it is still current.
+
+    Returns None when there is no summary, or when the dataset files changed since it
+    was written (summaries written before signatures were recorded also count as stale).
+    """
+    summary_path = os.path.join(output_folder, SUMMARY_FILE_NAME)
+    try:
+        with open(summary_path, 'r') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if summary.get('dataset_signature') != dataset_signature(dataset_dir_for(output_folder)):
+        return None
+    return summary
+
+def build_summary(output_folder, top_n=100):
+    """Summarize the dataset in a Seeker_Output folder, recording which files it was built from."""
+    dataset_dir = dataset_dir_for(output_folder)
+    # Taken before reading, so files replaced while summarizing make the summary stale
+    signature = dataset_signature(dataset_dir)
+    summary = summarize_dataset(dataset_dir, top_n=top_n)
+    summary['dataset_signature'] = signature
+    return summary
+
+def save_summary(output_folder, summary):
+    """Write run_summary.json atomically, so readers never see a partial file."""
+    summary_path = os.path.join(output_folder, SUMMARY_FILE_NAME)
+    with open(summary_path + '.tmp', 'w') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(summary_path + '.tmp', summary_path)
+    return summary_path
+
+def write_summary(output_folder, top_n=100):
+    """Summarize the dataset in a Seeker_Output folder and write run_summary.json next to it."""
+    summary = build_summary(output_folder, top_n=top_n)
+    summary_path = save_summary(output_folder, summary)
+
+    print(f"Total files: {summary['total_files']}")
+    print(f"Total bytes: {summary['total_bytes']}")
+    for ext, stats in list(summary['per_extension'].items())[:10]:
+        print(f"  {ext}: {stats['files']} files, {stats['bytes']} bytes")
+    print(f"Summary saved as: {summary_path}")
+
+    # Scans run with --top left per-batch rankings to merge
+    write_rankings(output_folder)
+    return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarize all batch outputs of a Seeker run.')
+    parser.add_argument('--output_dir', type=str, required=True, help='Seeker_Output folder to summarize.')
+    parser.add_argument('--top', type=int, default=100, help='Number of largest/oldest files to report.')
+    args = parser.parse_args()
+
+    write_summary(args.output_dir, top_n=args.top)
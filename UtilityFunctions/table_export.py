@@ -0,0 +1,91 @@
+import os
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from UtilityFunctions.excel_export import write_excel_sheets
+
+# Export of (selected rows of) a DataFrame in chunks, so a caller such as the GUI can
+# report progress and stop between chunks. Output is written under a temporary name
+# and only renamed into place when complete, so a cancelled export leaves nothing behind.
+EXPORT_FORMATS = {'.xlsx': 'excel', '.csv': 'csv', '.parquet': 'parquet'}
+DEFAULT_CHUNK_ROWS = 50000
+EXCEL_SHEET_NAME = 'Files'
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled between chunks."""
+
+def export_format_for(path):
+    """Export format chosen by the file extension of path ('excel', 'csv' or 'parquet')."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {ext or path} (use {', '.join(EXPORT_FORMATS)})")
+    return EXPORT_FORMATS[ext]
+
+def iter_chunks(df, rows=None, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, cancelled=None):
+    """
+    Yield df (or the rows at positions rows) in chunks of chunk_rows.
+
+    progress(rows_done) is called after each chunk has been consumed, and cancelled()
+    is checked before each chunk.
+    """
+    total = len(df) if rows is None else len(rows)
+    for start in range(0, total, chunk_rows):
+        if cancelled is not None and cancelled():
+            raise ExportCancelled()
+        stop = min(start + chunk_rows, total)
+        yield df.iloc[start:stop] if rows is None else df.iloc[rows[start:stop]]
+        if progress is not None:
+            progress(stop)
+
+def _write_arrow(chunks, temp_path, schema, export_format):
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                writer = (pa_csv.CSVWriter(temp_path, table.schema) if export_format == 'csv'
+                          else pq.ParquetWriter(temp_path, table.schema))
+            writer.write_table(table)
+        if writer is None:
+            # No rows: still write a file with the header/schema
+            empty = schema.empty_table()
+            writer = (pa_csv.CSVWriter(temp_path, schema) if export_format == 'csv'
+                      else pq.ParquetWriter(temp_path, schema))
+            writer.write_table(empty)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def export_rows(df, path, rows=None, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, cancelled=None):
+    """
+    Write df (or the rows at positions rows) to path as Excel, CSV or Parquet.
+
+    Excel output continues on 'Files (2)', 'Files (3)', ... sheets past Excel's row limit.
+
+    Args:
+        df (DataFrame): Rows to export
+        path (str): Output file; the extension selects the format
+        rows (array): Row positions to export, all rows if None
+        chunk_rows (int): Rows converted and written at a time
+        progress (callable): Called with the number of rows written so far
+        cancelled (callable): Returns True to stop the export (raises ExportCancelled)
+
+    Returns:
+        int: Number of rows written
+    """
+    export_format = export_format_for(path)
+    temp_path = path + '.part'
+    chunks = iter_chunks(df, rows, chunk_rows, progress, cancelled)
+    try:
+        if export_format == 'excel':
+            write_excel_sheets(temp_path, [(EXCEL_SHEET_NAME, chunks)], chunk_rows=chunk_rows)
+        else:
+            # One schema for all chunks, so a chunk that happens to be all-null keeps its column types
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            _write_arrow(chunks, temp_path, schema, export_format)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(df) if rows is None else len(rows)
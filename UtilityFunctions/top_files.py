@@ -0,0 +1,166 @@
+import os
+import sys
+import csv
+import json
+import heapq
+import shutil
+import argparse
+import itertools
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_core import temp_path
+
+# Top-N rankings kept while a scan streams rows, instead of ranking complete DataFrames
+# afterwards. Each batch saves its heaps to Seeker_Output/top_files/<batch>.json; the
+# reduce stage merges them into Seeker_Output/top_files_<ranking>.csv. Memory is
+# O(N) per ranking however many files are scanned.
+#
+# Rows are scan_core.file_row() lists: name, extension, size, mtime, ctime, atime, directory
+TOP_FILES_DIR_NAME = 'top_files'
+NAME, SIZE, MODIFIED, ACCESSED, DIRECTORY = 0, 2, 3, 5, 6
+
+# ranking -> (row field, whether larger values rank first)
+RANKINGS = {
+    'largest': (SIZE, True),
+    'oldest': (MODIFIED, False),
+    'least_accessed': (ACCESSED, False),
+}
+
+class TopFiles:
+    """Bounded heaps holding the n best rows of each ranking seen so far."""
+
+    def __init__(self, n):
+        self.n = n
+        self.count = 0
+        # Min-heaps of (score, tiebreak, row) where a higher score ranks first, so the
+        # root is the row that is dropped next
+        self.heaps = {ranking: [] for ranking in RANKINGS}
+        self._tiebreak = itertools.count()
+
+    def _push(self, ranking, row):
+        field, larger_first = RANKINGS[ranking]
+        heap = self.heaps[ranking]
+        score = row[field] if larger_first else -row[field]
+        if len(heap) < self.n:
+            heapq.heappush(heap, (score, next(self._tiebreak), row))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, next(self._tiebreak), row))
+
+    def add(self, row):
+        self.count += 1
+        for ranking in RANKINGS:
+            self._push(ranking, row)
+
+    def update(self, other):
+        """Merge the rows kept by another TopFiles (e.g. another batch's)."""
+        self.count += other.count
+        for ranking in RANKINGS:
+            for _, _, row in other.heaps[ranking]:
+                self._push(ranking, row)
+
+    def ranked(self, ranking):
+        """Rows of a ranking, best first."""
+        return [row for _, _, row in sorted(self.heaps[ranking], reverse=True)]
+
+    def save(self, path):
+        temp_file = temp_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_file, 'w') as f:
+            json.dump({'n': self.n, 'count': self.count,
+                       'rankings': {ranking: self.ranked(ranking) for ranking in RANKINGS}}, f)
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            saved = json.load(f)
+        top = cls(saved['n'])
+        for ranking, rows in saved['rankings'].items():
+            for row in rows:
+                top._push(ranking, row)
+        top.count = saved['count']
+        return top
+
+def add_top_arguments(parser):
+    """Add the --top/--top-only scan options to a parser."""
+    parser.add_argument('--top', dest='top_n', type=int,
+                        help='Keep the N largest, oldest and least recently accessed files while scanning.')
+    parser.add_argument('--top-only', action='store_true',
+                        help='With --top, only write the rankings (no dataset or Excel output).')
+
+def top_flags(top_n=None, top_only=False):
+    """Command-line flags for a job script recreating the --top options, with a leading space."""
+    if not top_n:
+        return ''
+    return f" --top {top_n}" + (" --top-only" if top_only else "")
+
+def top_files_dir_for(output_folder):
+    return os.path.join(output_folder, TOP_FILES_DIR_NAME)
+
+def batch_top_files_path(output_folder, batch_name):
+    return os.path.join(top_files_dir_for(output_folder), f"{batch_name}.json")
+
+def clear_top_files(output_folder):
+    """Remove per-batch rankings left by a previous run."""
+    top_dir = top_files_dir_for(output_folder)
+    if os.path.isdir(top_dir):
+        shutil.rmtree(top_dir)
+
+def merge_top_files(output_folder, n=None):
+    """
+    Merge the per-batch heaps of a Seeker_Output folder, one batch file at a time.
+
+    Returns:
+        TopFiles: The combined rankings (at most n rows each), or None if no batch saved any
+    """
+    top_dir = top_files_dir_for(output_folder)
+    if not os.path.isdir(top_dir):
+        return None
+    merged = None
+    for name in sorted(os.listdir(top_dir)):
+        if not name.endswith('.json'):
+            continue
+        batch = TopFiles.load(os.path.join(top_dir, name))
+        if merged is None:
+            merged = TopFiles(n or batch.n)
+        merged.update(batch)
+    return merged
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def write_rankings(output_folder, n=None):
+    """
+    Write Seeker_Output/top_files_<ranking>.csv from the per-batch heaps.
+
+    Returns:
+        list: Paths of the CSV files written (empty if no batch kept rankings)
+    """
+    from UtilityFunctions.scan_dataset import directory_prefixes
+
+    merged = merge_top_files(output_folder, n)
+    if merged is None:
+        return []
+    written = []
+    for ranking in RANKINGS:
+        path = os.path.join(output_folder, f"top_files_{ranking}.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Rank', 'File Path', 'File Size', 'Modified Time', 'Accessed Time'])
+            for rank, row in enumerate(merged.ranked(ranking), start=1):
+                file_path = directory_prefixes([row[DIRECTORY]])[0] + row[NAME]
+                writer.writerow([rank, file_path, row[SIZE], format_time(row[MODIFIED]), format_time(row[ACCESSED])])
+        written.append(path)
+    print(f"Ranked the top {merged.n} of {merged.count} files: {', '.join(os.path.basename(path) for path in written)}")
+    return written
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Merge the per-batch top-N rankings of a Seeker run.')
+    parser.add_argument('--output_dir', type=str, required=True, help='Seeker_Output folder with a top_files folder.')
+    parser.add_argument('--top', type=int, help='Rows per ranking (default: as many as the batches kept).')
+    args = parser.parse_args()
+
+    if not write_rankings(args.output_dir, args.top):
+        print(f"No per-batch rankings found in {top_files_dir_for(args.output_dir)}")
+        sys.exit(1)
@@ -0,0 +1,372 @@
+import os
+import sys
+import time
+import stat
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_core import FileFilter, add_filter_arguments, file_row
+from UtilityFunctions.scan_dataset import (
+    dataset_dir_for, clear_dataset, partition_name, rows_to_frame, write_partition
+)
+
+# Linux watch mode: one initial scan, then inotify events keep the dataset current.
+#
+# Rows are held in memory in parts of at most PART_ROWS rows per extension, and each
+# part is stored as its own file, e.g. dataset/extension=.tif/watch_3.parquet. A change
+# only rewrites the parts it touched, so readers always see every file exactly once.
+# New files go to the newest part of their extension; compaction merges parts that
+# deletions or many small flushes left mostly empty.
+#
+# Events only mark paths as pending; paths are stat'd when changes are flushed, so a
+# file written for minutes costs one stat per flush rather than one per write.
+PART_ROWS = 100000
+PART_PREFIX = 'watch_'
+OUTPUT_FOLDER_NAME = 'Seeker_Output'
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+EVENT_HEADER = struct.Struct('iIII')
+
+class Inotify:
+    """Minimal inotify(7) binding through ctypes."""
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("Watch mode needs inotify, which is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "Out of inotify watches; raise fs.inotify.max_user_watches")
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def remove_watch(self, wd):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout):
+        """
+        Wait up to timeout seconds for events.
+
+        Returns:
+            list: (wd, mask, cookie, name) tuples
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        data = os.read(self.fd, 1024 * 1024)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class WatchedScan:
+    """Scan results of one directory tree, kept current from inotify events."""
+
+    def __init__(self, root, output_folder=None, file_filter=None):
+        self.root = os.path.abspath(root)
+        self.output_folder = os.path.abspath(output_folder or os.path.join(self.root, OUTPUT_FOLDER_NAME))
+        self.dataset_dir = dataset_dir_for(self.output_folder)
+        self.file_filter = file_filter
+        self.inotify = Inotify()
+        self.watches = {}        # wd -> directory
+        self.watched_dirs = {}   # directory -> wd
+        self.files = {}          # (directory, name) -> part id
+        self.parts = {}          # part id -> (extension, {(directory, name): row})
+        self.ext_parts = {}      # extension -> part ids, newest last
+        self.next_part = 0
+        self.dirty_parts = set()
+        self.pending = set()     # (directory, name) to stat at the next flush
+
+    def excluded(self, directory):
+        # Our own output would otherwise trigger events for every flush
+        return os.path.commonpath([directory, self.output_folder]) == self.output_folder
+
+    # --- state -----------------------------------------------------------------------
+
+    def _part_for(self, ext):
+        part_ids = self.ext_parts.setdefault(ext, [])
+        if not part_ids or len(self.parts[part_ids[-1]][1]) >= PART_ROWS:
+            part_ids.append(self.next_part)
+            self.parts[self.next_part] = (ext, {})
+            self.next_part += 1
+        return part_ids[-1]
+
+    def upsert(self, key, row):
+        part_id = self.files.get(key)
+        if part_id is not None and self.parts[part_id][0] != row[1]:
+            # Renamed to another extension
+            self.remove(key)
+            part_id = None
+        if part_id is None:
+            part_id = self._part_for(row[1])
+            self.files[key] = part_id
+        self.parts[part_id][1][key] = row
+        self.dirty_parts.add(part_id)
+
+    def remove(self, key):
+        part_id = self.files.pop(key, None)
+        if part_id is not None:
+            del self.parts[part_id][1][key]
+            self.dirty_parts.add(part_id)
+
+    def remove_tree(self, directory):
+        """Forget a directory that was deleted or moved away, with everything below it."""
+        prefix = directory.rstrip(os.sep) + os.sep
+        for key in [key for key in self.files if key[0] == directory or key[0].startswith(prefix)]:
+            self.remove(key)
+        for path in [path for path in self.watched_dirs if path == directory or path.startswith(prefix)]:
+            wd = self.watched_dirs.pop(path)
+            self.watches.pop(wd, None)
+            self.inotify.remove_watch(wd)
+
+    def refresh(self, key):
+        """Stat a pending path and update its row (or drop it if it is gone)."""
+        directory, name = key
+        try:
+            stats = os.stat(os.path.join(directory, name))
+        except OSError:
+            self.remove(key)
+            return
+        if not stat.S_ISDIR(stats.st_mode):
+            self.upsert(key, file_row(name, directory, stats))
+
+    # --- scanning ----------------------------------------------------------------------
+
+    def scan_tree(self, directory):
+        """Watch and scan a directory tree; watches are added before listing, so no change is missed."""
+        stack = [directory]
+        files = 0
+        while stack:
+            current = stack.pop()
+            if self.excluded(current) or current in self.watched_dirs:
+                continue
+            try:
+                wd = self.inotify.add_watch(current)
+            except (FileNotFoundError, NotADirectoryError):
+                continue  # Removed again before it could be watched
+            self.watches[wd] = current
+            self.watched_dirs[current] = wd
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif self.file_filter is None or self.file_filter.matches(entry.name):
+                                self.upsert((current, entry.name), file_row(entry.name, current, entry.stat()))
+                                files += 1
+                        except OSError as e:
+                            print(f"Error processing file {entry.path}: {e}")
+            except OSError as e:
+                print(f"Error scanning directory {current}: {e}")
+        return files
+
+    def rescan(self):
+        """Start over from a full scan (after inotify dropped events)."""
+        for wd in list(self.watches):
+            self.inotify.remove_watch(wd)
+        self.watches.clear()
+        self.watched_dirs.clear()
+        stale = set(self.parts)
+        self.files.clear()
+        self.parts.clear()
+        self.ext_parts.clear()
+        self.pending.clear()
+        files = self.scan_tree(self.root)
+        # Parts of the old state that the new one does not reuse must be deleted
+        self.dirty_parts |= stale
+        return files
+
+    def handle(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            print("inotify queue overflowed; rescanning")
+            self.rescan()
+            return
+        directory = self.watches.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            # The watched directory itself is gone
+            self.watches.pop(wd, None)
+            if self.watched_dirs.get(directory) == wd:
+                del self.watched_dirs[directory]
+            return
+        if not name:
+            return  # Events about the watched directory itself; its parent reports them
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.remove_tree(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                self.scan_tree(path)
+            return
+        if self.file_filter is None or self.file_filter.matches(name):
+            self.pending.add((directory, name))
+
+    # --- output ------------------------------------------------------------------------
+
+    def part_file(self, ext, part_id):
+        return os.path.join(self.dataset_dir, partition_name(ext), f"{PART_PREFIX}{part_id}.parquet")
+
+    def flush(self):
+        """Apply pending changes and rewrite the parts they touched. Returns the number of parts written."""
+        for key in self.pending:
+            self.refresh(key)
+        self.pending.clear()
+
+        written = 0
+        for part_id in sorted(self.dirty_parts):
+            if part_id not in self.parts:
+                continue  # Dropped by a rescan; deleted below
+            ext, rows = self.parts[part_id]
+            if rows:
+                write_partition(rows_to_frame(list(rows.values())), self.dataset_dir, ext, f"{PART_PREFIX}{part_id}")
+                written += 1
+            else:
+                self.drop_part(part_id)
+        self.delete_stale_files()
+        self.dirty_parts.clear()
+        return written
+
+    def drop_part(self, part_id):
+        ext, _ = self.parts.pop(part_id)
+        self.ext_parts[ext].remove(part_id)
+        if os.path.exists(self.part_file(ext, part_id)):
+            os.remove(self.part_file(ext, part_id))
+
+    def delete_stale_files(self):
+        """Delete part files no longer backed by a part (after a rescan or compaction)."""
+        if not os.path.isdir(self.dataset_dir):
+            return
+        current = {self.part_file(ext, part_id) for part_id, (ext, _) in self.parts.items()}
+        for partition in os.listdir(self.dataset_dir):
+            partition_dir = os.path.join(self.dataset_dir, partition)
+            if not os.path.isdir(partition_dir):
+                continue
+            for name in os.listdir(partition_dir):
+                path = os.path.join(partition_dir, name)
+                if name.startswith(PART_PREFIX) and name.endswith('.parquet') and path not in current:
+                    os.remove(path)
+            if not os.listdir(partition_dir):
+                os.rmdir(partition_dir)
+
+    def compact(self):
+        """
+        Merge each extension's small parts into as few parts as possible.
+
+        The merged part is written before the parts it replaces are deleted, so readers
+        may briefly see some rows twice but never miss one. Returns the number of parts removed.
+        """
+        removed = 0
+        for ext, part_ids in self.ext_parts.items():
+            small = [part_id for part_id in part_ids if len(self.parts[part_id][1]) < PART_ROWS // 2]
+            if len(small) < 2:
+                continue
+            target = small[0]
+            for part_id in small[1:]:
+                rows = self.parts[part_id][1]
+                if len(self.parts[target][1]) + len(rows) > PART_ROWS:
+                    target = part_id
+                    continue
+                for key, row in rows.items():
+                    self.parts[target][1][key] = row
+                    self.files[key] = target
+                rows.clear()
+                self.dirty_parts.update((target, part_id))
+                removed += 1
+        self.flush()
+        return removed
+
+    def run(self, flush_interval=5.0, compact_interval=600.0, duration=None):
+        """Scan, then apply events until interrupted (or for duration seconds)."""
+        print(f"Initial scan of {self.root}...")
+        clear_dataset(self.output_folder)
+        start = time.monotonic()
+        files = self.scan_tree(self.root)
+        parts = self.flush()
+        print(f"Scanned {files} files in {time.monotonic() - start:.1f}s; wrote {parts} parts to {self.dataset_dir}")
+        print(f"Watching {len(self.watches)} directories for changes (Ctrl+C to stop)")
+
+        last_flush = last_compact = time.monotonic()
+        try:
+            while duration is None or time.monotonic() - start < duration:
+                for wd, mask, _, name in self.inotify.read_events(timeout=flush_interval / 2):
+                    self.handle(wd, mask, name)
+                now = time.monotonic()
+                if now - last_flush >= flush_interval and (self.pending or self.dirty_parts):
+                    changes = len(self.pending)
+                    parts = self.flush()
+                    print(f"Applied {changes} changed files; rewrote {parts} parts ({len(self.files)} files)")
+                    last_flush = now
+                if now - last_compact >= compact_interval:
+                    removed = self.compact()
+                    if removed:
+                        print(f"Compacted {removed} parts into their neighbours")
+                    last_compact = now
+        except KeyboardInterrupt:
+            print("Stopping watch")
+        finally:
+            self.flush()
+            self.inotify.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='seeker.py watch',
+                                     description='Scan a local folder, then keep the results current from inotify events (Linux).')
+    parser.add_argument('folder', help='Folder to scan and watch.')
+    parser.add_argument('--output', help='Seeker_Output folder (default: <folder>/Seeker_Output).')
+    parser.add_argument('--flush-interval', type=float, default=5.0, help='Seconds between writes of changed parts.')
+    parser.add_argument('--compact-interval', type=float, default=600.0, help='Seconds between compactions.')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until Ctrl+C).')
+    add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"Error: The path '{args.folder}' is not a valid directory.", file=sys.stderr)
+        return 1
+    try:
+        watched = WatchedScan(args.folder, args.output, FileFilter.from_options(args) or None)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    watched.run(args.flush_interval, args.compact_interval, args.duration)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
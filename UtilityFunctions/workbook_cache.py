@@ -0,0 +1,96 @@
+import os
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# Parsed *_extensions.xlsx workbooks are cached next to them as Arrow IPC files:
+#   Seeker_Output/.workbook_cache/batch_1_extensions.xlsx.json     manifest
+#   Seeker_Output/.workbook_cache/batch_1_extensions.xlsx.0.arrow  first sheet
+# The manifest records the workbook's size and modification time; when either changes
+# the workbook is parsed again and the cache rewritten. Cached sheets are memory-mapped
+# instead of unzipping and parsing the workbook's XML.
+CACHE_DIR_NAME = '.workbook_cache'
+CACHE_VERSION = 1
+
+def cache_paths(workbook_path):
+    """Manifest path and sheet file prefix of the cache for a workbook."""
+    folder, name = os.path.split(os.path.abspath(workbook_path))
+    prefix = os.path.join(folder, CACHE_DIR_NAME, name)
+    return prefix + '.json', prefix
+
+def workbook_key(workbook_path):
+    stat = os.stat(workbook_path)
+    return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def load_cached(workbook_path):
+    """
+    Sheets of the workbook from its cache.
+
+    Returns:
+        list: (sheet name, DataFrame) pairs, or None if there is no valid cache
+    """
+    manifest_path, _ = cache_paths(workbook_path)
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('key') != workbook_key(workbook_path):
+            return None
+        sheets = []
+        cache_dir = os.path.dirname(manifest_path)
+        for sheet in manifest['sheets']:
+            with pa.memory_map(os.path.join(cache_dir, sheet['file']), 'r') as source:
+                sheets.append((sheet['name'], ipc.open_file(source).read_all().to_pandas()))
+        return sheets
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+
+def save_cache(workbook_path, key, sheets):
+    """
+    Write the cache for a workbook parsed when it had the given key.
+
+    Sheets Arrow cannot store (e.g. columns mixing numbers and text) and unwritable
+    folders leave the workbook uncached; it is then parsed on every load as before.
+    """
+    manifest_path, prefix = cache_paths(workbook_path)
+    try:
+        tables = [pa.Table.from_pandas(df, preserve_index=False) for _, df in sheets]
+    except (pa.ArrowException, ValueError, TypeError) as e:
+        print(f"Not caching {os.path.basename(workbook_path)}: {e}")
+        return False
+
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        entries = []
+        for index, ((name, _), table) in enumerate(zip(sheets, tables)):
+            sheet_path = f"{prefix}.{index}.arrow"
+            with ipc.new_file(sheet_path + '.tmp', table.schema) as writer:
+                writer.write_table(table)
+            os.replace(sheet_path + '.tmp', sheet_path)
+            entries.append({'name': name, 'file': os.path.basename(sheet_path)})
+        # The manifest goes last, so a cache is only used once all of its sheets exist
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump({'key': key, 'sheets': entries}, f)
+        os.replace(manifest_path + '.tmp', manifest_path)
+    except OSError as e:
+        print(f"Could not cache {os.path.basename(workbook_path)}: {e}")
+        return False
+    return True
+
+def read_workbook(workbook_path):
+    """
+    Read every sheet of a workbook, from its cache when the workbook has not changed.
+
+    Returns:
+        list: (sheet name, DataFrame) pairs in workbook order
+    """
+    sheets = load_cached(workbook_path)
+    if sheets is not None:
+        return sheets
+
+    # Taken before parsing, so a workbook rewritten meanwhile is not cached under its new key
+    key = workbook_key(workbook_path)
+    xl = pd.ExcelFile(workbook_path)
+    sheets = [(sheet, xl.parse(sheet)) for sheet in xl.sheet_names]
+    save_cache(workbook_path, key, sheets)
+    return sheets
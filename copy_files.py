@@ -1,23 +1,106 @@
 import os
-import shutil
+import sys
+import fnmatch
 import argparse
+from pathlib import Path
 
-def copy_and_rename_filtered_csv(src_dir, dest_dir, keyword, replacement):
-    """
-    Recursively searches for *_filtered.csv files in src_dir, copies them to dest_dir,
-    and renames the files by replacing 'keyword' with 'replacement' in the filename.
-    """
-    if not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from UtilityFunctions.bulk_transfer import build_plan, run_plan
+from UtilityFunctions.query_results import find_dataset_dir, scan_files
+from UtilityFunctions.scan_dataset import partition_files
 
+def find_files(src_dir, suffix, pattern=None):
+    """Yield the paths of files under src_dir whose names end with suffix."""
     for root, dirs, files in os.walk(src_dir):
         for file in files:
-            if file.endswith('_filtered_labeled.mp4'):
-                src_file = os.path.join(root, file)
-                # Rename the file by replacing keyword in the filename
-                new_filename = file.replace(keyword, replacement)
-                dest_file = os.path.join(dest_dir, new_filename)
-                shutil.move(src_file, dest_file)
+            if file.endswith(suffix) and (pattern is None or fnmatch.fnmatchcase(file, pattern)):
+                yield os.path.join(root, file)
+
+def index_parquet_files(index, suffix):
+    """Parquet files of a scan index given as a Seeker_Output folder, dataset folder or batch file."""
+    if index.endswith('.parquet'):
+        return [index]
+    dataset_dir = find_dataset_dir(index)
+    if dataset_dir is None:
+        return None
+    # The suffix's extension selects the partition, so other extensions are never read
+    extension = Path(suffix).suffix.lower() if suffix else ''
+    return partition_files(dataset_dir, [extension] if extension else None)
+
+def parquet_index_rows(files, suffix, pattern=None):
+    """Yield (path, size) for the rows of scan dataset files matching suffix and pattern."""
+    for batch in scan_files(files, ['File Path', 'File Size'], path_style='local', suffix=suffix, name=pattern):
+        yield from zip(batch.column('File Path').to_pylist(), batch.column('File Size').to_pylist())
+
+def excel_index_rows(index):
+    """Yield (path, size) from the sheets of an _all_files.xlsx batch result."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(index, read_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header or 'File Path' not in header:
+                continue
+            path_column = header.index('File Path')
+            size_column = header.index('File Size') if 'File Size' in header else None
+            for row in rows:
+                if row[path_column]:
+                    yield row[path_column], (row[size_column] if size_column is not None else None)
+    finally:
+        workbook.close()
+
+def find_indexed_files(indexes, src_dir, suffix, pattern=None, check_exists=False):
+    """
+    Yield (path, size) for files listed in Seeker scan results instead of walking src_dir.
+
+    Suffix and pattern are matched against the stored file names, so the file system
+    is not touched; with check_exists, files that disappeared since the scan are skipped.
+    """
+    prefix = os.path.join(os.path.abspath(src_dir), '')
+    missing = 0
+    for index in indexes:
+        if index.endswith('.xlsx'):
+            candidates = (
+                (path, size) for path, size in excel_index_rows(index)
+                if os.path.basename(path).endswith(suffix)
+                and (pattern is None or fnmatch.fnmatchcase(os.path.basename(path), pattern))
+            )
+        else:
+            files = index_parquet_files(index, suffix)
+            if files is None:
+                print(f"✗ No Seeker scan results found in {index}")
+                continue
+            candidates = parquet_index_rows(files, suffix, pattern)
+        for path, size in candidates:
+            if not path.startswith(prefix):
+                continue
+            if check_exists and not os.path.isfile(path):
+                missing += 1
+                continue
+            yield path, size
+    if missing:
+        print(f"Skipped {missing} indexed files that no longer exist")
+
+def copy_and_rename_filtered_csv(src_dir, dest_dir, keyword, replacement, suffix='_filtered_labeled.mp4',
+                                 mode='move', workers=4, dry_run=False, indexes=None, pattern=None,
+                                 check_exists=False):
+    """
+    Recursively searches for *_filtered_labeled.mp4 files in src_dir, moves (or copies) them
+    to dest_dir, and renames the files by replacing 'keyword' with 'replacement' in the filename.
+
+    With indexes (Seeker_Output folders or batch result files), candidates are taken from
+    the scan results instead of walking src_dir. Files on the same device as dest_dir are
+    renamed in place; others are copied by `workers` threads. Interrupted runs resume where
+    they stopped.
+    """
+    if indexes:
+        sources = find_indexed_files(indexes, src_dir, suffix, pattern, check_exists)
+    else:
+        sources = find_files(src_dir, suffix, pattern)
+    plan = build_plan(sources, dest_dir, keyword, replacement, mode)
+    return run_plan(plan, dest_dir, mode=mode, workers=workers, dry_run=dry_run)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Copy and rename filtered CSV files.')
@@ -25,7 +108,18 @@ if __name__ == "__main__":
     parser.add_argument('dest_dir', type=str, help='Destination directory to copy the files to')
     parser.add_argument('keyword', type=str, help='Keyword to be replaced in the filenames')
     parser.add_argument('replacement', type=str, help='Replacement string for the keyword')
+    parser.add_argument('--suffix', type=str, default='_filtered_labeled.mp4', help='File name suffix to transfer')
+    parser.add_argument('--pattern', type=str, help="Shell-style file name pattern, e.g. 'mouse1_*'")
+    parser.add_argument('--index', nargs='+', help='Seeker_Output folders or batch result files '
+                        '(.parquet or _all_files.xlsx) to take candidate files from instead of walking src_dir')
+    parser.add_argument('--check-exists', action='store_true', help='Skip indexed files that no longer exist')
+    parser.add_argument('--copy', action='store_true', help='Keep the source files instead of moving them')
+    parser.add_argument('--workers', type=int, default=4, help='Number of parallel copies between devices')
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without transferring anything')
 
     args = parser.parse_args()
 
-    copy_and_rename_filtered_csv(args.src_dir, args.dest_dir, args.keyword, args.replacement)
+    copy_and_rename_filtered_csv(args.src_dir, args.dest_dir, args.keyword, args.replacement,
+                                 suffix=args.suffix, mode='copy' if args.copy else 'move',
+                                 workers=args.workers, dry_run=args.dry_run, indexes=args.index,
+                                 pattern=args.pattern, check_exists=args.check_exists)
@@ -1,11 +1,54 @@
 import os
+import sys
 import argparse
-from UtilityFunctions import list_all_directories, process_batch, convert_path_format
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from UtilityFunctions import list_all_directories, process_batch, convert_path_format, query_results, summarize_results, scan_dataset, diff_scans, watch_scan
+from UtilityFunctions.scan_core import FileFilter, add_filter_arguments, add_walk_arguments
+from UtilityFunctions.top_files import add_top_arguments, clear_top_files, write_rankings
+from UtilityFunctions.io_governor import BUDGET_FILE_NAME, budget_environment, governor_from_environment
+
+def process_batches_parallel(batch_files, workers, **scan_options):
+    """Process batch files across a pool of worker processes.
+
+    Mirrors the serial loop: the first batch that raises stops the run and its
+    exception is re-raised to the caller.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for batch_file_path in batch_files:
+            print(f"Processing batch file: {batch_file_path}")
+            futures[executor.submit(process_batch.process_batch, batch_file_path, **scan_options)] = batch_file_path
+
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            print(f"Finished batch file: {futures[future]}")
 
 def main():
     """Gets a folder path from command-line arguments and processes it."""
+    # "seeker.py query <Seeker_Output> ..." queries existing results instead of scanning
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        sys.exit(query_results.main(sys.argv[2:]))
+    # "seeker.py diff <old Seeker_Output> <new Seeker_Output> ..." compares two scans
+    if len(sys.argv) > 1 and sys.argv[1] == "diff":
+        sys.exit(diff_scans.main(sys.argv[2:]))
+    # "seeker.py watch <folder> ..." scans once, then follows changes with inotify (Linux)
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        sys.exit(watch_scan.main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(description="Process directories in a specified folder.")
     parser.add_argument("folder", help="Path to the folder to process.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Number of batch files to process in parallel (default 0: one per CPU core, 1: serial).")
+    add_walk_arguments(parser)
+    parser.add_argument("--no-excel", action="store_true", help="Only write the extension-partitioned dataset.")
+    parser.add_argument("--max-ops", type=int,
+                        help="Cap the stat/readdir calls per second of all scan processes together.")
+    add_filter_arguments(parser)
+    add_top_arguments(parser)
     args = parser.parse_args()
 
     folder_path = args.folder
@@ -25,21 +68,54 @@ def main():
         # Assuming list_all_directories returns a list of directory paths
         # check if the folder path is valid, and if it starts with nfs
         folder_path = convert_path_format.convert_path_format(folder_path)
-        list_all_directories.process_directories(folder_path)
+        if args.max_ops:
+            # Inherited by the worker processes, which share the budget through the state file
+            budget_file = os.path.join(folder_path, 'Seeker_Output', BUDGET_FILE_NAME)
+            os.environ.update(budget_environment(args.max_ops, budget_file))
+        list_all_directories.process_directories(folder_path, governor_from_environment(), args.one_file_system)
         output_folder = os.path.join(folder_path, 'Seeker_Output/file_batches')
         # make sure the output folder exists
         if not os.path.exists(output_folder):
             print(f"Output folder '{output_folder}' does not exist. Please check the path.")
             return
         print(f"Output folder: {output_folder}")
-        for batch_file in os.listdir(output_folder):
-            batch_file_path = os.path.join(output_folder, batch_file)
-            if os.path.isfile(batch_file_path):
+        batch_files = [os.path.join(output_folder, batch_file) for batch_file in os.listdir(output_folder)]
+        batch_files = [batch_file_path for batch_file_path in batch_files if os.path.isfile(batch_file_path)]
+
+        scan_options = {
+            "hardlinks": args.hardlinks,
+            "follow_symlinks": args.follow_symlinks,
+            "one_file_system": args.one_file_system,
+            "excel": not args.no_excel,
+            # Applied to each directory entry's name, before the file is stat'd
+            "file_filter": FileFilter.from_options(args),
+            "top_n": args.top_n,
+            "top_only": args.top_only,
+        }
+        # Results from a previous run would otherwise be mixed into this one
+        scan_dataset.clear_dataset(os.path.dirname(output_folder))
+        clear_top_files(os.path.dirname(output_folder))
+
+        workers = args.workers if args.workers > 0 else os.cpu_count()
+        workers = min(workers, len(batch_files)) or 1
+        if workers > 1:
+            print(f"Processing {len(batch_files)} batch files with {workers} workers...")
+            process_batches_parallel(batch_files, workers, **scan_options)
+        else:
+            for batch_file_path in batch_files:
                 print(f"Processing batch file: {batch_file_path}")
-                process_batch.process_batch(batch_file_path)
+                process_batch.process_batch(batch_file_path, **scan_options)
 
         print("Batch processing finished.")
 
+        if args.top_only:
+            # No dataset was written; the rankings are the only result
+            print("Ranking files...")
+            write_rankings(os.path.join(folder_path, 'Seeker_Output'))
+        else:
+            print("Summarizing results...")
+            summarize_results.write_summary(os.path.join(folder_path, 'Seeker_Output'))
+
     except ImportError:
         print("Error: Could not import functions from UtilityFunctions.")
     except Exception as e:
@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions import batch_queue
+from UtilityFunctions.batch_queue import (
+    run_worker, reclaim_stale, claimed_batches, reset_queue, waiting_batches, DONE_DIR, FAILED_DIR
+)
+from UtilityFunctions.scan_dataset import dataset_dir_for, read_extensions
+
+def make_queue(root, count):
+    queue_dir = root / 'file_batches'
+    queue_dir.mkdir()
+    for index in range(1, count + 1):
+        (queue_dir / f"batch_{index}.txt").write_text(str(root) + '\n')
+    return queue_dir
+
+def test_claim_reclaimed_during_run(tmp_path, monkeypatch):
+    queue_dir = make_queue(tmp_path, 1)
+    runs = []
+
+    def slow_process(claimed_path, **kwargs):
+        runs.append(kwargs['batch_name'])
+        if len(runs) == 1:
+            # Another worker decides this claim is stale and puts the batch back
+            assert reclaim_stale(str(queue_dir), stale_after=0) == 1
+
+    monkeypatch.setattr(batch_queue, 'process_and_record', slow_process)
+    result = run_worker(str(queue_dir))
+
+    # The first run lost its claim; the batch was claimed again and finished once
+    assert runs == ['batch_1', 'batch_1']
+    assert result == {'processed': 1, 'failed': 0}
+    assert os.listdir(queue_dir / DONE_DIR) == ['batch_1.txt']
+    assert claimed_batches(str(queue_dir)) == []
+
+def test_worker_drains_the_queue_into_one_dataset(tmp_path):
+    data = tmp_path / 'data'
+    for name in ('a', 'b'):
+        (data / name).mkdir(parents=True)
+        (data / name / f"{name}.tif").write_text(name)
+    output = tmp_path / 'Seeker_Output'
+    queue_dir = output / 'file_batches'
+    queue_dir.mkdir(parents=True)
+    (queue_dir / 'batch_1.txt').write_text(str(data / 'a') + '\n')
+    (queue_dir / 'batch_2.txt').write_text(str(data / 'b') + '\n')
+
+    assert run_worker(str(queue_dir), excel=False) == {'processed': 2, 'failed': 0}
+    assert sorted(read_extensions(dataset_dir_for(str(output)))['File Name']) == ['a.tif', 'b.tif']
+    assert waiting_batches(str(queue_dir)) == []
+
+def test_failed_batches_are_set_aside_and_can_be_retried(tmp_path, monkeypatch):
+    queue_dir = make_queue(tmp_path, 10)
+
+    def process(claimed_path, **kwargs):
+        if kwargs['batch_name'] == 'batch_2':
+            raise OSError('filer went away')
+
+    monkeypatch.setattr(batch_queue, 'process_and_record', process)
+    # Batches are claimed in numeric order, so batch_10 is not taken before batch_2
+    assert waiting_batches(str(queue_dir))[:3] == ['batch_1.txt', 'batch_2.txt', 'batch_3.txt']
+    assert run_worker(str(queue_dir)) == {'processed': 9, 'failed': 1}
+    assert os.listdir(queue_dir / FAILED_DIR) == ['batch_2.txt']
+
+    reset_queue(str(queue_dir))
+    assert len(waiting_batches(str(queue_dir))) == 10
@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.bulk_transfer import (
+    Transfer, build_plan, run_plan, copy_file, load_journal, JOURNAL_FILE_NAME, PART_SUFFIX
+)
+
+def make_sources(folder, names):
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, name in enumerate(names):
+        path = folder / name
+        path.write_bytes(bytes([index]) * (1000 * (index + 1)))
+        paths.append(str(path))
+    return paths
+
+def test_plan_renames_within_a_device_and_skips_name_clashes(tmp_path):
+    sources = make_sources(tmp_path / 'a', ['run_old.mp4', 'other.mp4'])
+    sources += make_sources(tmp_path / 'b', ['run_old.mp4'])
+    dest = str(tmp_path / 'dest')
+
+    plan = build_plan(sources + [str(tmp_path / 'missing.mp4')], dest, 'old', 'new')
+
+    assert [os.path.basename(transfer.dest) for transfer in plan] == ['run_new.mp4', 'other.mp4']
+    assert [transfer.size for transfer in plan] == [1000, 2000]
+    assert all(transfer.rename for transfer in plan)
+    assert not any(transfer.rename for transfer in build_plan(sources, dest, mode='copy'))
+
+def test_plan_takes_sizes_from_index_pairs(tmp_path):
+    sources = make_sources(tmp_path / 'a', ['x.mp4'])
+
+    plan = build_plan([(sources[0], 12345)], str(tmp_path / 'dest'))
+
+    assert plan[0].size == 12345
+
+def test_copy_keeps_sources_and_journals_every_file(tmp_path):
+    sources = make_sources(tmp_path / 'a', ['x.mp4', 'y.mp4'])
+    dest = str(tmp_path / 'dest')
+
+    result = run_plan(build_plan(sources, dest, mode='copy'), dest, mode='copy', workers=2)
+
+    assert result == {'renamed': 0, 'copied': 2, 'skipped': 0, 'failed': 0, 'bytes': 3000}
+    assert all(os.path.exists(path) for path in sources)
+    with open(sources[1], 'rb') as src, open(os.path.join(dest, 'y.mp4'), 'rb') as copy:
+        assert src.read() == copy.read()
+    assert load_journal(dest) == {os.path.join(dest, 'x.mp4'), os.path.join(dest, 'y.mp4')}
+
+def test_rerun_skips_journaled_transfers(tmp_path):
+    sources = make_sources(tmp_path / 'a', ['x.mp4', 'y.mp4'])
+    dest = str(tmp_path / 'dest')
+    plan = build_plan(sources, dest)
+    run_plan(plan[:1], dest)
+
+    result = run_plan(plan, dest)
+
+    assert result['skipped'] == 1 and result['renamed'] == 1
+    assert sorted(os.listdir(dest)) == sorted([JOURNAL_FILE_NAME, 'x.mp4', 'y.mp4'])
+    assert not any(os.path.exists(path) for path in sources)
+
+def test_journal_ignores_a_truncated_last_line(tmp_path):
+    dest = tmp_path / 'dest'
+    dest.mkdir()
+    (dest / JOURNAL_FILE_NAME).write_text('{"dest": "/d/x.mp4"}\n{"dest": "/d/y')
+
+    assert load_journal(str(dest)) == {'/d/x.mp4'}
+
+def test_copy_resumes_from_the_part_file(tmp_path):
+    src = tmp_path / 'video.mp4'
+    data = os.urandom(10000)
+    src.write_bytes(data)
+    dest = str(tmp_path / 'copy.mp4')
+    with open(dest + PART_SUFFIX, 'wb') as part:
+        part.write(data[:4000])
+    progress = []
+
+    copied = copy_file(Transfer(str(src), dest, len(data), False), progress.append)
+
+    assert copied == 6000
+    assert sum(progress) == len(data)
+    with open(dest, 'rb') as copy:
+        assert copy.read() == data
+    assert not os.path.exists(dest + PART_SUFFIX)
+
+def test_dry_run_transfers_nothing(tmp_path):
+    sources = make_sources(tmp_path / 'a', ['x.mp4'])
+    dest = str(tmp_path / 'dest')
+
+    result = run_plan(build_plan(sources, dest), dest, dry_run=True)
+
+    assert result['renamed'] == 0 and os.path.exists(sources[0])
+    assert os.listdir(dest) == []
@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from copy_files import find_indexed_files, copy_and_rename_filtered_csv
+from UtilityFunctions.scan_dataset import rows_to_frame, write_batch_partitions
+
+SUFFIX = '_filtered_labeled.mp4'
+
+def row(directory, name, size):
+    return [name, os.path.splitext(name)[1], size, 1_600_000_000, 1_600_000_000, 1_600_000_000, directory]
+
+def make_index(tmp_path, names):
+    """Create the files under tmp_path/src and a Seeker_Output dataset listing them."""
+    src = tmp_path / 'src' / 'session'
+    src.mkdir(parents=True)
+    for name in names:
+        (src / name).write_bytes(b'x' * 10)
+    output = tmp_path / 'Seeker_Output'
+    rows = [row(str(src), name, 10) for name in names] + [row('/elsewhere', 'm1' + SUFFIX, 10)]
+    write_batch_partitions(rows_to_frame(rows), str(output / 'dataset'), 'batch_1')
+    return str(tmp_path / 'src'), str(output), src
+
+def test_candidates_come_from_the_index_under_src_dir(tmp_path):
+    src_dir, output, src = make_index(tmp_path, ['m1' + SUFFIX, 'm2' + SUFFIX, 'm1_raw.mp4', 'm1.csv'])
+
+    found = sorted(find_indexed_files([output], src_dir, SUFFIX))
+
+    assert found == [(str(src / ('m1' + SUFFIX)), 10), (str(src / ('m2' + SUFFIX)), 10)]
+    assert [path for path, _ in find_indexed_files([output], src_dir, SUFFIX, pattern='m2*')] == [str(src / ('m2' + SUFFIX))]
+
+def test_check_exists_skips_files_removed_since_the_scan(tmp_path):
+    src_dir, output, src = make_index(tmp_path, ['m1' + SUFFIX, 'm2' + SUFFIX])
+    os.remove(src / ('m1' + SUFFIX))
+
+    assert len(list(find_indexed_files([output], src_dir, SUFFIX))) == 2
+    assert [path for path, _ in find_indexed_files([output], src_dir, SUFFIX, check_exists=True)] == [str(src / ('m2' + SUFFIX))]
+
+def test_indexed_transfer_renames_the_files(tmp_path):
+    src_dir, output, src = make_index(tmp_path, ['ratA' + SUFFIX, 'ratB' + SUFFIX])
+    dest = tmp_path / 'dest'
+
+    result = copy_and_rename_filtered_csv(src_dir, str(dest), 'rat', 'mouse', indexes=[output], mode='copy')
+
+    assert result['copied'] == 2
+    assert sorted(name for name in os.listdir(dest) if name.endswith('.mp4')) == ['mouseA' + SUFFIX, 'mouseB' + SUFFIX]
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import rows_to_frame, write_batch_partitions, dataset_dir_for
+from UtilityFunctions.diff_scans import diff_scans
+
+def write_scan(output_folder, rows):
+    dataset_dir = dataset_dir_for(str(output_folder))
+    write_batch_partitions(rows_to_frame(rows), dataset_dir, 'batch_1')
+    return dataset_dir
+
+def row(directory, name, size, mtime=1_600_000_000):
+    return [name, os.path.splitext(name)[1], size, mtime, mtime, mtime, directory]
+
+@pytest.mark.parametrize('output_format', ['parquet', 'csv'])
+def test_diff_reports_each_kind_of_change(tmp_path, output_format):
+    old = write_scan(tmp_path / 'old', [
+        row('/data/a', 'kept.txt', 10), row('/data/a', 'grows.nd2', 10), row('/data/a', 'shrinks.nd2', 10),
+        row('/data/b', 'removed.czi', 5), row('/data/b', 'touched.czi', 5),
+        # The same path listed twice, e.g. by overlapping scans
+        row('/data/b', 'touched.czi', 5),
+    ])
+    new = write_scan(tmp_path / 'new', [
+        row('/data/a', 'kept.txt', 10), row('/data/a', 'grows.nd2', 30), row('/data/a', 'shrinks.nd2', 1),
+        row('/data/b', 'touched.czi', 5, mtime=1_700_000_000), row('/data/c', 'added.txt', 7),
+    ])
+
+    totals = diff_scans(old, new, str(tmp_path / 'diff'), output_format, rows_per_bucket=2)
+
+    assert totals == {'added': 1, 'removed': 1, 'grown': 1, 'shrunk': 1, 'modified': 1,
+                      'delta_bytes': 7 - 5 + 20 - 9, 'duplicates': 1}
+    changes_path = tmp_path / 'diff' / f"changes.{output_format}"
+    changes = pd.read_csv(changes_path) if output_format == 'csv' else pd.read_parquet(changes_path)
+    assert sorted(changes['File Name']) == ['added.txt', 'grows.nd2', 'removed.czi', 'shrinks.nd2', 'touched.czi']
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import (
+    rows_to_frame, write_batch_partitions, read_extensions, partition_files, with_file_paths,
+    arrow_file_paths, directory_prefixes, DIRECTORY_TYPE
+)
+
+def row(directory, name):
+    return [name, os.path.splitext(name)[1], 1, 1_600_000_000, 1_600_000_000, 1_600_000_000, directory]
+
+def test_each_file_stores_the_directories_it_uses(tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    rows = [row('/data/a', f"{index}.tif") for index in range(100)] + [row('/data/b', 'x.czi')]
+    write_batch_partitions(rows_to_frame(rows), dataset_dir, 'batch_1')
+
+    tif_file, = partition_files(dataset_dir, ['.tif'])
+    table = pq.read_table(tif_file)
+    assert table.schema.field('Directory').type == DIRECTORY_TYPE
+    assert table.column('Directory').combine_chunks().dictionary.to_pylist() == ['/data/a']
+    assert 'File Path' not in table.column_names
+
+def test_file_paths_are_rebuilt(tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    write_batch_partitions(rows_to_frame([row('/data/a', 'x.tif'), row('Z:\\lab', 'y.tif'), row('/', 'z.tif')]),
+                           dataset_dir, 'batch_1')
+    df = with_file_paths(read_extensions(dataset_dir))
+    assert sorted(df['File Path']) == ['/data/a/x.tif', '/z.tif', 'Z:\\lab\\y.tif']
+
+    directories = pa.array(['/data/a', '/data/a', 'Z:\\lab']).dictionary_encode()
+    paths = arrow_file_paths(directories, pa.array(['1', '2', '3']))
+    assert paths.to_pylist() == ['/data/a/1', '/data/a/2', 'Z:\\lab\\3']
+
+def test_directory_prefixes():
+    assert directory_prefixes(['/data', 'C:', 'C:\\', 'share\\dir']) == ['/data/', 'C:\\', 'C:\\', 'share\\dir\\']
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.excel_export import (
+    write_excel_sheets, extension_sheet_name, continuation_sheet_name, base_sheet_name
+)
+
+def test_full_sheets_continue_on_numbered_sheets(tmp_path):
+    path = str(tmp_path / 'out.xlsx')
+    chunks = (pd.DataFrame({'n': range(start, start + 4), 'name': ['x', None, 'y', np.nan]}) for start in (0, 4))
+
+    created = write_excel_sheets(path, [('All Files', chunks), ('tif', pd.DataFrame({'n': [1]}))],
+                                 max_rows=4, chunk_rows=3)
+
+    assert created == ['All Files', 'All Files (2)', 'All Files (3)', 'tif']
+    workbook = load_workbook(path)
+    rows = [row for title in created[:3] for row in workbook[title].iter_rows(min_row=2, values_only=True)]
+    # Every sheet repeats the header; missing values are empty cells
+    assert [row[0] for row in rows] == list(range(8))
+    assert rows[1] == (1, None)
+    assert next(workbook['All Files (2)'].iter_rows(values_only=True)) == ('n', 'name')
+
+def test_empty_input_still_writes_a_valid_workbook(tmp_path):
+    path = str(tmp_path / 'empty.xlsx')
+    assert write_excel_sheets(path, []) == []
+    assert load_workbook(path).sheetnames == ['Empty']
+
+def test_sheet_names():
+    assert extension_sheet_name('.tif') == 'tif'
+    assert extension_sheet_name('') == 'No Extension'
+    assert extension_sheet_name('.a[b]') == 'a_b_'
+    assert continuation_sheet_name('x' * 40, 2) == 'x' * 27 + ' (2)'
+    assert base_sheet_name('tif (12)') == 'tif'
@@ -0,0 +1,24 @@
+import os
+import sys
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.import_benchmark import measure_import, PROJECT_DIRECTORY
+
+HEAVY_MODULES = ('pandas', 'pyarrow', 'openpyxl')
+
+def test_scan_entry_points_do_not_import_the_export_libraries():
+    for module in ('UtilityFunctions.scan_core', 'UtilityFunctions.process_batch'):
+        result = subprocess.run(
+            [sys.executable, '-c', f"import sys, {module}; print(' '.join(sorted(sys.modules)))"],
+            cwd=PROJECT_DIRECTORY, capture_output=True, text=True, check=True,
+        )
+        loaded = set(result.stdout.split())
+        assert not loaded & set(HEAVY_MODULES), module
+
+def test_measure_import_reports_the_module():
+    result = measure_import('UtilityFunctions.scan_core', repeat=1)
+
+    assert result['module'] == 'UtilityFunctions.scan_core'
+    assert result['import_ms'] > 0 and result['wall_ms'] >= result['import_ms']
+    assert not result['loaded_pandas']
@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.io_governor import (
+    MetadataGovernor, budget_environment, governor_from_environment, BUDGET_ENV_VAR, BUDGET_FILE_ENV_VAR,
+    ADJUST_SECONDS, BACKOFF
+)
+
+def test_budget_comes_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv(BUDGET_ENV_VAR, raising=False)
+    monkeypatch.delenv(BUDGET_FILE_ENV_VAR, raising=False)
+    assert governor_from_environment() is None
+
+    for name, value in budget_environment(500, str(tmp_path / 'io_budget.json')).items():
+        monkeypatch.setenv(name, value)
+    governor = governor_from_environment()
+    assert governor.max_ops == 500 and governor.state_file == str(tmp_path / 'io_budget.json')
+
+    monkeypatch.setenv(BUDGET_ENV_VAR, 'fast')
+    assert governor_from_environment() is None
+    monkeypatch.setenv(BUDGET_ENV_VAR, '0')
+    assert governor_from_environment() is None
+
+def test_processes_sharing_a_state_file_share_the_rate(tmp_path):
+    state_file = str(tmp_path / 'io_budget.json')
+    # Two processes' worth of governors: 1500 ops at 1000/s with a one second burst
+    governors = [MetadataGovernor(1000, state_file), MetadataGovernor(1000, state_file)]
+
+    start = time.monotonic()
+    for _ in range(750):
+        for governor in governors:
+            governor.spend()
+    elapsed = time.monotonic() - start
+
+    assert elapsed > 0.3
+    assert sum(governor.throttled_seconds for governor in governors) > 0.3
+    assert governors[0].measurements()['metadata_ops'] == 750
+    with open(state_file) as f:
+        assert json.load(f)['max_rate'] == 1000
+
+def test_a_budget_large_enough_never_waits(tmp_path):
+    governor = MetadataGovernor(100000, str(tmp_path / 'io_budget.json'))
+    (tmp_path / 'a.txt').write_text('a')
+
+    for _ in range(100):
+        governor.stat(str(tmp_path / 'a.txt'))
+    with governor.scandir(str(tmp_path)) as entries:
+        names = [entry.name for entry in entries]
+
+    assert 'a.txt' in names
+    assert governor.measurements() == {'metadata_ops': 101, 'throttle_seconds': 0.0}
+
+def test_rate_backs_off_when_stats_slow_down_and_recovers():
+    governor = MetadataGovernor(1000, 'unused.json')
+    now = 1000.0
+    state = governor._fresh_state(now)
+    governor._adapt(state, 0.001, now)
+
+    governor._adapt(state, 0.05, now + ADJUST_SECONDS)
+    assert state['rate'] == 1000 * BACKOFF
+
+    # Once the shared average is fast again the rate grows back to max_ops in steps
+    for step in range(2, 40):
+        governor._adapt(state, 0.001, now + step * ADJUST_SECONDS)
+    assert state['rate'] == 1000
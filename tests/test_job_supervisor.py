@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.schedulers import Scheduler, ACTIVE_STATES, SUCCESS_STATE
+from UtilityFunctions.job_supervisor import JobSupervisor, WorkItem
+
+class FakeScheduler(Scheduler):
+    """
+    In-memory scheduler for exercising the supervisor without SLURM.
+
+    outcome(script_path, job_id) decides the final state of each submitted job;
+    a job reaches it on the first states() call after it was submitted and, if held,
+    released. An outcome of None leaves the job unreported, as if it was purged.
+    """
+
+    def __init__(self, outcome=None):
+        self.outcome = outcome or (lambda script_path, job_id: SUCCESS_STATE)
+        self.jobs = {}
+        self.submitted = []
+        self.next_id = 1000
+
+    def submit(self, script_path, hold=False):
+        job_id = str(self.next_id)
+        self.next_id += 1
+        self.jobs[job_id] = {'script': script_path, 'held': hold, 'state': 'PENDING'}
+        self.submitted.append((job_id, script_path))
+        return job_id
+
+    def states(self, job_ids):
+        states = {}
+        for job_id in job_ids:
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            if job['state'] == 'PENDING' and not job['held']:
+                job['state'] = self.outcome(job['script'], job_id)
+            if job['state'] is not None:
+                states[job_id] = job['state']
+        return states
+
+    def release(self, job_id):
+        self.jobs[job_id]['held'] = False
+
+    def cancel(self, job_id):
+        if self.jobs[job_id]['state'] in ACTIVE_STATES:
+            self.jobs[job_id]['state'] = 'CANCELLED'
+
+def work_item(name, config=None):
+    return WorkItem(name=name, write_script=lambda job_config: f"{name}.sh",
+                    config=config or {'time': '1:00:00', 'mem': '4G'})
+
+def test_timeout_is_resubmitted_with_more_time():
+    outcomes = iter(['TIMEOUT', SUCCESS_STATE])
+    scheduler = FakeScheduler(lambda script_path, job_id: next(outcomes))
+    supervisor = JobSupervisor(scheduler, poll_interval=0, max_time='4:00:00')
+    item = work_item('scan')
+    supervisor.submit(item)
+
+    assert supervisor.wait([item])
+    assert item.config['time'] == '0-02:00:00'
+    assert len(scheduler.submitted) == 2
+
+def test_job_never_reported_is_lost_and_resubmitted():
+    # The first submission is never reported; the resubmission completes
+    outcomes = iter([None, SUCCESS_STATE])
+    scheduler = FakeScheduler(lambda script_path, job_id: next(outcomes))
+    supervisor = JobSupervisor(scheduler, poll_interval=0, max_missing_polls=3)
+    item = work_item('scan')
+    supervisor.submit(item)
+
+    assert supervisor.wait([item])
+    assert len(scheduler.submitted) == 2
+
+def test_lost_job_gives_up_after_max_resubmits():
+    scheduler = FakeScheduler(lambda script_path, job_id: None)
+    supervisor = JobSupervisor(scheduler, poll_interval=0, max_resubmits=1, max_missing_polls=2)
+    item = work_item('scan')
+    supervisor.submit(item)
+
+    assert not supervisor.wait([item])
+    assert item.state == 'LOST'
+
+def test_final_item_cancelled_when_work_fails():
+    scheduler = FakeScheduler(lambda script_path, job_id: 'FAILED' if script_path == 'scan.sh' else SUCCESS_STATE)
+    supervisor = JobSupervisor(scheduler, poll_interval=0)
+    scan, merge = work_item('scan'), work_item('merge')
+    supervisor.submit(scan)
+    supervisor.submit(merge, hold=True)
+
+    assert not supervisor.supervise([scan], merge)
+    assert scheduler.jobs[merge.job_id]['state'] == 'CANCELLED'
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.merge_tree import plan_merge_tree, merge_group, list_outputs, natural_key
+from UtilityFunctions.scan_dataset import rows_to_frame, write_batch_partitions, read_extensions
+
+def row(name):
+    return [name, os.path.splitext(name)[1], 1, 1_600_000_000, 1_600_000_000, 1_600_000_000, '/data']
+
+def test_plan_merges_levels_until_one_output_is_left():
+    names = [f"batch_{index}" for index in range(1, 6)]
+    levels = plan_merge_tree(names, fan_in=2)
+
+    assert levels == [
+        [('merge_L1_0', ['batch_1', 'batch_2']), ('merge_L1_1', ['batch_3', 'batch_4']), ('merge_L1_2', ['batch_5'])],
+        [('merge_L2_0', ['merge_L1_0', 'merge_L1_1']), ('merge_L2_1', ['merge_L1_2'])],
+        [('merge_L3_0', ['merge_L2_0', 'merge_L2_1'])],
+    ]
+    assert plan_merge_tree(['batch_1']) == []
+    with pytest.raises(ValueError):
+        plan_merge_tree(names, fan_in=1)
+
+def test_merge_group_keeps_every_row_and_can_be_rerun(tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    write_batch_partitions(rows_to_frame([row('a.tif'), row('b.czi')]), dataset_dir, 'batch_1')
+    write_batch_partitions(rows_to_frame([row('c.tif')]), dataset_dir, 'batch_2')
+    write_batch_partitions(rows_to_frame([row('d.tif')]), dataset_dir, 'batch_10')
+
+    stats = merge_group(dataset_dir, 'merge_L1_0', ['batch_1', 'batch_2', 'batch_10'])
+    assert list_outputs(dataset_dir) == ['merge_L1_0']
+    assert sorted(read_extensions(dataset_dir)['File Name']) == ['a.tif', 'b.czi', 'c.tif', 'd.tif']
+    assert stats['input_bytes'] > 0
+
+    # A retried job finds its output already written and its inputs gone
+    merge_group(dataset_dir, 'merge_L1_0', ['batch_1', 'batch_2', 'batch_10'])
+    assert len(read_extensions(dataset_dir)) == 4
+
+def test_natural_order():
+    assert sorted(['batch_10', 'batch_2', 'batch_1'], key=natural_key) == ['batch_1', 'batch_2', 'batch_10']
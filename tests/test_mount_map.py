@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.mount_map import MountMap
+
+def test_windows_paths_translate_to_linux():
+    mount_map = MountMap()
+    assert mount_map.to_linux('Z:\\migratedData\\lab1') == '/nfs/turbo/lsa-adae/migratedData/lab1'
+    assert mount_map.to_linux('z:/migratedData') == '/nfs/turbo/lsa-adae/migratedData'
+    assert mount_map.to_linux('Z:') == '/nfs/turbo/lsa-adae'
+
+def test_drive_without_separator_is_read_as_drive_root():
+    mount_map = MountMap()
+    assert mount_map.to_linux('Z:migratedDatalab1') == '/nfs/turbo/lsa-adae/migratedDatalab1'
+    series = pd.Series(['Z:migratedData', 'Z:\\a'])
+    assert mount_map.translate_series(series, 'linux').tolist() == ['/nfs/turbo/lsa-adae/migratedData',
+                                                                    '/nfs/turbo/lsa-adae/a']
+
+def test_linux_paths_translate_to_windows():
+    assert MountMap().to_windows('/nfs/turbo/lsa-adae/migratedData/lab1') == 'Z:\\migratedData\\lab1'
+    assert MountMap().to_windows('/nfs/turbo/lsa-adae-other/x') == '\\nfs\\turbo\\lsa-adae-other\\x'
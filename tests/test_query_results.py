@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.query_results import path_prefix_condition, main, limit_batches, parse_size
+from UtilityFunctions.scan_dataset import rows_to_frame, write_batch_partitions, dataset_dir_for
+
+def matching_paths(prefix):
+    table = pa.table({
+        'Directory': pa.array(['big', 'big/d1', 'big/d10', 'big/d1/sub', 'Z:\\', 'Z:\\lab']).dictionary_encode(),
+        'File Name': ['d1.txt', 'raw_1.nd2', 'x.nd2', 'y.nd2', 'w.txt', 'q.czi'],
+    })
+    result = ds.dataset(table).to_table(filter=path_prefix_condition(prefix))
+    return sorted(f"{directory}|{name}" for directory, name in
+                  zip(result['Directory'].to_pylist(), result['File Name'].to_pylist()))
+
+def test_trailing_separator_stops_at_directory_boundary():
+    assert matching_paths('big/d1/') == ['big/d1/sub|y.nd2', 'big/d1|raw_1.nd2']
+
+def test_prefix_can_end_inside_a_file_name():
+    assert matching_paths('big/d1/raw') == ['big/d1|raw_1.nd2']
+    assert matching_paths('big/d1') == ['big/d1/sub|y.nd2', 'big/d10|x.nd2', 'big/d1|raw_1.nd2', 'big|d1.txt']
+
+def test_windows_drive_root():
+    assert matching_paths('Z:\\') == ['Z:\\lab|q.czi', 'Z:\\|w.txt']
+
+def write_scan(output_folder, rows):
+    write_batch_partitions(rows_to_frame(rows), dataset_dir_for(str(output_folder)), 'batch_1')
+
+def scan_row(directory, name, size, mtime):
+    return [name, os.path.splitext(name)[1], size, mtime, mtime, mtime, directory]
+
+def test_query_filters_and_output(tmp_path):
+    january, march = 1_672_531_200, 1_677_628_800  # 2023-01-01, 2023-03-01
+    write_scan(tmp_path / 'Seeker_Output', [
+        scan_row('/data', 'small.nd2', 10, march), scan_row('/data', 'big_raw.nd2', 5_000_000, march),
+        scan_row('/data', 'old_raw.nd2', 5_000_000, january), scan_row('/data', 'big.czi', 5_000_000, march),
+    ])
+    output = tmp_path / 'out.json'
+
+    # The scanned folder is accepted as well as its Seeker_Output folder
+    assert main([str(tmp_path), '--ext', 'ND2', '--min-size', '1M', '--modified-after', '2023-02-01',
+                 '--name', '*_raw.*', '--columns', 'File Path', 'File Size',
+                 '--format', 'json', '--output', str(output)]) == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert rows == [{'File Path': '/data/big_raw.nd2', 'File Size': 5_000_000}]
+
+def test_limit_stops_the_stream():
+    batches = [pa.record_batch([pa.array(range(5))], names=['n']) for _ in range(3)]
+    assert [batch.num_rows for batch in limit_batches(batches, 7)] == [5, 2]
+
+def test_parse_size():
+    assert parse_size('500') == 500
+    assert parse_size('10G') == 10 * 1024 ** 3
+    assert parse_size('1.5TB') == int(1.5 * 1024 ** 4)
@@ -0,0 +1,88 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions import process_batch
+from UtilityFunctions.resource_model import ResourceModel, load_history, reset_peak_rss, record_run, last_units
+from UtilityFunctions.slurm_jobs import HISTORY_ENV_VAR
+
+def test_each_batch_records_its_own_peak(tmp_path, monkeypatch):
+    if not reset_peak_rss():
+        pytest.skip('the peak resident memory cannot be reset on this platform')
+    history_file = tmp_path / 'history.jsonl'
+    monkeypatch.setenv(HISTORY_ENV_VAR, str(history_file))
+
+    def fake_batch(file, **options):
+        if options['batch_name'] == 'batch_1':
+            # Touch every page so the memory is resident
+            block = bytearray(200 * 1024 ** 2)
+            block[::4096] = b'x' * len(block[::4096])
+            del block
+        return {'directories': 10, 'files': 100}
+
+    monkeypatch.setattr(process_batch, 'process_batch', fake_batch)
+    process_batch.process_and_record('batch_1.txt', batch_name='batch_1')
+    process_batch.process_and_record('batch_2.txt', batch_name='batch_2')
+
+    first, second = load_history(str(history_file), 'process_batch')
+    assert first['peak_rss_mb'] >= 200
+    assert second['peak_rss_mb'] < first['peak_rss_mb'] - 150
+
+def test_lifetime_peaks_are_not_recorded_for_later_batches(tmp_path, monkeypatch):
+    history_file = tmp_path / 'history.jsonl'
+    monkeypatch.setenv(HISTORY_ENV_VAR, str(history_file))
+    monkeypatch.setattr('UtilityFunctions.resource_model.reset_peak_rss', lambda: False)
+    monkeypatch.setattr(process_batch, 'batches_processed', 0)
+    monkeypatch.setattr(process_batch, 'process_batch', lambda file, **options: {'directories': 1, 'files': 1})
+
+    process_batch.process_and_record('batch_1.txt', batch_name='batch_1')
+    process_batch.process_and_record('batch_2.txt', batch_name='batch_2')
+
+    first, second = load_history(str(history_file), 'process_batch')
+    assert first['peak_rss_mb'] > 0
+    assert second['peak_rss_mb'] is None
+
+def test_memory_sized_only_from_runs_that_measured_it():
+    entries = [{'units': 100, 'seconds': 100, 'peak_rss_mb': None},
+               {'units': 200, 'seconds': 200, 'peak_rss_mb': None}]
+    config = {'time': '1:00:00', 'mem': '16G'}
+
+    sized = ResourceModel(entries).sized_config(config, 1000)
+    assert sized['mem'] == '16G'
+    assert sized['time'] != '1:00:00'
+
+    entries.append({'units': 100, 'seconds': 100, 'peak_rss_mb': 4000})
+    assert ResourceModel(entries).sized_config(config, 100)['mem'] != '16G'
+
+def test_time_and_memory_scale_with_the_task_size():
+    entries = [{'units': 100, 'seconds': 200, 'peak_rss_mb': 1500},
+               {'units': 300, 'seconds': 600, 'peak_rss_mb': 1500}]
+    model = ResourceModel(entries)
+
+    # (start-up + 2 s per unit) and the footprint, both with the safety factor
+    assert model.predict(1000) == pytest.approx((53.0, 2250.0))
+    assert model.sized_config({'time': '1:00:00', 'mem': '16G'}, 1000) == {'time': '0-00:53:00', 'mem': '2250M'}
+    assert model.sized_config({'max_time': '0:30:00', 'max_mem': '2G'}, 1000) == {
+        'max_time': '0:30:00', 'max_mem': '2G', 'time': '0-00:30:00', 'mem': '2G'}
+    # Small tasks get the floors
+    assert model.predict(1)[0] == 10
+
+    config = {'time': '1:00:00', 'auto_resources': False}
+    assert model.sized_config(config, 1000) is config
+    assert ResourceModel([]).sized_config(config, 1000) is config
+
+def test_runs_are_recorded_only_inside_seeker_jobs(tmp_path, monkeypatch):
+    history_file = tmp_path / 'history.jsonl'
+    monkeypatch.delenv(HISTORY_ENV_VAR, raising=False)
+    record_run('dir_scan', 10, 1.0, key='/data')
+    assert not history_file.exists()
+
+    monkeypatch.setenv(HISTORY_ENV_VAR, str(history_file))
+    record_run('dir_scan', 10, 1.0, key='/data')
+    record_run('dir_scan', 25, 2.0, key='/data', peak_rss_mb=None)
+    record_run('merge', 5, 1.0, key='/data')
+
+    assert last_units(str(history_file), 'dir_scan', '/data') == 25
+    assert last_units(str(history_file), 'dir_scan', '/other') is None
+    assert [entry['peak_rss_mb'] is None for entry in load_history(str(history_file), 'dir_scan')] == [False, True]
@@ -0,0 +1,135 @@
+import os
+import sys
+import pickle
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_core import (
+    gather_file_info, parse_entry, recursive_entry, add_walk_arguments, walk_flags, WALK_FIELDS,
+    FileFilter, add_filter_arguments
+)
+
+def make_tree(root):
+    """Three levels of directories with two files each; returns the number of files."""
+    count = 0
+    for a in range(3):
+        for b in range(3):
+            directory = root / f"a{a}" / f"b{b}"
+            directory.mkdir(parents=True)
+            for name in ('one.txt', 'two.nd2'):
+                (directory / name).write_text(name)
+                count += 1
+        (root / f"a{a}" / 'top.txt').write_text('top')
+        count += 1
+    (root / 'root.txt').write_text('root')
+    return count + 1
+
+def listing(root):
+    """Every directory under root, parents first, as list_all_directories writes them."""
+    return [str(root)] + [os.path.join(dirpath, name) for dirpath, dirnames, _ in os.walk(root)
+                          for name in sorted(dirnames)]
+
+def test_batches_report_each_file_once(tmp_path):
+    file_count = make_tree(tmp_path)
+    directories = listing(tmp_path)
+    # Ancestors and descendants end up in different batches
+    batches = [directories[i:i + 3] for i in range(0, len(directories), 3)]
+
+    rows = []
+    for batch in batches:
+        rows.extend(gather_file_info(batch, recursive=False))
+
+    paths = [os.path.join(row[6], row[0]) for row in rows]
+    assert len(rows) == file_count
+    assert len(set(paths)) == file_count
+
+def test_hard_links_counted_once_per_batch(tmp_path):
+    (tmp_path / 'data.bin').write_bytes(b'x' * 100)
+    os.link(tmp_path / 'data.bin', tmp_path / 'link.bin')
+
+    assert len(gather_file_info([str(tmp_path)], recursive=False)) == 1
+    assert len(gather_file_info([str(tmp_path)], hardlinks='all', recursive=False)) == 2
+
+def test_recursive_walk_covers_subdirectories(tmp_path):
+    file_count = make_tree(tmp_path)
+    # Listing a subdirectory as well does not count its files twice within a batch
+    rows = gather_file_info([str(tmp_path), str(tmp_path / 'a0')])
+    assert len(rows) == file_count
+
+def test_excluded_directories_are_scanned_whole(tmp_path, monkeypatch):
+    from UtilityFunctions import list_all_directories
+
+    # The standard exclusions, except those matching the temporary directory itself (e.g. tmp)
+    excluded = [name for name in list_all_directories.get_excluded_folders()
+                if name.strip('/') not in tmp_path.parts]
+    monkeypatch.setattr(list_all_directories, 'get_excluded_folders', lambda: excluded)
+    data = tmp_path / 'data'
+    (data / 'backup' / 'deep').mkdir(parents=True)
+    (data / 'logs').mkdir()
+    (data / 'keep.txt').write_text('keep')
+    (data / 'backup' / 'old.txt').write_text('old')
+    (data / 'backup' / 'deep' / 'older.txt').write_text('older')
+    (data / 'logs' / 'run.log').write_text('run')
+
+    directories = list_all_directories.list_subdirectories(str(data), str(tmp_path / 'subdirectories.txt'))
+    # The listing does not descend into backup/ and logs/, the batches walk them instead
+    assert recursive_entry(str(data / 'backup')) in directories
+    rows = []
+    for directory in directories:
+        rows.extend(gather_file_info([directory], recursive=False))
+
+    assert sorted(row[0] for row in rows) == ['keep.txt', 'old.txt', 'older.txt', 'run.log']
+
+def test_parse_entry():
+    assert parse_entry('/data/backup/**') == ('/data/backup', True)
+    assert parse_entry('/data/backup') == ('/data/backup', None)
+    assert parse_entry('/data/a**') == ('/data/a**', None)
+
+def test_walk_flags_recreate_the_options():
+    import argparse
+    parser = argparse.ArgumentParser()
+    add_walk_arguments(parser)
+    options = {'hardlinks': 'all', 'follow_symlinks': True, 'one_file_system': True}
+
+    args = parser.parse_args(walk_flags(options).split())
+    assert {field: getattr(args, field) for field in WALK_FIELDS} == options
+    assert walk_flags({'hardlinks': 'once'}) == ''
+
+def test_symlink_loops_are_walked_once(tmp_path):
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    (tmp_path / 'a' / 'b' / 'data.txt').write_text('data')
+    # b/up points back at a, so following links would otherwise never end
+    os.symlink(tmp_path / 'a', tmp_path / 'a' / 'b' / 'up')
+
+    rows = gather_file_info([str(tmp_path)], follow_symlinks=True)
+    assert [row[0] for row in rows] == ['data.txt']
+    assert gather_file_info([str(tmp_path)]) == rows
+
+def test_file_filter_matches_names_without_case():
+    file_filter = FileFilter(include_extensions=['ND2', '.czi', ''], exclude_name_patterns=['*_raw*'],
+                             name_patterns=['mouse*', 'README'])
+
+    assert file_filter.matches('Mouse1.nd2')
+    assert file_filter.matches('readme')
+    assert not file_filter.matches('mouse1_raw.nd2')
+    assert not file_filter.matches('mouse1.tif')
+    assert not file_filter.matches('rat1.czi')
+    assert not FileFilter() and FileFilter(exclude_extensions=['.tmp'])
+
+def test_file_filter_survives_the_command_line_and_pickling():
+    file_filter = FileFilter(include_extensions=['.nd2', ''], exclude_extensions=['.tmp'],
+                             name_patterns=['-raw*'], exclude_name_patterns=['*.part'])
+    parser = argparse.ArgumentParser()
+    add_filter_arguments(parser)
+
+    for copy in (FileFilter.from_options(parser.parse_args(file_filter.to_args())), pickle.loads(pickle.dumps(file_filter))):
+        assert copy.__getstate__() == file_filter.__getstate__()
+        assert copy.matches('-raw1.nd2') and not copy.matches('-raw1.part')
+
+def test_filtered_scan_only_reports_matching_files(tmp_path):
+    make_tree(tmp_path)
+
+    rows = gather_file_info([str(tmp_path)], file_filter=FileFilter(include_extensions=['.nd2']))
+
+    assert len(rows) == 9
+    assert {row[0] for row in rows} == {'two.nd2'}
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import (
+    rows_to_frame, write_batch_partitions, read_extensions, list_extensions, partition_files,
+    partition_name, extension_from_partition
+)
+
+def row(directory, name, size=1):
+    return [name, os.path.splitext(name)[1], size, 1_600_000_000, 1_600_000_000, 1_600_000_000, directory]
+
+def test_rows_are_stored_once_per_extension(tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    write_batch_partitions(rows_to_frame([row('/d', 'a.tif'), row('/d', 'b.czi'), row('/d', 'README')]),
+                           dataset_dir, 'batch_1')
+    write_batch_partitions(rows_to_frame([row('/e', 'c.tif')]), dataset_dir, 'batch_2')
+
+    assert list_extensions(dataset_dir) == ['', '.czi', '.tif']
+    assert [os.path.basename(path) for path in partition_files(dataset_dir, ['.tif'])] == ['batch_1.parquet', 'batch_2.parquet']
+    assert sorted(read_extensions(dataset_dir, ['.tif'])['File Name']) == ['a.tif', 'c.tif']
+    assert len(read_extensions(dataset_dir)) == 4
+
+def test_rewriting_a_batch_replaces_its_files(tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    write_batch_partitions(rows_to_frame([row('/d', 'a.tif'), row('/d', 'b.czi')]), dataset_dir, 'batch_1')
+    write_batch_partitions(rows_to_frame([row('/d', 'a.tif')]), dataset_dir, 'batch_1')
+
+    assert list(read_extensions(dataset_dir)['File Name']) == ['a.tif']
+    # No temporary files are left next to the outputs
+    assert all(name.endswith('.parquet') for _, _, names in os.walk(dataset_dir) for name in names)
+
+def test_partition_names_round_trip():
+    for ext in ('', '.tif', '.a/b', '.%20'):
+        assert extension_from_partition(partition_name(ext)) == ext
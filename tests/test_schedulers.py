@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.schedulers import LocalScheduler, SUCCESS_STATE
+
+def job_script(path, commands, directives=()):
+    lines = ['#!/bin/bash'] + [f"#SBATCH {directive}" for directive in directives] + list(commands)
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+def test_job_runs_with_the_submitters_environment(tmp_path, monkeypatch):
+    scheduler = LocalScheduler(tmp_path / 'spool', poll_interval=0.05)
+    output = tmp_path / 'budget.txt'
+    monkeypatch.setenv('SEEKER_MAX_METADATA_OPS', '500')
+    job_id = scheduler.submit(job_script(tmp_path / 'job.sh', [f"echo $SEEKER_MAX_METADATA_OPS > {output}"]))
+    # Changes after submission, e.g. in the runner's own environment, do not reach the job
+    monkeypatch.delenv('SEEKER_MAX_METADATA_OPS')
+
+    assert scheduler.drain()
+    assert scheduler.states([job_id]) == {job_id: SUCCESS_STATE}
+    assert output.read_text().strip() == '500'
+
+def test_job_arrays_are_rejected(tmp_path):
+    scheduler = LocalScheduler(tmp_path / 'spool', poll_interval=0.05)
+    script = job_script(tmp_path / 'array.sh', ['echo $SLURM_ARRAY_TASK_ID'], ['--array=0-3'])
+
+    assert scheduler.submit(script) is None
+    assert scheduler.drain()
+
+def test_stop_cancels_unfinished_jobs(tmp_path):
+    scheduler = LocalScheduler(tmp_path / 'spool', poll_interval=0.05)
+    first = scheduler.submit(job_script(tmp_path / 'slow.sh', ['sleep 30']))
+    second = scheduler.submit(job_script(tmp_path / 'next.sh', ['true'], [f"--dependency=afterok:{first}"]))
+    scheduler.start()
+    scheduler.stop()
+
+    assert not scheduler.drain()
+    assert scheduler.states([first, second]) == {first: 'CANCELLED', second: 'CANCELLED'}
+
+def test_spool_keeps_only_the_variables_jobs_need(tmp_path, monkeypatch):
+    spool = tmp_path / 'spool'
+    scheduler = LocalScheduler(spool, poll_interval=0.05)
+    monkeypatch.setenv('SEEKER_HISTORY_FILE', str(tmp_path / 'history.jsonl'))
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    job_id = scheduler.submit(job_script(tmp_path / 'job.sh', ['true']))
+
+    spooled = (spool / f"{job_id}.json").read_text()
+    assert 'SEEKER_HISTORY_FILE' in spooled
+    assert 'secret' not in spooled
+    assert (spool / f"{job_id}.json").stat().st_mode & 0o077 == 0
+    assert spool.stat().st_mode & 0o077 == 0
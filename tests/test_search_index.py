@@ -0,0 +1,48 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.search_index import SearchIndex
+
+def test_missing_names_never_match():
+    for names in (pd.Series(['Scan.tif', None, np.nan, 'none.txt'], dtype=object),
+                  pd.Series(['Scan.tif', None, None, 'none.txt'], dtype='string')):
+        index = SearchIndex(pd.DataFrame({'File Name': names, 'File Size': [1, 2, 3, 4]}))
+        assert list(index.search('scan')) == [0]
+        # Missing names are empty, not the text 'None' or 'nan'
+        assert list(index.search('n')) == [0, 3]
+
+def make_frame():
+    return pd.DataFrame({
+        'File Name': ['a.tif', 'B.TIF', 'c.czi', 'notes.txt', 'tiff.log'],
+        'File Size': [10, 200, 3000, 5, 200],
+        'Modified Time': pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01', '2024-05-01']),
+    })
+
+def test_ranges_are_half_open_and_combine():
+    index = SearchIndex(make_frame())
+
+    assert sorted(index.range_rows('File Size', 10, 200)) == [0]
+    assert sorted(index.range_rows('File Size', 200)) == [1, 2, 4]
+    assert sorted(index.range_rows('Modified Time', '2024-02-01', '2024-04-01')) == [1, 2]
+    assert list(index.search(ranges={'File Size': (100, None), 'Modified Time': (None, '2024-03-01')})) == [1]
+    assert list(index.search('tif', ranges={'File Size': (None, 100)})) == [0]
+
+def test_typing_more_matches_a_fresh_search():
+    df = make_frame()
+    index = SearchIndex(df)
+    for text in ('t', 'ti', 'tif', 'tiff', 'tif'):
+        expected = [row for row, name in enumerate(df['File Name']) if text in name.lower()]
+        assert list(index.search(text)) == expected
+        # A fresh index gives the same answer as the incremental one
+        assert list(SearchIndex(df).search(text)) == expected
+
+def test_unknown_range_column_is_an_error():
+    index = SearchIndex(make_frame())
+    with pytest.raises(KeyError):
+        index.range_rows('Owner', 1, 2)
+    # search() ignores columns it has no index for
+    assert len(index.search(ranges={'Owner': (1, 2)})) == 5
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from seeker import process_batches_parallel
+from UtilityFunctions.scan_dataset import dataset_dir_for, read_extensions
+
+def write_batches(root, count):
+    """count batch files listing one directory of two files each, as list_all_directories does."""
+    output_folder = root / 'Seeker_Output'
+    batch_dir = output_folder / 'file_batches'
+    batch_dir.mkdir(parents=True)
+    batch_files = []
+    for index in range(1, count + 1):
+        directory = root / 'data' / f"d{index}"
+        directory.mkdir(parents=True)
+        (directory / 'a.txt').write_text('a')
+        (directory / 'b.nd2').write_text('bb')
+        batch_file = batch_dir / f"batch_{index}.txt"
+        batch_file.write_text(f"{directory}\n")
+        batch_files.append(str(batch_file))
+    return str(output_folder), batch_files
+
+def test_pool_processes_every_batch(tmp_path):
+    output_folder, batch_files = write_batches(tmp_path, 4)
+
+    process_batches_parallel(batch_files, 2, excel=False)
+
+    df = read_extensions(dataset_dir_for(output_folder))
+    assert len(df) == 8
+
+def test_failing_batch_stops_the_run(tmp_path):
+    output_folder, batch_files = write_batches(tmp_path, 2)
+    batch_files.append(str(tmp_path / 'missing.txt'))
+
+    with pytest.raises(FileNotFoundError):
+        process_batches_parallel(batch_files, 2, excel=False)
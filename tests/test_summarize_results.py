@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.scan_dataset import rows_to_frame, write_batch_partitions, dataset_dir_for
+from UtilityFunctions.summarize_results import summarize_dataset, build_summary, save_summary, load_summary
+
+NOW = pd.Timestamp('2024-01-01')
+DAY = 86400
+
+def row(directory, name, size, days_old):
+    mtime = NOW.timestamp() - days_old * DAY
+    return [name, os.path.splitext(name)[1], size, mtime, mtime, mtime, directory]
+
+def write_scan(output_folder, batches):
+    dataset_dir = dataset_dir_for(str(output_folder))
+    for index, rows in enumerate(batches, start=1):
+        write_batch_partitions(rows_to_frame(rows), dataset_dir, f"batch_{index}")
+    return dataset_dir
+
+def test_summary_totals_and_histograms(tmp_path):
+    dataset_dir = write_scan(tmp_path, [
+        [row('/a', 'x.tif', 100, 10), row('/a', 'y.tif', 2 * 1024 ** 2, 400), row('/b', 'z.czi', 50, 10)],
+        [row('/a', 'w.tif', 10, 2000)],
+    ])
+
+    # Tiny record batches: the totals must not depend on how the rows are chunked
+    summary = summarize_dataset(dataset_dir, top_n=2, now=NOW, batch_size=1)
+
+    assert summary['total_files'] == 4
+    assert summary['total_bytes'] == 2 * 1024 ** 2 + 160
+    assert summary['per_extension'] == {'.tif': {'files': 3, 'bytes': 2 * 1024 ** 2 + 110},
+                                        '.czi': {'files': 1, 'bytes': 50}}
+    sizes = {entry['range']: entry['files'] for entry in summary['size_histogram']}
+    assert (sizes['< 1 KB'], sizes['1 MB - 16 MB']) == (3, 1)
+    ages = {entry['range']: entry['files'] for entry in summary['modified_age_histogram']}
+    assert (ages['< 30 days'], ages['1 - 2 years'], ages['>= 5 years']) == (2, 1, 1)
+    assert [entry['File Path'] for entry in summary['largest_files']] == ['/a/y.tif', '/a/x.tif']
+    assert [entry['File Path'] for entry in summary['oldest_files']] == ['/a/w.tif', '/a/y.tif']
+
+def test_directory_totals_span_batches_and_extensions(tmp_path):
+    dataset_dir = write_scan(tmp_path, [
+        [row('/a', 'x.tif', 100, 1), row('/b', 'y.czi', 500, 1)],
+        [row('/a', 'z.czi', 300, 1), row('/c', 'w.tif', 1, 1)],
+    ])
+
+    summary = summarize_dataset(dataset_dir, top_n=2, now=NOW, batch_size=1)
+    assert summary['largest_directories'] == [{'directory': '/b', 'files': 1, 'bytes': 500},
+                                              {'directory': '/a', 'files': 2, 'bytes': 400}]
+
+def test_cached_summary_is_dropped_when_the_dataset_changes(tmp_path):
+    write_scan(tmp_path, [[row('/a', 'x.tif', 100, 1)]])
+    save_summary(str(tmp_path), build_summary(str(tmp_path)))
+    assert load_summary(str(tmp_path))['total_files'] == 1
+
+    write_scan(tmp_path, [[row('/a', 'x.tif', 100, 1)], [row('/a', 'y.tif', 1, 1)]])
+    assert load_summary(str(tmp_path)) is None
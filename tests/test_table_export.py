@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pandas as pd
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+from openpyxl import load_workbook
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.table_export import export_rows, export_format_for, ExportCancelled
+
+def make_frame(rows=10):
+    return pd.DataFrame({'File Name': [f"f{index}.tif" for index in range(rows)],
+                         'File Size': [index * 10 for index in range(rows)]})
+
+def test_selected_rows_are_exported_in_chunks(tmp_path):
+    df = make_frame()
+    progress = []
+
+    for ext in ('.csv', '.parquet', '.xlsx'):
+        progress.clear()
+        path = str(tmp_path / f"out{ext}")
+        assert export_rows(df, path, rows=[1, 3, 5, 7, 9], chunk_rows=2, progress=progress.append) == 5
+        assert progress == [2, 4, 5]
+        if ext == '.csv':
+            names = pa_csv.read_csv(path).column('File Name').to_pylist()
+        elif ext == '.parquet':
+            names = pq.read_table(path).column('File Name').to_pylist()
+        else:
+            names = [row[0] for row in load_workbook(path)['Files'].iter_rows(min_row=2, values_only=True)]
+        assert names == ['f1.tif', 'f3.tif', 'f5.tif', 'f7.tif', 'f9.tif']
+
+def test_empty_export_keeps_the_columns(tmp_path):
+    path = str(tmp_path / 'empty.parquet')
+
+    assert export_rows(make_frame(), path, rows=[]) == 0
+    assert pq.read_table(path).column_names == ['File Name', 'File Size']
+
+def test_cancelled_export_leaves_nothing_behind(tmp_path):
+    for ext in ('.csv', '.xlsx'):
+        path = str(tmp_path / f"out{ext}")
+        calls = []
+
+        with pytest.raises(ExportCancelled):
+            export_rows(make_frame(), path, chunk_rows=3, cancelled=lambda: calls.append(1) or len(calls) > 2)
+
+        assert os.listdir(tmp_path) == []
+
+def test_unknown_extensions_are_rejected():
+    assert export_format_for('Out.XLSX') == 'excel'
+    with pytest.raises(ValueError):
+        export_format_for('out.json')
@@ -0,0 +1,68 @@
+import os
+import sys
+import csv
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions.top_files import (
+    TopFiles, RANKINGS, batch_top_files_path, merge_top_files, write_rankings, top_flags
+)
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    return [[f"f{seed}_{index}.tif", '.tif', rng.randrange(10 ** 6), rng.randrange(10 ** 9), 0,
+             rng.randrange(10 ** 9), f"/data/{seed}"] for index in range(count)]
+
+def expected(rows, ranking, n):
+    field, larger_first = RANKINGS[ranking]
+    return sorted(rows, key=lambda row: row[field], reverse=larger_first)[:n]
+
+def test_heaps_keep_the_best_rows_of_each_ranking():
+    rows = make_rows(500, 1)
+    top = TopFiles(10)
+    for row in rows:
+        top.add(row)
+
+    assert top.count == 500
+    for ranking in RANKINGS:
+        field = RANKINGS[ranking][0]
+        assert [row[field] for row in top.ranked(ranking)] == [row[field] for row in expected(rows, ranking, 10)]
+
+def test_saved_batches_merge_like_one_scan(tmp_path):
+    output = str(tmp_path)
+    batches = [make_rows(200, seed) for seed in range(3)]
+    for seed, rows in enumerate(batches):
+        top = TopFiles(5)
+        for row in rows:
+            top.add(row)
+        top.save(batch_top_files_path(output, f"batch_{seed}"))
+
+    merged = merge_top_files(output, n=3)
+
+    all_rows = [row for rows in batches for row in rows]
+    assert merged.count == 600 and merged.n == 3
+    for ranking in RANKINGS:
+        assert merged.ranked(ranking) == expected(all_rows, ranking, 3)
+
+def test_rankings_are_written_as_csv(tmp_path):
+    output = str(tmp_path)
+    rows = make_rows(20, 7)
+    top = TopFiles(4)
+    for row in rows:
+        top.add(row)
+    top.save(batch_top_files_path(output, 'batch_1'))
+
+    written = write_rankings(output)
+
+    assert [os.path.basename(path) for path in written] == [f"top_files_{ranking}.csv" for ranking in RANKINGS]
+    with open(written[0], newline='') as f:
+        table = list(csv.reader(f))
+    assert table[0] == ['Rank', 'File Path', 'File Size', 'Modified Time', 'Accessed Time']
+    largest = expected(rows, 'largest', 4)
+    assert [line[1] for line in table[1:]] == [f"/data/7/{row[0]}" for row in largest]
+    assert [int(line[2]) for line in table[1:]] == [row[2] for row in largest]
+
+def test_no_batches_means_no_rankings(tmp_path):
+    assert merge_top_files(str(tmp_path)) is None
+    assert write_rankings(str(tmp_path)) == []
+    assert top_flags() == '' and top_flags(5, True) == ' --top 5 --top-only'
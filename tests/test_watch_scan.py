@@ -0,0 +1,94 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions import watch_scan
+from UtilityFunctions.watch_scan import WatchedScan, PART_PREFIX
+from UtilityFunctions.scan_core import FileFilter
+from UtilityFunctions.scan_dataset import read_extensions
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='watch mode needs inotify')
+
+def apply_events(watched):
+    """Handle the queued inotify events and write the changes."""
+    while True:
+        events = watched.inotify.read_events(timeout=0.2)
+        if not events:
+            break
+        for wd, mask, _, name in events:
+            watched.handle(wd, mask, name)
+    watched.flush()
+
+def dataset_files(watched):
+    df = read_extensions(watched.dataset_dir)
+    return sorted(zip(df['Directory'].astype(str), df['File Name'], df['File Size']))
+
+def start(root, **kwargs):
+    watched = WatchedScan(str(root), **kwargs)
+    watched.scan_tree(watched.root)
+    watched.flush()
+    return watched
+
+def test_changes_are_applied_to_the_dataset(tmp_path):
+    root = tmp_path / 'data'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'a.tif').write_bytes(b'x')
+    (root / 'sub' / 'b.txt').write_bytes(b'xx')
+    watched = start(root)
+    try:
+        assert dataset_files(watched) == [(str(root), 'a.tif', 1), (str(root / 'sub'), 'b.txt', 2)]
+
+        (root / 'a.tif').write_bytes(b'xxxx')
+        (root / 'new').mkdir()
+        (root / 'new' / 'c.tif').write_bytes(b'xxx')
+        os.rename(root / 'sub' / 'b.txt', root / 'sub' / 'b.csv')
+        apply_events(watched)
+        assert dataset_files(watched) == [(str(root), 'a.tif', 4), (str(root / 'new'), 'c.tif', 3),
+                                          (str(root / 'sub'), 'b.csv', 2)]
+
+        os.remove(root / 'a.tif')
+        os.rename(root / 'new', tmp_path / 'moved_away')
+        apply_events(watched)
+        assert dataset_files(watched) == [(str(root / 'sub'), 'b.csv', 2)]
+        # The emptied partitions are gone rather than left as stale part files
+        assert sorted(os.listdir(watched.dataset_dir)) == ['extension=.csv']
+    finally:
+        watched.inotify.close()
+
+def test_filter_and_own_output_are_ignored(tmp_path):
+    (tmp_path / 'a.tif').write_bytes(b'x')
+    (tmp_path / 'a.log').write_bytes(b'x')
+    watched = start(tmp_path, file_filter=FileFilter(include_extensions=['.tif']))
+    try:
+        (tmp_path / 'b.log').write_bytes(b'x')
+        apply_events(watched)
+        assert [name for _, name, _ in dataset_files(watched)] == ['a.tif']
+        assert watched.output_folder not in watched.watched_dirs
+    finally:
+        watched.inotify.close()
+
+def test_compaction_merges_small_parts(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch_scan, 'PART_ROWS', 4)
+    for index in range(8):
+        (tmp_path / f"f{index}.tif").write_bytes(b'x')
+    watched = start(tmp_path)
+    try:
+        assert len(watched.ext_parts['.tif']) == 2
+        # Leave one file in each part
+        kept = []
+        for part_id in watched.ext_parts['.tif']:
+            keys = sorted(watched.parts[part_id][1])
+            kept.append(keys[0][1])
+            for directory, name in keys[1:]:
+                os.remove(os.path.join(directory, name))
+        apply_events(watched)
+        assert len(watched.ext_parts['.tif']) == 2
+
+        assert watched.compact() == 1
+        partition = os.path.join(watched.dataset_dir, 'extension=.tif')
+        assert [name.startswith(PART_PREFIX) for name in os.listdir(partition)] == [True]
+        assert [name for _, name, _ in dataset_files(watched)] == sorted(kept)
+    finally:
+        watched.inotify.close()
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UtilityFunctions import workbook_cache
+from UtilityFunctions.workbook_cache import read_workbook, load_cached, cache_paths
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets:
+            df.to_excel(writer, sheet_name=name, index=False)
+
+def test_second_read_comes_from_the_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'batch_1_extensions.xlsx')
+    write_workbook(path, [('tif', pd.DataFrame({'File Name': ['a.tif'], 'File Size': [1]})),
+                          ('czi', pd.DataFrame({'File Name': ['b.czi'], 'File Size': [2]}))])
+
+    first = read_workbook(path)
+    assert os.path.exists(cache_paths(path)[0])
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError('workbook parsed again')
+    monkeypatch.setattr(workbook_cache.pd, 'ExcelFile', no_parsing)
+    second = read_workbook(path)
+
+    assert [name for name, _ in second] == ['tif', 'czi']
+    for (_, cached), (_, parsed) in zip(second, first):
+        pd.testing.assert_frame_equal(cached, parsed)
+
+def test_changed_workbook_is_parsed_again(tmp_path):
+    path = str(tmp_path / 'batch_1_extensions.xlsx')
+    write_workbook(path, [('tif', pd.DataFrame({'File Name': ['a.tif']}))])
+    read_workbook(path)
+
+    write_workbook(path, [('tif', pd.DataFrame({'File Name': ['a.tif', 'c.tif', 'd.tif']}))])
+    os.utime(path, ns=(0, 1))
+
+    assert load_cached(path) is None
+    assert list(read_workbook(path)[0][1]['File Name']) == ['a.tif', 'c.tif', 'd.tif']
+    assert len(load_cached(path)[0][1]) == 3
+
+def test_sheets_arrow_cannot_store_are_left_uncached(tmp_path):
+    path = str(tmp_path / 'mixed.xlsx')
+    write_workbook(path, [('Files', pd.DataFrame({'Owner': [1, 'lab']}))])
+
+    assert list(read_workbook(path)[0][1]['Owner']) == [1, 'lab']
+    assert load_cached(path) is None